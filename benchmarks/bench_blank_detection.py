@@ -0,0 +1,70 @@
+"""
+空白ページ判定のスループット
+
+cached  : キャッシュ済みサムネイル（QPixmap）から判定する経路（目標 1,000頁/s 以上）
+rendered: コンテンツの確認＋極小描画で判定する経路（キャッシュのないページ）
+
+    python benchmarks/bench_blank_detection.py --pages 2000 --output blank.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_utils import setup_offscreen_qt, write_results
+from benchmarks.synthetic_corpus import make_corpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="空白ページ判定のベンチマーク")
+    parser.add_argument("--pages", type=int, default=2000, help="判定するページ数")
+    parser.add_argument("--output", help="結果JSONの出力先")
+    args = parser.parse_args(argv)
+
+    app = setup_offscreen_qt()  # QApplicationの参照を保持する
+    import fitz
+    from PyQt6.QtGui import QPixmap
+    from components.blank_detection import qimage_ink_fraction, page_ink_fraction
+    from components.thumbnail_cache import level_box
+    from components.thumbnail_render import render_page_image
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for kind in ("many_small", "image_scans"):
+            paths = make_corpus(kind, os.path.join(workdir, kind), scale=0.2)
+            pages = []
+            pixmaps = []
+            for path in paths:
+                with fitz.open(path) as doc:
+                    for i in range(len(doc)):
+                        pages.append((path, i))
+                        img = render_page_image(doc.load_page(i), *level_box(128))
+                        pixmaps.append(QPixmap.fromImage(img))
+            reps = args.pages // len(pixmaps) + 1
+            t = time.perf_counter()
+            for pixmap in (pixmaps * reps)[:args.pages]:
+                qimage_ink_fraction(pixmap.toImage())
+            cached = time.perf_counter() - t
+
+            n = 0
+            t = time.perf_counter()
+            while n < min(args.pages, len(pages) * 3):
+                for path in paths:
+                    with fitz.open(path) as doc:
+                        for i in range(len(doc)):
+                            page_ink_fraction(doc, doc.load_page(i))
+                            n += 1
+            rendered = time.perf_counter() - t
+            results[kind] = {
+                "pages": args.pages,
+                "cached_pages_per_sec": args.pages / cached,
+                "rendered_pages": n,
+                "rendered_pages_per_sec": n / rendered,
+            }
+    return write_results("blank_detection", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
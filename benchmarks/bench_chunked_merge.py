@@ -0,0 +1,88 @@
+"""
+大きな結合出力のメモリ上限（一括 / 分割モード）
+
+スキャン画像のコーパスのページを繰り返して大きな結合計画を作り、
+一括（出力全体をメモリ上に作ってから保存）と分割モード（区切りごとに一時ファイルへ追記）で
+結合したときの時間と常駐メモリの最大値を比べる。
+結合元は同時に少数しか開かないようにし、画像を出力内で共有させない（別々のスキャンの束を想定）。
+モードごとに別プロセスで測るため、前の計測のメモリは持ち越さない。
+
+    python benchmarks/bench_chunked_merge.py --pages 20000 --budget-mb 256 --output chunked.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_utils import write_results
+from benchmarks.synthetic_corpus import make_corpus
+
+
+def _run_one(plan_path, out, mode, budget):
+    """子プロセスで1回結合し、結果を標準出力にJSONで返す"""
+    from components.pdf_save_utils import PDFPageInfo, save_pdf_pages
+    from components.perf_metrics import process_rss_bytes
+    with open(plan_path, encoding="utf-8") as f:
+        pages = [PDFPageInfo(p, n) for p, n in json.load(f)]
+    start = process_rss_bytes()
+    if mode == "chunked":
+        report = save_pdf_pages(pages, out, max_open=2, memory_budget=budget)
+    else:
+        # 一括: 分割しない上限までページ数の閾値を上げて比較する
+        import components.pdf_save_utils as save_utils
+        save_utils.CHUNKED_MERGE_MIN_PAGES = len(pages) + 1
+        report = save_pdf_pages(pages, out, max_open=2)
+    mb = 1024 * 1024
+    print(json.dumps({
+        "merge_s": report.seconds,
+        "pages": report.pages,
+        "chunks": report.chunks,
+        "start_rss_mb": start / mb if start else None,
+        "peak_rss_mb": report.peak_rss_bytes / mb if report.peak_rss_bytes else None,
+        "output_mb": os.path.getsize(out) / mb,
+    }))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="分割モードの結合ベンチマーク")
+    parser.add_argument("--pages", type=int, default=20000, help="結合するページ数")
+    parser.add_argument("--budget-mb", type=int, default=256, help="分割モードのメモリ予算（MB）")
+    parser.add_argument("--workdir", help="コーパス生成先（指定時は再利用する）")
+    parser.add_argument("--output", help="結果JSONの出力先")
+    parser.add_argument("--child", nargs=3, metavar=("PLAN", "OUT", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        _run_one(*args.child, args.budget_mb * 1024 * 1024)
+        return None
+
+    import fitz
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(args.workdir or tmp, "image_scans_x1")
+        paths = make_corpus("image_scans", root, scale=1.0)
+        source_pages = []
+        for path in paths:
+            with fitz.open(path) as doc:
+                source_pages += [(path, i) for i in range(len(doc))]
+        plan = (source_pages * (args.pages // len(source_pages) + 1))[:args.pages]
+        plan_path = os.path.join(tmp, "plan.json")
+        with open(plan_path, "w", encoding="utf-8") as f:
+            json.dump(plan, f)
+        results = {"budget_mb": args.budget_mb}
+        for mode in ("in_memory", "chunked"):
+            out = os.path.join(tmp, f"merged_{mode}.pdf")
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--budget-mb", str(args.budget_mb),
+                 "--child", plan_path, out, mode],
+                capture_output=True, text=True, check=True,
+            )
+            results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+            os.remove(out)
+    return write_results("chunked_merge", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+結合時の画像縮小（目標dpiを超える画像をJPEGで縮小・再圧縮）
+
+スキャン画像のコーパスを縮小なし・縮小あり（キャッシュなし）・縮小あり（キャッシュあり）で結合し、
+出力サイズと1ページあたりの時間を比べる。
+
+    python benchmarks/bench_image_recompress.py --dpi 100 --output images.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_utils import write_results
+from benchmarks.synthetic_corpus import make_corpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="結合時の画像縮小ベンチマーク")
+    parser.add_argument("--dpi", type=int, default=100, help="目標dpi")
+    parser.add_argument("--quality", type=int, default=75, help="JPEG品質")
+    parser.add_argument("--scale", type=float, default=1.0, help="コーパス規模の倍率")
+    parser.add_argument("--workdir", help="コーパス生成先（指定時は再利用する）")
+    parser.add_argument("--output", help="結果JSONの出力先")
+    args = parser.parse_args(argv)
+
+    import fitz
+    from components.image_recompress import ImageProfile, ImageRecompressCache
+    from components.pdf_save_utils import PDFPageInfo, save_pdf_pages
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(args.workdir or tmp, f"image_scans_x{args.scale:g}")
+        paths = make_corpus("image_scans", root, scale=args.scale)
+        pages = []
+        for path in paths:
+            with fitz.open(path) as doc:
+                pages += [PDFPageInfo(path, i) for i in range(len(doc))]
+        profile = ImageProfile(target_dpi=args.dpi, quality=args.quality)
+        cache = ImageRecompressCache(os.path.join(tmp, "image_cache"))
+        out = os.path.join(tmp, "merged.pdf")
+        plain = save_pdf_pages(pages, out)
+        results = {"pages": len(pages), "plain_s": plain.seconds, "plain_bytes": os.path.getsize(out)}
+        for label in ("cold", "cached"):
+            report = save_pdf_pages(pages, out, image_profile=profile, image_cache=cache)
+            images = report.images
+            results[label] = {
+                "merge_s": report.seconds,
+                "images": images.images,
+                "cache_hits": images.cache_hits,
+                "bytes_after": images.bytes_after,
+                "reduction": images.reduction,
+                "image_ms_per_page": images.seconds_per_page * 1000,
+            }
+    return write_results("image_recompress", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
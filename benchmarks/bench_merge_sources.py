@@ -0,0 +1,98 @@
+"""
+多数の結合元PDFを結合するときの時間とメモリ
+
+1ページだけのPDFを多数作って結合し、結合中の常駐メモリを一定間隔で記録する。
+lru   : 上限付きLRUで結合元を開いたまま使い回す（既定の上限）
+reopen: 同時に開くのを1つに制限（ページごとに開き直すのと同等）
+各ファイルを2回ずつ参照する並び（32ファイルずつ2巡）で結合する。
+
+    python benchmarks/bench_merge_sources.py --sources 10000 --output merge_sources.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_utils import write_results
+
+
+def _make_sources(root, n):
+    import fitz
+    paths = []
+    for i in range(n):
+        path = os.path.join(root, f"src_{i:05d}.pdf")
+        with fitz.open() as doc:
+            page = doc.new_page()
+            page.insert_text((72, 72), f"source {i}", fontsize=14)
+            doc.save(path)
+        paths.append(path)
+    return paths
+
+
+def _sample_rss(stop, samples, interval):
+    from components.perf_metrics import process_rss_bytes
+    while not stop.is_set():
+        samples.append(process_rss_bytes() or 0)
+        stop.wait(interval)
+
+
+def _merge(pages, out, max_open, interval):
+    from components.pdf_save_utils import save_pdf_pages
+    from components.perf_metrics import metrics
+    samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_rss, args=(stop, samples, interval), daemon=True)
+    metrics.reset()
+    sampler.start()
+    t = time.perf_counter()
+    save_pdf_pages(pages, out, max_open=max_open)
+    elapsed = time.perf_counter() - t
+    stop.set()
+    sampler.join()
+    quarter = max(1, len(samples) // 4)
+    mb = 1024 * 1024
+    return {
+        "merge_s": elapsed,
+        "pages": len(pages),
+        "source_opens": metrics.counter("merge.source_opens"),
+        "peak_open_sources": metrics.gauge("merge.peak_open_sources"),
+        "rss_first_quarter_mb": max(samples[:quarter]) / mb if samples else None,
+        "rss_last_quarter_mb": max(samples[-quarter:]) / mb if samples else None,
+        "rss_peak_mb": max(samples) / mb if samples else None,
+        "output_mb": os.path.getsize(out) / mb,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多数の結合元PDFの結合ベンチマーク")
+    parser.add_argument("--sources", type=int, default=10000, help="結合元PDFの数")
+    parser.add_argument("--interval", type=float, default=0.05, help="メモリ記録の間隔（秒）")
+    parser.add_argument("--workdir", help="結合元の生成先（指定時は再利用する）")
+    parser.add_argument("--output", help="結果JSONの出力先")
+    args = parser.parse_args(argv)
+
+    from components.pdf_save_utils import PDFPageInfo
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.workdir or tmp
+        os.makedirs(root, exist_ok=True)
+        existing = sorted(f for f in os.listdir(root) if f.startswith("src_") and f.endswith(".pdf"))
+        if len(existing) >= args.sources:
+            paths = [os.path.join(root, f) for f in existing[:args.sources]]
+        else:
+            paths = _make_sources(root, args.sources)
+        order = []
+        for i in range(0, len(paths), 32):
+            order += paths[i:i + 32] * 2  # 32ファイルごとに2回ずつ（近くで同じファイルを再び使う）
+        pages = [PDFPageInfo(path, 0) for path in order]
+        results = {}
+        for mode, max_open in (("lru", None), ("reopen", 1)):
+            results[mode] = _merge(pages, os.path.join(tmp, f"merged_{mode}.pdf"), max_open, args.interval)
+    return write_results("merge_sources", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
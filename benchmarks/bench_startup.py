@@ -0,0 +1,95 @@
+"""
+起動時間ベンチマーク（import + 最初の描画まで）
+
+毎回新しいPythonプロセスで計測するため、モジュールキャッシュの影響を受けない。
+作業状態ファイルなどはテンポラリのHOME/APPDATAに隔離する。
+
+    python benchmarks/bench_startup.py --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_utils import REPO_ROOT, write_results
+
+# 起動時に読み込まれていないことを確認したい重いモジュール
+HEAVY_MODULES = ["fitz", "pymupdf", "PyQt6.QtPrintSupport", "tempfile", "components.pdf_preview_widget", "components.pdf_save_utils"]
+
+_CHILD_SCRIPT = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {repo_root!r})
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QEvent, QTimer
+from components.pdf_thumbnail_merger import PDFThumbnailMerger
+t_import = time.perf_counter()
+heavy_after_import = [m for m in {heavy!r} if m in sys.modules]
+app = QApplication(sys.argv[:1])
+result = {{}}
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and not result:
+            result["first_paint_s"] = time.perf_counter() - t0
+            result["heavy_modules_at_paint"] = [m for m in {heavy!r} if m in sys.modules]
+            QTimer.singleShot(0, app.quit)
+        return False
+
+f = FirstPaint()
+app.installEventFilter(f)
+win = PDFThumbnailMerger()
+t_window = time.perf_counter()
+win.show()
+QTimer.singleShot(10000, app.quit)
+app.exec()
+result["import_s"] = t_import - t0
+result["window_init_s"] = t_window - t_import
+result["heavy_modules_after_import"] = heavy_after_import
+print(json.dumps(result))
+"""
+
+
+def run_once(env) -> dict:
+    script = _CHILD_SCRIPT.format(repo_root=REPO_ROOT, heavy=HEAVY_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="起動時間ベンチマーク")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="結果JSONの出力先")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ)
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+        env["HOME"] = home
+        env["APPDATA"] = home
+        runs = [run_once(env) for _ in range(args.repeat)]
+
+    summary = {
+        "repeat": args.repeat,
+        "import_s": statistics.median(r["import_s"] for r in runs),
+        "first_paint_s": statistics.median(r.get("first_paint_s", float("nan")) for r in runs),
+        "heavy_modules_after_import": runs[-1]["heavy_modules_after_import"],
+        "heavy_modules_at_paint": runs[-1].get("heavy_modules_at_paint"),
+        "runs": runs,
+    }
+    return write_results("startup", summary, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+サムネイル画像受け渡しのメモリ・スループット比較
+
+legacy : 0.7倍で描画 → pix.samples(bytesコピー) → QImage(RGB888)
+         → QPixmap.fromImage(RGB32へ変換) → scaled(縮小)
+current: 表示サイズで描画 → samples_mvを借用しRGB32へ1回コピー
+         → QPixmap.fromImage(形式変換なし)
+
+1枚あたりの時間、Pythonヒープへの割り当て量(tracemalloc)、
+中間画像バッファの推定バイト数・個数を出力する。
+
+    python benchmarks/bench_thumbnail_handoff.py --pages 100 --output handoff.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_utils import setup_offscreen_qt, write_results
+from benchmarks.synthetic_corpus import make_corpus
+
+THUMB_W, THUMB_H = 180, 240
+
+
+def legacy_thumbnail(pdf_path, page_num):
+    import fitz
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QImage, QPixmap
+    doc = fitz.open(pdf_path)
+    page = doc.load_page(page_num)
+    pix = page.get_pixmap(matrix=fitz.Matrix(0.7, 0.7))
+    img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
+    doc.close()
+    pixmap = QPixmap.fromImage(img).scaled(
+        THUMB_W, THUMB_H,
+        Qt.AspectRatioMode.KeepAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    )
+    # 中間バッファ: samples(bytes), RGB32変換, 縮小結果
+    buffers = [pix.stride * pix.height, pix.width * pix.height * 4, pixmap.width() * pixmap.height() * 4]
+    return pixmap, buffers
+
+
+def current_thumbnail(pdf_path, page_num):
+    from PyQt6.QtGui import QPixmap
+    from components.thumbnail_render import render_pdf_page
+    img = render_pdf_page(pdf_path, page_num, THUMB_W, THUMB_H)
+    pixmap = QPixmap.fromImage(img)
+    # 中間バッファ: Qt所有のRGB32画像, QPixmap
+    buffers = [img.sizeInBytes(), pixmap.width() * pixmap.height() * 4]
+    return pixmap, buffers
+
+
+def measure(fn, pages):
+    # ウォームアップ（import・フォント読み込みなどを除外）
+    fn(*pages[0])
+    tracemalloc.start()
+    total_py = 0
+    peak_py = 0
+    buffer_bytes = 0
+    buffer_count = 0
+    t = time.perf_counter()
+    for pdf_path, page_num in pages:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        _, buffers = fn(pdf_path, page_num)
+        _, peak = tracemalloc.get_traced_memory()
+        total_py += peak - before
+        peak_py = max(peak_py, peak - before)
+        buffer_bytes += sum(buffers)
+        buffer_count += len(buffers)
+    elapsed = time.perf_counter() - t
+    tracemalloc.stop()
+    n = len(pages)
+    return {
+        "per_thumbnail_s": elapsed / n,
+        "thumbnails_per_sec": n / elapsed,
+        "python_peak_bytes_per_thumbnail": total_py / n,
+        "python_peak_bytes_max": peak_py,
+        "image_buffers_per_thumbnail": buffer_count / n,
+        "image_buffer_bytes_per_thumbnail": buffer_bytes / n,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="サムネイル受け渡しのベンチマーク")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--output", help="結果JSONの出力先")
+    args = parser.parse_args(argv)
+
+    app = setup_offscreen_qt()  # QApplicationの参照を保持する
+    import fitz
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for kind in ("many_small", "image_scans"):
+            paths = make_corpus(kind, os.path.join(workdir, kind), scale=0.2)
+            pages = []
+            for path in paths:
+                with fitz.open(path) as doc:
+                    pages.extend((path, i) for i in range(len(doc)))
+            pages = (pages * (args.pages // max(1, len(pages)) + 1))[:args.pages]
+            results[kind] = {
+                "legacy": measure(legacy_thumbnail, pages),
+                "current": measure(current_thumbnail, pages),
+            }
+    return write_results("thumbnail_handoff", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
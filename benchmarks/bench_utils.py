@@ -0,0 +1,99 @@
+"""
+ベンチマーク共通処理（オフスクリーンQt・環境情報・結果JSONの書き出し/比較）
+"""
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def setup_offscreen_qt():
+    """画面なしで動くようにQtを初期化し、QApplicationを返す"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def process_events_until(predicate, timeout: float = 600.0) -> bool:
+    """predicate()が真になるまでQtのイベントを処理する"""
+    from PyQt6.QtWidgets import QApplication
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        QApplication.processEvents()
+    return True
+
+
+def environment_info() -> dict:
+    info = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        from PyQt6.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+        info["pyqt"] = PYQT_VERSION_STR
+        info["qt"] = QT_VERSION_STR
+    except ImportError:
+        pass
+    try:
+        import fitz
+        info["pymupdf"] = fitz.VersionBind
+    except ImportError:
+        pass
+    try:
+        info["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        info["git_commit"] = None
+    return info
+
+
+def write_results(name: str, results: dict, output: str = None) -> dict:
+    """結果を環境情報付きのJSONにまとめ、outputがあれば書き出す"""
+    payload = {"benchmark": name, "environment": environment_info(), "results": results}
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return payload
+
+
+def _flatten_timings(results, prefix=""):
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten_timings(value, name + ".")
+        elif isinstance(value, (int, float)) and key.endswith("_s"):
+            yield name, float(value)
+
+
+def compare_results(baseline: dict, current: dict) -> list:
+    """
+    2つの結果JSONで共通する計測値（キー名が_sで終わるもの）を比較する。
+    [(名前, 基準値, 今回値, 今回/基準)] を返す
+    """
+    old = dict(_flatten_timings(baseline.get("results", {})))
+    rows = []
+    for name, value in _flatten_timings(current.get("results", {})):
+        if name in old:
+            ratio = value / old[name] if old[name] else float("inf")
+            rows.append((name, old[name], value, ratio))
+    return rows
+
+
+def print_comparison(rows) -> None:
+    for name, old, new, ratio in rows:
+        print(f"{name:60s} {old:10.4f}s -> {new:10.4f}s  x{ratio:.2f}")
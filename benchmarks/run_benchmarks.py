@@ -0,0 +1,265 @@
+"""
+合成コーパスに対するベンチマーク
+
+componentsの実際のAPIを使い、オフスクリーンQtで以下を計測する。
+    ページ検出 (PDFListLoadWorker)、サムネイル生成 (ThumbnailWorker)、
+    リスト構築 (PDFThumbnailListViewer)、スクロール停止後のサムネイル鮮明化、
+    結合 (save_pdf_pages)、作業状態の保存/読込 (JSON / コンパクト形式)
+
+    python benchmarks/run_benchmarks.py --scale 0.25 --output bench.json
+    python benchmarks/run_benchmarks.py --compare bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_utils import (
+    setup_offscreen_qt,
+    process_events_until,
+    write_results,
+    compare_results,
+    print_comparison,
+)
+from benchmarks.synthetic_corpus import CORPUS_KINDS, make_corpus
+
+
+def _corpus_paths(kind, workdir, scale):
+    root = os.path.join(workdir, f"{kind}_x{scale:g}")
+    if os.path.isdir(root):
+        existing = sorted(
+            os.path.join(root, f) for f in os.listdir(root) if f.lower().endswith(".pdf")
+        )
+        if existing:
+            return existing
+    return make_corpus(kind, root, scale)
+
+
+def bench_discovery(paths):
+    from components.pdf_thumbnail_list_viewer import PDFListLoadWorker
+    pages = []
+    worker = PDFListLoadWorker(None, paths)
+    worker.signals.finished.connect(pages.extend)
+    t = time.perf_counter()
+    worker.run()
+    return time.perf_counter() - t, pages
+
+
+def bench_thumbnails(pages, limit):
+    from components.pdf_thumbnail_list_viewer import ThumbnailWorker, ThumbnailWorkerSignals
+    images = []
+    t = time.perf_counter()
+    for pdf_path, page_num in pages[:limit]:
+        signals = ThumbnailWorkerSignals()
+        worker = ThumbnailWorker(
+            pdf_path, page_num, 180, 240, lambda *args: images.append(args[2]), signals
+        )
+        worker.run()
+    elapsed = time.perf_counter() - t
+    return elapsed, len(images)
+
+
+def bench_list_population(pages, workdir):
+    from PyQt6.QtWidgets import QApplication
+    from components.pdf_thumbnail_list_viewer import PDFThumbnailListViewer
+    viewer = PDFThumbnailListViewer()
+    # 一時コーパスの索引をアプリフォルダの索引に書き込まない
+    viewer.text_index_path = os.path.join(workdir, "text_index.sqlite3")
+    viewer.resize(1200, 800)
+    viewer.show()
+    t = time.perf_counter()
+    viewer._on_pdf_list_loaded(list(pages))
+    first_rows = viewer._initial_load_rows
+    preview = None
+    while viewer._pdf_page_iter is not None:
+        if preview is None and _rows_have_pixmap(viewer, first_rows):
+            preview = time.perf_counter() - t
+        QApplication.processEvents()
+    populate = time.perf_counter() - t
+    # 表示範囲のサムネイルが（簡易版を含め）表示されるまで
+    process_events_until(lambda: _rows_have_pixmap(viewer, first_rows), timeout=120)
+    if preview is None:
+        preview = time.perf_counter() - t
+    # 表示範囲のサムネイルが揃うまで
+    process_events_until(lambda: not viewer._thumbnail_requested, timeout=120)
+    visible = time.perf_counter() - t
+    return populate, preview, visible, viewer
+
+
+def _rows_have_pixmap(viewer, rows):
+    from PyQt6.QtWidgets import QLabel
+    for info, item in viewer.page_items[:rows]:
+        widget = viewer.itemWidget(item)
+        label = widget.findChild(QLabel) if widget else None
+        if label is None or label.pixmap().isNull():
+            return False
+    return len(viewer.page_items) >= min(rows, 1)
+
+
+def bench_scroll(viewer, adaptive, steps=40, interval=0.01):
+    """
+    フリング（画面の6割まで連続スクロール）後、停止から表示範囲の全サムネイルが
+    表示サイズの段で揃うまでの時間と、その間に描画したページ数。
+    adaptive=Falseは固定の前後1画面先読み
+    """
+    from PyQt6.QtWidgets import QApplication
+    from components.perf_metrics import metrics
+    from components.pdf_thumbnail_list_viewer import THUMB_SHOWN_ROLE
+    viewer.adaptive_prefetch = adaptive
+    bar = viewer.verticalScrollBar()
+    bar.setValue(0)
+    process_events_until(lambda: not viewer._workers, timeout=120)
+    viewer.thumbnail_cache.clear()
+    viewer._refresh_thumbnail_display()
+    process_events_until(lambda: not viewer._workers, timeout=120)
+    target = bar.maximum() * 0.6
+    rendered = metrics.snapshot()["spans"].get("thumbnail.render", {}).get("count", 0)
+    for i in range(1, steps + 1):
+        bar.setValue(int(target * i / steps))
+        QApplication.processEvents()
+        time.sleep(interval)
+
+    def visible_sharp():
+        first, last = viewer._visible_range()
+        return all(
+            viewer.page_items[row][1].data(THUMB_SHOWN_ROLE) == viewer._display_gen
+            for row in range(first, last + 1)
+        )
+
+    t = time.perf_counter()
+    process_events_until(visible_sharp, timeout=120)
+    elapsed = time.perf_counter() - t
+    rendered = metrics.snapshot()["spans"]["thumbnail.render"]["count"] - rendered
+    viewer.adaptive_prefetch = True
+    return elapsed, rendered
+
+
+def bench_merge(pages, workdir):
+    from components.pdf_save_utils import PDFPageInfo, save_pdf_pages
+    infos = [PDFPageInfo(pdf_path, page_num) for pdf_path, page_num in pages]
+    out = os.path.join(workdir, "merged.pdf")
+    t = time.perf_counter()
+    save_pdf_pages(infos, out)
+    elapsed = time.perf_counter() - t
+    size = os.path.getsize(out)
+    os.remove(out)
+    return elapsed, size
+
+
+def bench_export(pages, workdir):
+    """ファイルごとの分割書き出し（1プロセス / CPU数のプロセス）の所要時間"""
+    import shutil
+    from components.pdf_export import export_pdf_parts, plan_export
+    infos = [{'pdf_path': pdf_path, 'page_num': page_num} for pdf_path, page_num in pages]
+    timings = {}
+    for label, workers in (("serial", 1), ("parallel", None)):
+        out_dir = os.path.join(workdir, f"export_{label}")
+        jobs = plan_export(infos, out_dir, "file")
+        t = time.perf_counter()
+        export_pdf_parts(jobs, max_workers=workers)
+        timings[f"export_{label}_s"] = time.perf_counter() - t
+        shutil.rmtree(out_dir, ignore_errors=True)
+    timings["export_files"] = len(jobs)
+    return timings
+
+
+def bench_reorder(viewer):
+    """一括並べ替え（1回の更新で適用）の所要時間"""
+    timings = {}
+    viewer.clearSelection()
+    for label, reorder in (
+        ("sort_name", lambda: viewer.sort_pages("name")),
+        ("sort_page", lambda: viewer.sort_pages("page")),
+        ("reverse", viewer.reverse_pages),
+        ("interleave", lambda: viewer.interleave_pages(reverse_second=True)),
+    ):
+        t = time.perf_counter()
+        reorder()
+        timings[f"reorder_{label}_s"] = time.perf_counter() - t
+    viewer.sort_pages("name")
+    return timings
+
+
+def bench_state(viewer, workdir):
+    timings = {}
+    for label, ext in (("json", ".json"), ("compact", ".pdfstate")):
+        path = os.path.join(workdir, "state" + ext)
+        t = time.perf_counter()
+        viewer.save_state(path)
+        timings[f"state_save_{label}_s"] = time.perf_counter() - t
+        t = time.perf_counter()
+        viewer.load_state(path)
+        timings[f"state_load_{label}_s"] = time.perf_counter() - t
+        timings[f"state_{label}_bytes"] = os.path.getsize(path)
+    return timings
+
+
+def run_corpus(kind, workdir, scale, thumb_limit):
+    paths = _corpus_paths(kind, workdir, scale)
+    result = {"files": len(paths)}
+    result["discovery_s"], pages = bench_discovery(paths)
+    result["pages"] = len(pages)
+    result["thumbnail_render_s"], result["thumbnail_pages"] = bench_thumbnails(pages, thumb_limit)
+    (
+        result["list_population_s"],
+        result["visible_previews_s"],
+        result["visible_thumbnails_s"],
+        viewer,
+    ) = bench_list_population(pages, workdir)
+    (
+        result["scroll_time_to_sharp_fixed_s"],
+        result["scroll_renders_fixed"],
+    ) = bench_scroll(viewer, adaptive=False)
+    (
+        result["scroll_time_to_sharp_s"],
+        result["scroll_renders"],
+    ) = bench_scroll(viewer, adaptive=True)
+    result.update(bench_reorder(viewer))
+    result["merge_s"], result["merge_bytes"] = bench_merge(pages, workdir)
+    result.update(bench_export(pages, workdir))
+    result.update(bench_state(viewer, workdir))
+    viewer.thread_pool.waitForDone()
+    viewer.deleteLater()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="合成PDFコーパスのベンチマーク")
+    parser.add_argument("--corpus", action="append", choices=CORPUS_KINDS,
+                        help="対象コーパス（複数指定可、省略時は全て）")
+    parser.add_argument("--scale", type=float, default=1.0, help="コーパス規模の倍率")
+    parser.add_argument("--thumbnails", type=int, default=50, help="サムネイル計測のページ数")
+    parser.add_argument("--workdir", help="コーパス生成先（指定時は再利用する）")
+    parser.add_argument("--output", help="結果JSONの出力先")
+    parser.add_argument("--compare", help="比較対象の結果JSON")
+    args = parser.parse_args(argv)
+
+    app = setup_offscreen_qt()  # QApplicationの参照を保持する
+    kinds = args.corpus or list(CORPUS_KINDS)
+    tmp = None
+    workdir = args.workdir
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory()
+        workdir = tmp.name
+    try:
+        results = {
+            kind: run_corpus(kind, workdir, args.scale, args.thumbnails)
+            for kind in kinds
+        }
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+    payload = write_results("corpus", {"scale": args.scale, **results}, args.output)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print_comparison(compare_results(baseline, payload))
+    return payload
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+ベンチマーク用の合成PDFコーパスをfitzで生成する
+
+    many_small : 小さなPDFが大量（1〜3ページのテキスト）
+    few_huge   : ページ数の多いPDFが少数
+    image_scans: スキャン画像相当のJPEGを全面に貼ったページ
+    vector     : 線・曲線を大量に描いたベクター図面
+
+scaleで各コーパスのファイル数・ページ数をまとめて増減できる。
+"""
+import os
+import random
+
+import fitz
+
+CORPUS_KINDS = ("many_small", "few_huge", "image_scans", "vector")
+
+A4 = fitz.paper_rect("a4")
+
+
+def _text_page(doc, label):
+    page = doc.new_page(width=A4.width, height=A4.height)
+    page.insert_text((72, 96), label, fontsize=20)
+    y = 140
+    for i in range(30):
+        page.insert_text((72, y), f"line {i:02d} lorem ipsum dolor sit amet", fontsize=10)
+        y += 16
+    return page
+
+
+def _scan_jpeg(rng, width, height):
+    # 白地に薄いノイズと黒い行（文字列相当）を持つグレースケール画像
+    light = bytes(rng.randrange(225, 256) for _ in range(width))
+    dark_row = bytes(rng.randrange(0, 90) if rng.random() < 0.4 else 255 for _ in range(width))
+    rows = []
+    for y in range(height):
+        rows.append(dark_row if (y // 12) % 4 == 1 and 80 < y < height - 80 else light)
+    pix = fitz.Pixmap(fitz.csGRAY, width, height, b"".join(rows), False)
+    return pix.tobytes("jpeg", jpg_quality=80)
+
+
+def _write_many_small(root, scale, rng):
+    paths = []
+    for k in range(int(200 * scale) or 1):
+        doc = fitz.open()
+        for i in range(rng.randint(1, 3)):
+            _text_page(doc, f"small {k} page {i + 1}")
+        path = os.path.join(root, f"small_{k:05d}.pdf")
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def _write_few_huge(root, scale, rng):
+    paths = []
+    for k in range(2):
+        doc = fitz.open()
+        for i in range(int(500 * scale) or 1):
+            _text_page(doc, f"huge {k} page {i + 1}")
+        path = os.path.join(root, f"huge_{k}.pdf")
+        doc.save(path, garbage=1, deflate=True)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def _write_image_scans(root, scale, rng):
+    paths = []
+    # 画像は使い回す（生成時間短縮）が、ページごとに別オブジェクトとして埋め込む
+    images = [_scan_jpeg(rng, 1240, 1754) for _ in range(3)]
+    for k in range(int(20 * scale) or 1):
+        doc = fitz.open()
+        for i in range(5):
+            page = doc.new_page(width=A4.width, height=A4.height)
+            page.insert_image(page.rect, stream=images[(k + i) % len(images)])
+        path = os.path.join(root, f"scan_{k:04d}.pdf")
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def _write_vector(root, scale, rng):
+    paths = []
+    for k in range(int(10 * scale) or 1):
+        doc = fitz.open()
+        for i in range(5):
+            page = doc.new_page(width=A4.width, height=A4.height)
+            shape = page.new_shape()
+            for _ in range(1500):
+                p1 = fitz.Point(rng.uniform(0, A4.width), rng.uniform(0, A4.height))
+                p2 = fitz.Point(rng.uniform(0, A4.width), rng.uniform(0, A4.height))
+                if rng.random() < 0.5:
+                    shape.draw_line(p1, p2)
+                else:
+                    shape.draw_bezier(p1, (p1 + p2) / 2 + (20, -20), (p1 + p2) / 2 + (-20, 20), p2)
+            shape.finish(width=0.3, color=(0, 0, 0))
+            shape.commit()
+        path = os.path.join(root, f"vector_{k:04d}.pdf")
+        doc.save(path, deflate=True)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+_WRITERS = {
+    "many_small": _write_many_small,
+    "few_huge": _write_few_huge,
+    "image_scans": _write_image_scans,
+    "vector": _write_vector,
+}
+
+
+def make_corpus(kind: str, root: str, scale: float = 1.0, seed: int = 0) -> list:
+    """
+    kindのコーパスをroot配下に生成し、PDFパスのリストを返す。
+    同じseedなら同じ内容が生成される
+    """
+    if kind not in _WRITERS:
+        raise ValueError(f"未知のコーパス種別です: {kind}")
+    os.makedirs(root, exist_ok=True)
+    return _WRITERS[kind](root, scale, random.Random(seed))
@@ -0,0 +1,85 @@
+"""
+空白（白紙・ほぼ白紙）ページの判定
+
+グレースケールの極小画像で「地色より十分暗い画素（インク）」の割合を求め、空白度の指標とする。
+画素の集計はbytes.translate/countでまとめて行い、Pythonの画素ループは使わない。
+- サムネイルがキャッシュ済みならそれを縮小して使う（描画不要）
+- 描画命令のないページはコンテンツストリームを見るだけで空白と判定する
+- それ以外は極小サイズで描画して判定する
+どの経路でも同じ画像サイズ・同じ指標で判定するため、判定結果は経路によらない。
+"""
+import re
+
+# インク割合がこれ以下なら空白とみなす
+BLANK_INK_THRESHOLD = 0.0015
+# 地色よりこの階調以上暗い画素をインクとする
+INK_CONTRAST = 40
+# 判定用の画像サイズ（幅は4の倍数にして行末の詰め物をなくす）
+SAMPLE_W, SAMPLE_H = 64, 88
+
+_BUCKET = bytes(v >> 4 for v in range(256))
+# 英字の演算子は前後が英字でないこと、テキスト表示の ' " は前後が空白・区切り文字であることで区別する
+_PAINT_OPS = re.compile(
+    rb"(?<![A-Za-z])(?:[fFbBSs]\*?|Do|sh|T[jJ]|BI)(?![A-Za-z])"
+    rb"|(?<![^\s)>\]])['\"](?![^\s/(\[<%])"
+)
+
+
+def ink_fraction(samples: bytes) -> float:
+    """グレースケール画素列のうち、地色（最頻の明るさ）より十分暗い画素の割合"""
+    if not samples:
+        return 0.0
+    buckets = samples.translate(_BUCKET)
+    counts = [buckets.count(i) for i in range(16)]
+    background = max(range(16), key=counts.__getitem__)
+    cutoff = (background * 16 - INK_CONTRAST) >> 4
+    if cutoff <= 0:
+        return 0.0
+    return sum(counts[:cutoff]) / len(samples)
+
+
+def qimage_ink_fraction(image) -> float:
+    """QImage（キャッシュ済みサムネイル）のインク割合"""
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QImage
+    small = image.scaled(
+        SAMPLE_W, SAMPLE_H,
+        Qt.AspectRatioMode.IgnoreAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    ).convertToFormat(QImage.Format.Format_Grayscale8)
+    bits = small.constBits()
+    bits.setsize(small.sizeInBytes())
+    return ink_fraction(bytes(bits))
+
+
+def content_shortcut(doc, page):
+    """
+    コンテンツストリームだけで空白と分かる場合は0.0、描画が必要な場合はNoneを返す
+    """
+    if page.get_images() or page.first_annot is not None:
+        return None
+    content = b"".join(doc.xref_stream(xref) or b"" for xref in page.get_contents())
+    if not _PAINT_OPS.search(content):
+        return 0.0  # 塗り・線・画像・テキストの描画命令がない
+    return None
+
+
+def page_ink_fraction(doc, page) -> float:
+    shortcut = content_shortcut(doc, page)
+    if shortcut is not None:
+        return shortcut
+    import fitz
+    rect = page.rect
+    if rect.width <= 0 or rect.height <= 0:
+        return 0.0
+    matrix = fitz.Matrix(SAMPLE_W / rect.width, SAMPLE_H / rect.height)
+    pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
+    if pix.stride != pix.width:
+        return ink_fraction(b"".join(
+            pix.samples_mv[y * pix.stride:y * pix.stride + pix.width] for y in range(pix.height)
+        ))
+    return ink_fraction(pix.samples_mv.tobytes())
+
+
+def is_blank(fraction: float, threshold: float = BLANK_INK_THRESHOLD) -> bool:
+    return fraction <= threshold
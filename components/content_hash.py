@@ -0,0 +1,174 @@
+"""
+ファイル・ページ内容のハッシュ（重複検出用）
+
+- ファイルハッシュ: サイズと先頭・末尾の一部のblake2b（全体は読まない）。同じスキャンの複製を検出する
+- ページハッシュ: ページのコンテンツストリーム・画像・フォーム・フォント名とページサイズ・回転から計算し、
+  別ファイルに含まれる同じページも検出する。描画内容を持たないページは極小描画の画素で代用する
+結果はファイルのフィンガープリント（サイズ, 更新時刻）ごとにアプリフォルダへ保存し、
+変更のないファイルは再計算しない。
+"""
+import hashlib
+import json
+import os
+import threading
+from components.file_fingerprint import file_fingerprint
+from components.path_manager import get_appdata_path
+
+HASH_CACHE_FILE = "content_hashes.json"
+_DIGEST_SIZE = 16
+_SAMPLE = 64 * 1024
+_ENTRY_VERSION = 2  # ファイルハッシュの計算方法を変えたら上げる（古い値と比べないため）
+
+
+def file_hash(path: str) -> str:
+    """
+    サイズと先頭・末尾_SAMPLEバイトのハッシュ
+    PDFの末尾には相互参照表とトレーラー（/ID）があるため、複製以外で一致することはまずない
+    """
+    h = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        h.update(str(size).encode())
+        h.update(f.read(_SAMPLE))
+        if size > _SAMPLE:
+            f.seek(max(_SAMPLE, size - _SAMPLE))
+            h.update(f.read(_SAMPLE))
+    return h.hexdigest()
+
+
+def page_geometry(page) -> str:
+    """ページハッシュに含める大きさ・回転"""
+    rect = page.rect
+    return f"{rect.width:.2f}x{rect.height:.2f}r{page.rotation}"
+
+
+def page_hash(doc, page, geometry=None) -> str:
+    """
+    ページの描画内容のハッシュ
+    geometry: 大きさ・回転をこのページのものの代わりに使う（回転・切り抜きした結合先のページを
+    元のページと比べるとき、元のページのpage_geometryを渡す）
+    """
+    import fitz
+    h = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    h.update((geometry or page_geometry(page)).encode())
+    streams = 0
+    for xref in page.get_contents():
+        h.update(doc.xref_stream_raw(xref) or b"")
+        streams += 1
+    for xref in sorted({img[0] for img in page.get_images(full=True)}):
+        h.update(b"img")
+        h.update(doc.xref_stream_raw(xref) or b"")
+    for xref in sorted({xo[0] for xo in page.get_xobjects()}):
+        h.update(b"form")
+        h.update(doc.xref_stream_raw(xref) or b"")
+    for font in page.get_fonts(full=True):
+        h.update(f"font:{font[3]}".encode())
+    if streams == 0:
+        # コンテンツストリームがない（注釈のみ等）: 極小描画で代用
+        pix = page.get_pixmap(matrix=fitz.Matrix(0.1, 0.1), alpha=False)
+        h.update(pix.samples_mv)
+    return h.hexdigest()
+
+
+def compute_content_hashes(path: str):
+    """(ファイルハッシュ, [ページハッシュ]) を返す"""
+    import fitz
+    with fitz.open(path) as doc:
+        pages = [page_hash(doc, doc.load_page(i)) for i in range(len(doc))]
+    return file_hash(path), pages
+
+
+class ContentHashCache:
+    """pdf_path -> {"fingerprint", "file", "pages"} をJSONで保持する"""
+
+    def __init__(self, path=None):
+        self.path = path or get_appdata_path(HASH_CACHE_FILE)
+        self._lock = threading.Lock()
+        self._entries = None
+        self._dirty = False
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def cached(self, pdf_path: str):
+        """保存済みの (ファイルハッシュ, [ページハッシュ])。未計算・ファイル変更後はNone（計算しない）"""
+        fingerprint = file_fingerprint(pdf_path)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            self._load()
+            entry = self._entries.get(pdf_path)
+            if (entry is not None and entry.get("version") == _ENTRY_VERSION
+                    and tuple(entry["fingerprint"]) == fingerprint):
+                return entry["file"], entry["pages"]
+        return None
+
+    def get(self, pdf_path: str):
+        """(ファイルハッシュ, [ページハッシュ])。未計算・ファイル変更後は計算して保持する"""
+        entry = self.cached(pdf_path)
+        if entry is not None:
+            return entry
+        fingerprint = file_fingerprint(pdf_path)
+        if fingerprint is None:
+            return None
+        file_digest, pages = compute_content_hashes(pdf_path)
+        with self._lock:
+            self._entries[pdf_path] = {
+                "version": _ENTRY_VERSION,
+                "fingerprint": list(fingerprint),
+                "file": file_digest,
+                "pages": pages,
+            }
+            self._dirty = True
+        return file_digest, pages
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            # 存在しなくなったファイルの分は保存しない
+            entries = {p: e for p, e in self._entries.items() if os.path.exists(p)}
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp, self.path)
+            self._entries = entries
+            self._dirty = False
+
+
+def find_duplicates(pages, hashes):
+    """
+    pages: [(pdf_path, page_num)]（表示順）、hashes: {pdf_path: (ファイルハッシュ, [ページハッシュ])}
+    {重複している行番号: 最初に現れた行番号} を返す。ハッシュのない行は対象外
+    """
+    first_seen = {}
+    duplicates = {}
+    for row, (pdf_path, page_num) in enumerate(pages):
+        entry = hashes.get(pdf_path)
+        if entry is None or page_num >= len(entry[1]):
+            continue
+        digest = entry[1][page_num]
+        if digest in first_seen:
+            duplicates[row] = first_seen[digest]
+        else:
+            first_seen[digest] = row
+    return duplicates
+
+
+def duplicate_files(hashes):
+    """{pdf_path: 同じ内容の先頭ファイル} （パス順で最初のものを元とする）"""
+    first = {}
+    result = {}
+    for pdf_path in sorted(hashes):
+        digest = hashes[pdf_path][0]
+        if digest in first:
+            result[pdf_path] = first[digest]
+        else:
+            first[digest] = pdf_path
+    return result
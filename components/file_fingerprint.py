@@ -0,0 +1,14 @@
+import os
+from typing import Optional, Tuple
+
+
+def file_fingerprint(path: str) -> Optional[Tuple[int, int]]:
+    """
+    ファイルの簡易フィンガープリント (サイズ, 更新時刻ns) を返す。
+    ファイルが存在しない場合はNone
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
@@ -0,0 +1,109 @@
+"""
+フォルダ監視（PDFの追加・削除・更新の検出）
+
+QFileSystemWatcherのディレクトリ変更通知で走査を予約し、通知されない上書き更新のために
+一定間隔のポーリングも併用する。スキャナが書き込み中のファイルを拾わないよう、
+追加・更新は2回続けて同じフィンガープリントだったときに初めて通知する。
+"""
+import os
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+
+def list_pdf_fingerprints(folder: str) -> dict:
+    """フォルダ直下のPDFの {パス: フィンガープリント}"""
+    result = {}
+    try:
+        entries = list(os.scandir(folder))
+    except OSError:
+        return result
+    for entry in entries:
+        if not entry.name.lower().endswith(".pdf"):
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        if entry.is_file():
+            result[entry.path] = (st.st_size, st.st_mtime_ns)
+    return result
+
+
+class PDFFolderWatcher(QObject):
+    filesAdded = pyqtSignal(list)     # [pdf_path]
+    filesRemoved = pyqtSignal(list)   # [pdf_path]
+    filesModified = pyqtSignal(list)  # [pdf_path]
+
+    def __init__(self, parent=None, settle_ms=1000, poll_ms=5000):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._schedule_scan)
+        # 変更通知が続く間は走査を遅らせる
+        self._scan_timer = QTimer(self)
+        self._scan_timer.setSingleShot(True)
+        self._scan_timer.setInterval(settle_ms)
+        self._scan_timer.timeout.connect(self.rescan)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_ms)
+        self._poll_timer.timeout.connect(self.rescan)
+        self._known = {}    # 通知済みの {パス: フィンガープリント}
+        self._pending = {}  # 書き込み中かもしれない {パス: 前回見たフィンガープリント}
+
+    def folders(self):
+        return list(self._watcher.directories())
+
+    def watch(self, folder: str):
+        """folderの監視を始める。現在あるPDFは既知として扱い通知しない"""
+        folder = os.path.abspath(folder)
+        if folder in self._watcher.directories():
+            return
+        if not self._watcher.addPath(folder):
+            print(f"{folder} を監視できません")
+            return
+        self._known.update(list_pdf_fingerprints(folder))
+        self._poll_timer.start()
+
+    def unwatch_all(self):
+        folders = self._watcher.directories()
+        if folders:
+            self._watcher.removePaths(folders)
+        self._known.clear()
+        self._pending.clear()
+        self._scan_timer.stop()
+        self._poll_timer.stop()
+
+    def _schedule_scan(self, *args):
+        self._scan_timer.start()
+
+    def rescan(self):
+        """監視中のフォルダを走査し、前回からの差分を通知する"""
+        folders = self._watcher.directories()
+        if not folders:
+            return
+        current = {}
+        for folder in folders:
+            current.update(list_pdf_fingerprints(folder))
+        removed = [p for p in self._known if p not in current]
+        for path in removed:
+            del self._known[path]
+        for path in [p for p in self._pending if p not in current]:
+            del self._pending[path]
+        added, modified = [], []
+        for path, fp in current.items():
+            if self._known.get(path) == fp:
+                self._pending.pop(path, None)
+                continue
+            if self._pending.get(path) != fp:
+                # 初めて見た・まだ変化している（書き込み中）: 次の走査で確認する
+                self._pending[path] = fp
+                continue
+            del self._pending[path]
+            (modified if path in self._known else added).append(path)
+            self._known[path] = fp
+        if self._pending:
+            self._scan_timer.start()
+        if removed:
+            self.filesRemoved.emit(sorted(removed))
+        if added:
+            self.filesAdded.emit(sorted(added))
+        if modified:
+            self.filesModified.emit(sorted(modified))
@@ -0,0 +1,255 @@
+"""
+結合後のPDFに埋め込まれた画像の縮小・再圧縮
+
+表示サイズに対して目標dpiを超える画像を、目標dpiの大きさに縮小してJPEGで圧縮し直す。
+縮小・圧縮はワーカープロセスで並列に行い、結果は画像ストリームの内容・縮小後の大きさ・
+品質から作るキーでディスクに保持する（同じ結合元を結合し直すときは圧縮し直さない）。
+PDFの書き換えは画像オブジェクトのストリームを差し替えるだけで、ページの内容はそのまま。
+"""
+import hashlib
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import NamedTuple, Optional
+
+from components.path_manager import get_appdata_path
+
+IMAGE_CACHE_DIR = "image_cache"
+# 縮小しても画質の差がほぼないため、目標をこの割合まで超えるものは対象にしない
+_DPI_TOLERANCE = 1.1
+# 再圧縮しても小さくならない形式（2値画像向けの圧縮）
+_SKIP_FILTERS = ("JBIG2Decode", "CCITTFaxDecode")
+
+
+class ImageProfile(NamedTuple):
+    target_dpi: int = 150
+    quality: int = 75  # JPEG品質
+    min_bytes: int = 16 * 1024  # これより小さい画像は対象にしない
+
+
+class RecompressReport(NamedTuple):
+    pages: int
+    images: int  # 差し替えた画像の数
+    cache_hits: int
+    bytes_before: int  # ファイルサイズ
+    bytes_after: int
+    seconds: float
+
+    @property
+    def reduction(self) -> float:
+        """小さくなった割合（0〜1）"""
+        return 1 - self.bytes_after / self.bytes_before if self.bytes_before else 0.0
+
+    @property
+    def seconds_per_page(self) -> float:
+        return self.seconds / self.pages if self.pages else 0.0
+
+
+class ImageRecompressCache:
+    """キー -> 再圧縮したJPEG。ファイルの合計に上限を設け、古く使われていないものから消す"""
+
+    def __init__(self, directory=None, max_bytes: int = 1024 * 1024 * 1024):
+        self.directory = directory or get_appdata_path(IMAGE_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._bytes = None  # 初回の書き込みまで数えない
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".jpg")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # 使用順の記録
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        if self._bytes is None:
+            self._bytes = sum(size for _, size, _ in self._entries())
+        else:
+            self._bytes += len(data)
+        if self._bytes > self.max_bytes:
+            self._trim()
+
+    def _entries(self):
+        for name in os.listdir(self.directory):
+            if not name.endswith(".jpg"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            yield name, st.st_size, st.st_mtime
+
+    def _trim(self):
+        # 上限の8割まで減らし、書き込みのたびに消さないようにする
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for name, size, _ in entries:
+            if total <= self.max_bytes * 0.8:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+        self._bytes = total
+
+
+def downsample_image(data: bytes, width: int, height: int, quality: int) -> bytes:
+    """画像ファイルのバイト列をwidth×heightに縮小してJPEGにする（ワーカープロセスで実行）"""
+    import fitz
+    pix = fitz.Pixmap(data)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.n not in (1, 3):  # CMYKなど
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    if (pix.width, pix.height) != (width, height):
+        pix = fitz.Pixmap(pix, width, height, None)
+    return pix.tobytes("jpeg", jpg_quality=quality)
+
+
+def _candidates(doc, profile):
+    """縮小する画像の (xref, 縮小後の幅, 高さ, キー, 元のストリームのバイト数)（同じxrefは1回だけ）"""
+    seen = set()
+    for page in doc:
+        for item in page.get_images(full=True):
+            xref, smask, width, height, bpc, _, _, _, filt, _ = item
+            if xref in seen:
+                continue
+            seen.add(xref)
+            if smask or bpc != 8 or filt in _SKIP_FILTERS:
+                continue
+            if doc.xref_get_key(xref, "Decode")[0] != "null":
+                continue  # 色を反転する画像などはJPEGにすると見た目が変わる
+            # get_image_rectsは画像をデコードして照合するため、名前で引く方を使う
+            rect = page.get_image_bbox(item)
+            if rect.is_empty or rect.is_infinite:
+                continue
+            longest = max(rect.width, rect.height)
+            dpi = max(width, height) * 72 / longest
+            if dpi <= profile.target_dpi * _DPI_TOLERANCE:
+                continue
+            raw = doc.xref_stream_raw(xref)
+            if len(raw) < profile.min_bytes:
+                continue
+            scale = profile.target_dpi / dpi
+            new_w, new_h = max(1, round(width * scale)), max(1, round(height * scale))
+            digest = hashlib.sha1(raw)
+            digest.update(f"{width}x{height}:{new_w}x{new_h}:q{profile.quality}".encode())
+            yield xref, new_w, new_h, digest.hexdigest(), len(raw)
+
+
+def _jpeg_components(data: bytes) -> int:
+    """JPEGの色成分数（SOFマーカーから読む。デコードはしない）"""
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            break
+        marker = data[i + 1]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            return data[i + 9]
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return 3
+
+
+def _replace_image(doc, xref, data, width, height):
+    """画像オブジェクトのストリームをJPEGに差し替える（同じxrefを使う全ページに反映）"""
+    doc.update_stream(xref, data, compress=False)
+    gray = _jpeg_components(data) == 1
+    for key, value in (
+        ("Filter", "/DCTDecode"),
+        ("Width", str(width)),
+        ("Height", str(height)),
+        ("ColorSpace", "/DeviceGray" if gray else "/DeviceRGB"),
+        ("BitsPerComponent", "8"),
+        ("DecodeParms", "null"),
+    ):
+        doc.xref_set_key(xref, key, value)
+
+
+def recompress_images(pdf_path: str, profile: ImageProfile = ImageProfile(),
+                      cache: Optional[ImageRecompressCache] = None,
+                      max_workers: Optional[int] = None) -> RecompressReport:
+    """
+    pdf_pathの画像のうち目標dpiを超えるものを縮小・再圧縮して上書き保存する
+    小さくならなかった画像は差し替えない
+    """
+    import fitz
+    from components.perf_metrics import metrics
+    t0 = time.perf_counter()
+    if cache is None:
+        cache = ImageRecompressCache()
+    bytes_before = os.path.getsize(pdf_path)
+    replaced = hits = 0
+    pool = None
+    with metrics.span("merge.images"), fitz.open(pdf_path) as doc:
+        pages = len(doc)
+        todo = []  # キャッシュにない分
+        for xref, width, height, key, raw_size in _candidates(doc, profile):
+            data = cache.get(key)
+            if data is None:
+                todo.append((xref, width, height, key, raw_size))
+                continue
+            hits += 1
+            if len(data) < raw_size:
+                _replace_image(doc, xref, data, width, height)
+                replaced += 1
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(todo)))
+        try:
+            if workers > 1:
+                import multiprocessing
+                pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            pending = {}
+
+            def finished(job, data):
+                nonlocal replaced
+                xref, width, height, key, raw_size = job
+                cache.put(key, data)
+                if len(data) < raw_size:
+                    _replace_image(doc, xref, data, width, height)
+                    replaced += 1
+
+            for job in todo:
+                xref, width, height = job[:3]
+                image = doc.extract_image(xref)["image"]
+                if pool is None:
+                    finished(job, downsample_image(image, width, height, profile.quality))
+                    continue
+                pending[pool.submit(downsample_image, image, width, height, profile.quality)] = job
+                # 画像を全部メモリに載せないよう、送り出す数をワーカー数の数倍までにする
+                if len(pending) >= workers * 4:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finished(pending.pop(future), future.result())
+            for future in list(pending):
+                finished(pending.pop(future), future.result())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        if replaced:
+            tmp = pdf_path + ".tmp"
+            # 差し替え前のストリームや使われなくなった色空間は書き出さない
+            doc.save(tmp, garbage=1, deflate=True)
+    if replaced:
+        os.replace(tmp, pdf_path)
+    report = RecompressReport(
+        pages, replaced, hits, bytes_before, os.path.getsize(pdf_path), time.perf_counter() - t0
+    )
+    metrics.incr("merge.images_recompressed", replaced)
+    metrics.incr("merge.image_cache_hits", hits)
+    return report
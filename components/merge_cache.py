@@ -0,0 +1,159 @@
+"""
+結合結果のキャッシュ
+
+結合の計画（並び順の (結合元のパス・フィンガープリント, ページ, 回転・切り抜き) と保存設定）から
+キーを作り、同じ計画の結合はキャッシュのファイルをハードリンク（できなければコピー）で返す。
+登録はコピーで行い、結合先のファイルとキャッシュのファイルを共有しない。
+結合元が変更されるとフィンガープリントが変わるため、古い結果は使われない。
+キャッシュのファイルは登録時のサイズ・更新時刻を記録し、後から書き換えられたものは使わずに捨てる。
+合計サイズに上限を設け、最後に使ってから長いものから消す。
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Optional
+
+from components.file_fingerprint import file_fingerprint
+from components.path_manager import get_appdata_path
+
+MERGE_CACHE_DIR = "merge_cache"
+MERGE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+_INDEX_FILE = "index.json"
+# 結合結果の作り方を変えたら上げる（古い結果を使わないように）
+_PLAN_KEY_VERSION = 1
+
+
+def plan_key(pages, profile=None) -> Optional[str]:
+    """
+    結合の計画のキー。結合元が1つでも見つからなければNone（キャッシュしない）
+    pages: PDFPageInfoまたは{'pdf_path', 'page_num'}（回転・切り抜きを含む）のリスト
+    profile: 結果に影響する保存設定（画像縮小の設定など。reprで区別できるもの）
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"v{_PLAN_KEY_VERSION}:{profile!r}\n".encode())
+    fingerprints = {}
+    for info in pages:
+        if isinstance(info, dict):
+            pdf_path, page_num = info['pdf_path'], info['page_num']
+            rotation, crop = info.get('rotation', 0), info.get('crop')
+        else:
+            pdf_path, page_num = info.pdf_path, info.page_num
+            rotation, crop = getattr(info, 'rotation', 0), getattr(info, 'crop', None)
+        fp = fingerprints.get(pdf_path)
+        if fp is None:
+            fp = fingerprints[pdf_path] = file_fingerprint(pdf_path)
+            if fp is None:
+                return None
+        h.update(f"{pdf_path}\0{fp[0]}:{fp[1]}\0{page_num}\0{rotation % 360}\0{crop!r}\n".encode())
+    return h.hexdigest()
+
+
+def _place(src: str, dest: str, link: bool):
+    """srcをdestに置く（既存のdestは置き換える）。linkならまずハードリンクを試す"""
+    tmp = dest + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    if link:
+        try:
+            os.link(src, tmp)
+        except OSError:  # 別のドライブ・ハードリンク非対応
+            shutil.copyfile(src, tmp)
+    else:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+
+
+class MergeResultCache:
+    """キー -> 結合済みPDF"""
+
+    def __init__(self, directory=None, max_bytes: int = MERGE_CACHE_MAX_BYTES, link: bool = True):
+        self.directory = directory or get_appdata_path(MERGE_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.link = link
+        self._lock = threading.Lock()
+        self._index = None  # key -> {"size", "mtime_ns", "used"}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pdf")
+
+    def _load(self):
+        if self._index is not None:
+            return
+        try:
+            with open(os.path.join(self.directory, _INDEX_FILE), encoding="utf-8") as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def _save(self):
+        path = os.path.join(self.directory, _INDEX_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(path + ".tmp", path)
+
+    def _drop(self, key):
+        self._index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            self._load()
+            return sum(entry["size"] for entry in self._index.values())
+
+    def get(self, key: str, dest: str) -> bool:
+        """キャッシュにあればdestに置いてTrue。なければ（書き換えられていれば）False"""
+        with self._lock:
+            self._load()
+            entry = self._index.get(key)
+            if entry is None:
+                return False
+            if file_fingerprint(self._path(key)) != (entry["size"], entry["mtime_ns"]):
+                self._drop(key)
+                self._save()
+                return False
+            _place(self._path(key), dest, self.link)
+            entry["used"] = time.time()
+            self._save()
+            return True
+
+    def put(self, key: str, src: str):
+        """
+        結合したsrcを登録する。srcはその後も上書きされうるため、リンクせずコピーして持つ
+        上限より大きい結果は登録しない（コピーしてもすぐ消すことになるため）
+        """
+        if os.path.getsize(src) > self.max_bytes:
+            return
+        with self._lock:
+            self._load()
+            path = self._path(key)
+            _place(src, path, link=False)
+            size, mtime_ns = file_fingerprint(path)
+            self._index[key] = {"size": size, "mtime_ns": mtime_ns, "used": time.time()}
+            self._trim()
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._load()
+            for key in list(self._index):
+                self._drop(key)
+            self._save()
+
+    def _trim(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        # 上限の8割まで減らし、登録のたびに消さないようにする
+        for key in sorted(self._index, key=lambda k: self._index[k]["used"]):
+            if total <= self.max_bytes * 0.8:
+                break
+            total -= self._index[key]["size"]
+            self._drop(key)
@@ -0,0 +1,158 @@
+"""
+結合結果の検証
+
+結合したPDFを開き直し、ページ数と各ページの内容ハッシュ（content_hash.page_hash）を
+結合の計画（各ページの結合元）と比べる。結合元のハッシュはContentHashCacheに保存済みのものを使い、
+保存済みでない結合元は計画で使うページだけを計算する（ファイル全体・他のページは読まない）。
+結合先のページのハッシュはページ範囲に分けて並列に計算する。
+回転・切り抜きしたページは、大きさ・回転を結合元のページのもので置き換えて比べる。
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional
+
+# これより少ないページはプロセスを起動せずに計算する
+VERIFY_PARALLEL_MIN_PAGES = 500
+
+
+class PageMismatch(NamedTuple):
+    index: int  # 結合先のページ位置（0始まり）
+    pdf_path: Optional[str]  # 計画上の結合元（計画より多いページではNone）
+    page_num: Optional[int]
+    reason: str  # "content": 内容が違う / "missing": ページが足りない / "extra": ページが多い
+
+
+class VerifyReport(NamedTuple):
+    expected_pages: int
+    actual_pages: int
+    checked: int  # ハッシュを比べたページ数
+    unchecked: int  # 結合元のハッシュが得られず比べられなかったページ数
+    mismatches: List[PageMismatch]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+
+def _hash_pages(pdf_path, start, end, geometries):
+    """結合先のstart〜end-1ページのハッシュ（ワーカープロセスでも実行）"""
+    import fitz
+    from components.content_hash import page_hash
+    with fitz.open(pdf_path) as doc:
+        return [
+            page_hash(doc, doc.load_page(i), geometries.get(i))
+            for i in range(start, min(end, len(doc)))
+        ]
+
+
+def _page_count(pdf_path):
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+def _expected_hashes(plan, edited, hash_cache):
+    """
+    計画の各位置の結合元のページのハッシュ（得られなければNone）と、
+    回転・切り抜きしたページの結合元の大きさ・回転 {位置: page_geometry} を返す
+    """
+    import fitz
+    from components.content_hash import page_geometry, page_hash
+    expected = [None] * len(plan)
+    geometries = {}
+    stored = {}  # pdf_path -> 保存済みのハッシュ（なければNone）
+    todo = {}  # pdf_path -> 結合元を開いて調べる位置
+    for i, (pdf_path, page_num) in enumerate(plan):
+        if pdf_path not in stored:
+            try:
+                stored[pdf_path] = hash_cache.cached(pdf_path)
+            except Exception:
+                stored[pdf_path] = None
+        hashes = stored[pdf_path]
+        if hashes is not None:
+            if page_num < len(hashes[1]):
+                expected[i] = hashes[1][page_num]
+            if i not in edited:
+                continue
+        todo.setdefault(pdf_path, []).append(i)
+    for pdf_path, indices in todo.items():
+        computed = {}  # 同じページを複数回使う計画でも1回だけ計算する
+        try:
+            with fitz.open(pdf_path) as doc:
+                for i in indices:
+                    page_num = plan[i][1]
+                    if page_num >= len(doc):
+                        continue
+                    page = doc.load_page(page_num)
+                    if i in edited:
+                        geometries[i] = page_geometry(page)
+                    if stored[pdf_path] is None:
+                        if page_num not in computed:
+                            computed[page_num] = page_hash(doc, page)
+                        expected[i] = computed[page_num]
+        except Exception:
+            continue  # 結合元が読めなければ比べられない
+    return expected, geometries
+
+
+def verify_merge(output_path: str, pages, hash_cache=None,
+                 max_workers: Optional[int] = None) -> VerifyReport:
+    """
+    output_pathがpagesの順の各ページでできているかを確かめる
+    pages: 結合に渡したPDFPageInfoまたは{'pdf_path', 'page_num'}のリスト
+    hash_cache: 結合元のハッシュのContentHashCache（既定はアプリフォルダのもの。読むだけで書き足さない）
+    """
+    from components.content_hash import ContentHashCache
+    from components.perf_metrics import metrics
+    t0 = time.perf_counter()
+    if hash_cache is None:
+        hash_cache = ContentHashCache()
+    plan = []
+    edited = set()
+    for i, info in enumerate(pages):
+        if isinstance(info, dict):
+            plan.append((info['pdf_path'], info['page_num']))
+            rotation, crop = info.get('rotation', 0), info.get('crop')
+        else:
+            plan.append((info.pdf_path, info.page_num))
+            rotation, crop = getattr(info, 'rotation', 0), getattr(info, 'crop', None)
+        if rotation % 360 or crop is not None:
+            edited.add(i)
+    with metrics.span("merge.verify"):
+        expected, geometries = _expected_hashes(plan, edited, hash_cache)
+        actual_count = _page_count(output_path)
+        count = min(actual_count, len(plan))
+        workers = max(1, min(max_workers or os.cpu_count() or 1, count // VERIFY_PARALLEL_MIN_PAGES))
+        if workers == 1:
+            actual = _hash_pages(output_path, 0, count, geometries)
+        else:
+            import multiprocessing
+            step = (count + workers - 1) // workers
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                parts = [
+                    pool.submit(
+                        _hash_pages, output_path, start, start + step,
+                        {i: g for i, g in geometries.items() if start <= i < start + step},
+                    )
+                    for start in range(0, count, step)
+                ]
+                actual = [h for part in parts for h in part.result()]
+    mismatches = []
+    checked = unchecked = 0
+    for i in range(count):
+        if expected[i] is None:
+            unchecked += 1
+            continue
+        checked += 1
+        if actual[i] != expected[i]:
+            mismatches.append(PageMismatch(i, plan[i][0], plan[i][1], "content"))
+    for i in range(count, len(plan)):
+        mismatches.append(PageMismatch(i, plan[i][0], plan[i][1], "missing"))
+    for i in range(count, actual_count):
+        mismatches.append(PageMismatch(i, None, None, "extra"))
+    metrics.incr("merge.verify_mismatches", len(mismatches))
+    return VerifyReport(len(plan), actual_count, checked, unchecked, mismatches, time.perf_counter() - t0)
@@ -0,0 +1,177 @@
+"""
+ページ群を複数のPDFへ分けて書き出す
+
+書き出し方（どのページをどのファイルへ）を先に決め、各ファイルの結合を別プロセスで並列に行う。
+file  : 結合元ファイルごと（表示順で最初に現れた順）
+every : Nページごと
+ranges: 連続する選択範囲ごと
+出力名は書き出し方と順番から決まり、同じ入力なら毎回同じ名前になる。
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, NamedTuple, Optional
+
+EXPORT_MODES = ("file", "every", "ranges")
+
+
+class ExportJob(NamedTuple):
+    output_path: str
+    pages: list  # [(pdf_path, page_num), ...]（回転・切り抜きのあるページは (…, rotation, crop)）
+
+
+class ExportResult(NamedTuple):
+    output_path: str
+    pages: int
+    seconds: float
+    error: Optional[str]  # 失敗したときの内容（成功時はNone）
+
+
+def _page_tuple(info):
+    if isinstance(info, dict):
+        page = info['pdf_path'], info['page_num']
+        rotation, crop = info.get('rotation', 0), info.get('crop')
+    else:
+        page = info.pdf_path, info.page_num
+        rotation, crop = getattr(info, 'rotation', 0), getattr(info, 'crop', None)
+    if rotation or crop is not None:
+        return page + (rotation, crop)
+    return page
+
+
+def _file_key(path):
+    """同じファイルを指すパスを同一視する比較用キー"""
+    return os.path.normcase(os.path.realpath(path))
+
+
+def _numbered(prefix, i, total):
+    width = max(3, len(str(total)))
+    return f"{prefix}_{i:0{width}d}"
+
+
+def plan_export(pages, out_dir: str, mode: str = "file", every: int = 10,
+                ranges=None, prefix: str = "part") -> List[ExportJob]:
+    """
+    書き出す各ファイルとそのページを決める
+    pages: PDFPageInfoまたは{'pdf_path', 'page_num'}の表示順のリスト
+    mode="ranges"ではranges（pagesの位置の区間 [(start, end), ...] またはRangeSelection）ごとに分ける
+    出力名が結合元のファイルと重なるときは "_export" を付けて、結合元を上書きしない
+    """
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"未対応の書き出し方: {mode}")
+    pages = [_page_tuple(info) for info in pages]
+    groups = []  # [(名前, ページ), ...]
+    if mode == "file":
+        by_file = {}
+        for page in pages:
+            by_file.setdefault(page[0], []).append(page)
+        used = set()
+        for pdf_path, group in by_file.items():
+            stem = os.path.splitext(os.path.basename(pdf_path))[0]
+            name, n = stem, 1
+            while name.lower() in used:  # 別フォルダの同名ファイル
+                n += 1
+                name = f"{stem}_{n}"
+            used.add(name.lower())
+            groups.append((name, group))
+    elif mode == "every":
+        if every < 1:
+            raise ValueError("every は1以上を指定してください")
+        total = (len(pages) + every - 1) // every
+        for i, start in enumerate(range(0, len(pages), every)):
+            groups.append((_numbered(prefix, i + 1, total), pages[start:start + every]))
+    else:
+        spans = getattr(ranges, "ranges", ranges) or []
+        spans = [(max(0, s), min(e, len(pages))) for s, e in spans if s < len(pages) and s < e]
+        for i, (start, end) in enumerate(spans):
+            name = f"{_numbered(prefix, i + 1, len(spans))}_p{start + 1}-{end}"
+            groups.append((name, pages[start:end]))
+    sources = {_file_key(page[0]) for page in pages}
+    jobs, used = [], set()
+    for name, group in groups:
+        n = 1
+        if not group:
+            continue
+        path = os.path.join(out_dir, f"{name}.pdf")
+        if _file_key(path) in sources:  # 結合元と同じフォルダへの書き出し
+            name = f"{name}_export"
+            path = os.path.join(out_dir, f"{name}.pdf")
+        while _file_key(path) in sources or _file_key(path) in used:
+            n += 1
+            path = os.path.join(out_dir, f"{name}_{n}.pdf")
+        used.add(_file_key(path))
+        jobs.append(ExportJob(path, group))
+    return jobs
+
+
+def _export_one(job: ExportJob) -> ExportResult:
+    """1ファイル分を結合して書き出す（ワーカープロセスで実行）"""
+    from components.pdf_save_utils import PDFPageInfo, save_pdf_pages
+    t = time.perf_counter()
+    try:
+        save_pdf_pages([PDFPageInfo(*page) for page in job.pages], job.output_path)
+    except Exception as e:
+        return ExportResult(job.output_path, len(job.pages), time.perf_counter() - t, f"{type(e).__name__}: {e}")
+    return ExportResult(job.output_path, len(job.pages), time.perf_counter() - t, None)
+
+
+def export_pdf_parts(jobs: List[ExportJob], max_workers: Optional[int] = None,
+                     progress=None, cancelled=None) -> List[ExportResult]:
+    """
+    jobsを並列に書き出し、jobsと同じ順で結果を返す
+    max_workers: プロセス数（既定はCPU数。1なら同じプロセスで順に書き出す）
+    progress(完了数, 全体数, ExportResult): 1ファイル書き出すごとに呼ぶ
+    cancelled(): Trueを返したら未着手の分を取りやめる（取りやめた分は結果に含めない）
+    1ファイルの失敗で他を止めず、失敗は結果のerrorに入れる
+    出力先がいずれかのjobの結合元と同じjobは書き出さず、失敗として返す
+    """
+    from components.perf_metrics import metrics
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    # 書き出し中に他のジョブが読む結合元へは書き込まない
+    sources = {_file_key(page[0]) for job in jobs for page in job.pages}
+    refused = {
+        i: ExportResult(job.output_path, len(job.pages), 0.0, "出力先が結合元のファイルと同じです")
+        for i, job in enumerate(jobs) if _file_key(job.output_path) in sources
+    }
+    for out_dir in {os.path.dirname(job.output_path) for job in jobs}:
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs) - len(refused)))
+    results = [None] * len(jobs)
+    done = 0
+
+    def finished(i, result):
+        nonlocal done
+        results[i] = result
+        done += 1
+        if result.error:
+            metrics.incr("export.failures")
+        if progress is not None:
+            progress(done, len(jobs), result)
+
+    with metrics.span("export"):
+        for i, result in refused.items():
+            finished(i, result)
+        todo = [(i, job) for i, job in enumerate(jobs) if i not in refused]
+        if workers == 1:
+            for i, job in todo:
+                if cancelled is not None and cancelled():
+                    break
+                finished(i, _export_one(job))
+        else:
+            import multiprocessing
+            # Qtのスレッドを持つプロセスをforkしないよう、ワーカーは新しく起動する
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = {pool.submit(_export_one, job): i for i, job in todo}
+                for future in as_completed(futures):
+                    finished(futures[future], future.result())
+                    if cancelled is not None and cancelled():
+                        for pending in futures:
+                            pending.cancel()
+                        break
+    metrics.incr("export.files", sum(1 for r in results if r is not None and not r.error))
+    metrics.set_gauge("export.workers", workers)
+    return [r for r in results if r is not None]
@@ -9,6 +9,7 @@ class PDFMenuBar(QMenuBar):
     filesAdded = pyqtSignal(list)
     folderAdded = pyqtSignal(str)
     mergeSelectedPDFs = pyqtSignal()
+    watchFoldersToggled = pyqtSignal(bool)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -31,10 +32,28 @@ class PDFMenuBar(QMenuBar):
         add_folder_action.triggered.connect(self.add_folder)
         file_menu.addAction(add_folder_action)
 
+        self.watch_folders_action = QAction("フォルダを監視", self)
+        self.watch_folders_action.setCheckable(True)
+        self.watch_folders_action.toggled.connect(self.watchFoldersToggled)
+        file_menu.addAction(self.watch_folders_action)
+
         merge_action = QAction("選択PDFをマージして保存", self)
         merge_action.triggered.connect(self.mergeSelectedPDFs)
         file_menu.addAction(merge_action)
 
+        self.downsample_images_action = QAction("結合時に画像を縮小（150dpi）", self)
+        self.downsample_images_action.setCheckable(True)
+        file_menu.addAction(self.downsample_images_action)
+
+        self.verify_merge_action = QAction("結合後に内容を検証", self)
+        self.verify_merge_action.setCheckable(True)
+        file_menu.addAction(self.verify_merge_action)
+
+        # 結合結果をアプリフォルダにコピーして持つため既定では使わない
+        self.reuse_merge_action = QAction("前回の結合結果を再利用", self)
+        self.reuse_merge_action.setCheckable(True)
+        file_menu.addAction(self.reuse_merge_action)
+
     def open_files(self):
         files, _ = QFileDialog.getOpenFileNames(self, "PDFファイルを開く", "", "PDF Files (*.pdf)")
         if files:
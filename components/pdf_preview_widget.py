@@ -15,7 +15,7 @@ from PyQt6.QtWidgets import (
     QFileDialog,
     QColorDialog,
 )
-from PyQt6.QtCore import Qt, QRect, QPoint
+from PyQt6.QtCore import Qt, QRect, QPoint, QEvent
 from PyQt6.QtGui import (
     QPixmap,
     QImage,
@@ -24,6 +24,8 @@ from PyQt6.QtGui import (
     QColor,
     QFont,
     QFontMetrics,
+    QKeySequence,
+    QShortcut,
 )
 from PyQt6.QtPrintSupport import QPrinter
 import fitz
@@ -31,6 +33,8 @@ import os
 import tempfile
 from .selection_box import SelectionBox
 from .overlay_editor_mixin import OverlayEditorMixin
+from .thumbnail_render import pixmap_to_qimage
+from .undo_log import UndoLog
 
 class PDFPreviewWidget(OverlayEditorMixin, QWidget):
     """PDFをプレビュー表示するウィジェット（QLabel廃止・自前描画）"""
@@ -40,7 +44,7 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
         self.setMinimumSize(300, 300)
         self.pdf_path = None
         self.doc = None
-        self.pixmap = None  # 原寸画像
+        self.pixmap = None  # 原寸画像（論理サイズ=2倍描画、物理ピクセルは画面のDPR倍）
         # overlay_textsは原寸(100%)座標で保持する
         # 各要素は (QRect, str, QFont, Qt.AlignmentFlag, QColor)
         self.overlay_texts = []
@@ -54,6 +58,11 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
         self._overlay_resizing = False
         self._overlay_resize_handle = None
         self._overlay_handle_size = 6
+        # テキストボックスの編集の取り消し（書き換えた要素の前後だけを記録）
+        self.undo_log = UndoLog()
+        self._overlay_drag_origin = None  # ドラッグ開始時の (index, 要素)
+        QShortcut(QKeySequence.StandardKey.Undo, self, self.undo_log.undo)
+        QShortcut(QKeySequence.StandardKey.Redo, self, self.undo_log.redo)
 
     def _overlay_handle_rects(self, rect: QRect) -> dict:
         s = self._overlay_handle_size
@@ -72,6 +81,29 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
             return "move"
         return None
 
+    def _pixmap_size(self):
+        """原寸画像の論理サイズ (幅, 高さ)。オーバーレイ座標はこの座標系"""
+        size = self.pixmap.deviceIndependentSize()
+        return int(size.width()), int(size.height())
+
+    def _render_page(self):
+        """画面のデバイスピクセル比に合わせて物理ピクセルで描画する"""
+        dpr = self.devicePixelRatioF()
+        page = self.doc.load_page(0)
+        pix = page.get_pixmap(matrix=fitz.Matrix(2 * dpr, 2 * dpr), alpha=False)
+        img = pixmap_to_qimage(pix)
+        img.setDevicePixelRatio(dpr)
+        self.pixmap = QPixmap.fromImage(img)
+
+    def event(self, event):
+        dpr_change = getattr(QEvent.Type, "DevicePixelRatioChange", None)
+        if dpr_change is not None and event.type() == dpr_change:
+            if self.doc is not None and self.pixmap is not None:
+                if self.pixmap.devicePixelRatio() != self.devicePixelRatioF():
+                    self._render_page()
+                    self.update()
+        return super().event(event)
+
     def set_scale(self, scale: float):
         """表示倍率を設定 (1.0 = 100%)"""
         if not self.pixmap:
@@ -94,10 +126,8 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
             )
             self._edit_box.setGeometry(box_rect)
         self.scale_factor = scale
-        self.resize(
-            int(self.pixmap.width() * scale),
-            int(self.pixmap.height() * scale),
-        )
+        w, h = self._pixmap_size()
+        self.resize(int(w * scale), int(h * scale))
         self.update()
     
     def set_pdf(self, pdf_path):
@@ -110,19 +140,12 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
             self.doc = fitz.open(pdf_path)
             self.pdf_path = pdf_path
             if len(self.doc) > 0:
-                page = self.doc.load_page(0)
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
-                self.pixmap = QPixmap.fromImage(img)
-                self.setFixedSize(
-                    int(self.pixmap.width() * self.scale_factor),
-                    int(self.pixmap.height() * self.scale_factor),
-                )
-                self.resize(
-                    int(self.pixmap.width() * self.scale_factor),
-                    int(self.pixmap.height() * self.scale_factor),
-                )
+                self._render_page()
+                w, h = self._pixmap_size()
+                self.setFixedSize(int(w * self.scale_factor), int(h * self.scale_factor))
+                self.resize(int(w * self.scale_factor), int(h * self.scale_factor))
                 self.overlay_texts = []
+                self.undo_log.clear()
                 self.selection = SelectionBox()
                 self.update()
                 return True
@@ -138,13 +161,13 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
     def paintEvent(self, event):
         painter = QPainter(self)
         if self.pixmap:
-            scaled = self.pixmap.scaled(
-                int(self.pixmap.width() * self.scale_factor),
-                int(self.pixmap.height() * self.scale_factor),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
+            # 物理ピクセルの原寸画像を論理座標の表示サイズへ直接描画する
+            w, h = self._pixmap_size()
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawPixmap(
+                QRect(0, 0, int(w * self.scale_factor), int(h * self.scale_factor)),
+                self.pixmap,
             )
-            painter.drawPixmap(0, 0, scaled)
         # 上書きテキスト描画
         for i, item in enumerate(self.overlay_texts):
             # 旧バージョンのデータも受け入れ
@@ -207,6 +230,7 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
                 hit = self._overlay_hit_test(rect, event.pos())
                 if hit:
                     self._selected_overlay = i
+                    self._overlay_drag_origin = (i, item)
                     if hit == "move":
                         self._overlay_resizing = False
                         self._drag_offset = event.pos() - rect.topLeft()
@@ -237,9 +261,7 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
                 elif action == right_act:
                     self.change_overlay_alignment(self._selected_overlay, Qt.AlignmentFlag.AlignRight)
                 elif action == delete_action:
-                    self.overlay_texts.pop(self._selected_overlay)
-                    self._selected_overlay = None
-                    self.update()
+                    self._set_overlay("テキストの削除", self._selected_overlay, None)
                 return
             menu = QMenu(self)
             if self.selection.is_active():
@@ -310,6 +332,13 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
+            if self._overlay_drag_origin is not None:
+                # ドラッグ中の途中経過は記録せず、開始時と終了時の差だけを1手順にする
+                idx, before = self._overlay_drag_origin
+                self._overlay_drag_origin = None
+                if idx < len(self.overlay_texts) and self.overlay_texts[idx] != before:
+                    after = self.overlay_texts[idx]
+                    self._push_overlay_edit("テキストの移動", idx, before, after)
             self.selection.end_action()
             self._drag_offset = QPoint()
             self._overlay_resizing = False
@@ -345,8 +374,9 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
             int(rect.width() / self.scale_factor),
             int(rect.height() / self.scale_factor),
         )
-        self.overlay_texts.append(
-            (rect_orig, text, edit.font(), edit.alignment(), QColor(0, 0, 0, 0))
+        self._set_overlay(
+            "テキストの追加", len(self.overlay_texts),
+            (rect_orig, text, edit.font(), edit.alignment(), QColor(0, 0, 0, 0)),
         )
         edit.deleteLater()
         self._edit_box = None
@@ -401,8 +431,7 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
         )
         if not color.isValid():
             color = QColor(0, 0, 0, 0)
-        self.overlay_texts.append((rect, text, font, align, color))
-        self.update()
+        self._set_overlay("テキストの追加", len(self.overlay_texts), (rect, text, font, align, color))
 
     def change_overlay_font(self, idx):
         item = self.overlay_texts[idx]
@@ -450,8 +479,7 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
         )
         if not color.isValid():
             color = QColor(0, 0, 0, 0)
-        self.overlay_texts[idx] = (new_rect, text, new_font, align, color)
-        self.update()
+        self._set_overlay("書体の変更", idx, (new_rect, text, new_font, align, color))
 
     def change_overlay_alignment(self, idx, align):
         item = self.overlay_texts[idx]
@@ -467,7 +495,32 @@ class PDFPreviewWidget(OverlayEditorMixin, QWidget):
             rect, text = item
             font = QFont()
             color = QColor(0, 0, 0, 0)
-        self.overlay_texts[idx] = (rect, text, font, align, color)
+        self._set_overlay("揃えの変更", idx, (rect, text, font, align, color))
+
+    def _set_overlay(self, label, idx, item):
+        """
+        idx番目のテキストボックスをitemにする（idxが末尾なら追加、itemがNoneなら削除）
+        変更前後の要素だけを取り消しの記録に残す
+        """
+        before = self.overlay_texts[idx] if idx < len(self.overlay_texts) else None
+        self._replace_overlay(idx, before, item)
+        self._push_overlay_edit(label, idx, before, item)
+
+    def _push_overlay_edit(self, label, idx, before, after):
+        self.undo_log.push(
+            label,
+            lambda: self._replace_overlay(idx, after, before),
+            lambda: self._replace_overlay(idx, before, after),
+        )
+
+    def _replace_overlay(self, idx, before, after):
+        if before is None:
+            self.overlay_texts.insert(idx, after)
+        elif after is None:
+            self.overlay_texts.pop(idx)
+        else:
+            self.overlay_texts[idx] = after
+        self._selected_overlay = idx if after is not None else None
         self.update()
 
     def save_pdf(self, overwrite=False):
@@ -1,21 +1,135 @@
 import fitz
-from typing import List, Union, NamedTuple
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import List, Optional, Union, NamedTuple
+from components.perf_metrics import metrics, process_rss_bytes
+
+# 結合中に同時に開いておく結合元PDFの上限（ファイルハンドル数・推定メモリ）
+MAX_OPEN_SOURCES = 64
+MAX_OPEN_SOURCE_BYTES = 256 * 1024 * 1024
+# 分割モード（一時ファイルへ区切りごとに書き出す）の既定値
+CHUNKED_MERGE_MIN_PAGES = 2000
+MERGE_MEMORY_BUDGET = 512 * 1024 * 1024
+MERGE_CHUNK_PAGES = 1000
+# 分割モードで連続ページを一度に挿入する上限（この間隔でメモリ予算を確かめる）
+MERGE_STEP_PAGES = 100
 
 
 class PDFPageInfo(NamedTuple):
     pdf_path: str
     page_num: int
+    rotation: int = 0  # 元の向きに加える回転（90の倍数、時計回り）
+    crop: Optional[tuple] = None  # 切り抜き (x0, y0, x1, y1)。元の向きで表示したページに対する割合
 
 
-def save_pdf_pages(
-    pages: List[Union[PDFPageInfo, dict]], save_path: str
-) -> None:
+def page_edit(info):
+    """ページの回転・切り抜き (rotation, crop)。指定がなければ (0, None)"""
+    if isinstance(info, dict):
+        return info.get('rotation', 0) % 360, info.get('crop')
+    return getattr(info, 'rotation', 0) % 360, getattr(info, 'crop', None)
+
+
+def apply_page_edit(page, rotation: int, crop=None):
+    """結合先のページに切り抜き（CropBox）と回転（/Rotate）を設定する。内容は描き直さない"""
+    if crop is not None:
+        x0, y0, x1, y1 = crop
+        width, height = page.rect.width, page.rect.height
+        # 表示上の矩形を回転前の座標に戻し、CropBoxの原点（MediaBox基準）を足す
+        rect = fitz.Rect(x0 * width, y0 * height, x1 * width, y1 * height) * page.derotation_matrix
+        rect.normalize()
+        box = page.cropbox
+        page.set_cropbox(rect + (box.x0, box.y0, box.x0, box.y0))
+    if rotation % 360:
+        page.set_rotation((page.rotation + rotation) % 360)
+
+
+def _handle_limit() -> int:
+    """プロセスのファイルハンドル上限の1/4（取得できない環境ではMAX_OPEN_SOURCES）"""
+    try:
+        import resource
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (ImportError, ValueError, OSError):
+        return MAX_OPEN_SOURCES
+    if soft == resource.RLIM_INFINITY:
+        return MAX_OPEN_SOURCES
+    return max(1, min(MAX_OPEN_SOURCES, soft // 4))
+
+
+class SourceDocumentCache:
     """
-    指定したページ群を1つのPDFとして保存する。
-    pages: PDFPageInfoまたは{'pdf_path': str, 'page_num': int}のリスト
-    save_path: 保存先パス
+    結合元PDFを開いたまま使い回す上限付きLRU
+    開いている数と推定メモリ（ファイルサイズの合計）の両方に上限を設け、
+    超えたら最も長く使っていないものから閉じる。on_closeは閉じる直前に呼ぶ
+    """
+
+    def __init__(self, max_open=None, max_bytes=MAX_OPEN_SOURCE_BYTES, on_close=None):
+        self.max_open = max_open or _handle_limit()
+        self.max_bytes = max_bytes
+        self.on_close = on_close
+        self._docs = OrderedDict()  # pdf_path -> (doc, 推定バイト数)
+        self._bytes = 0
+        self.opens = 0
+        self.hits = 0
+        self.evictions = 0
+        self.peak_open = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close_all()
+
+    def get(self, pdf_path: str):
+        entry = self._docs.get(pdf_path)
+        if entry is not None:
+            self._docs.move_to_end(pdf_path)
+            self.hits += 1
+            return entry[0]
+        try:
+            size = os.path.getsize(pdf_path)
+        except OSError:
+            size = 0
+        # 開く前に空きを作り、上限を一時的にも超えないようにする
+        while self._docs and (
+            len(self._docs) >= self.max_open or self._bytes + size > self.max_bytes
+        ):
+            self._evict()
+        doc = fitz.open(pdf_path)
+        self._docs[pdf_path] = (doc, size)
+        self._bytes += size
+        self.opens += 1
+        self.peak_open = max(self.peak_open, len(self._docs))
+        return doc
+
+    def _evict(self):
+        _, (doc, size) = self._docs.popitem(last=False)
+        self._bytes -= size
+        self.evictions += 1
+        self._close(doc)
+
+    def _close(self, doc):
+        if self.on_close is not None:
+            self.on_close(doc)
+        doc.close()
+
+    def close_all(self):
+        while self._docs:
+            _, (doc, _) = self._docs.popitem(last=False)
+            self._close(doc)
+        self._bytes = 0
+
+
+def _page_runs(pages):
+    """
+    同じファイルの連続するページを (pdf_path, 開始, 終了, 編集) にまとめる
+    編集は回転・切り抜きのあるページだけの [(run内の位置, rotation, crop), ...]
     """
-    pdf_writer = fitz.open()
+    run = None
     for info in pages:
         if isinstance(info, dict):
             pdf_path = info['pdf_path']
@@ -23,9 +137,197 @@ def save_pdf_pages(
         else:
             pdf_path = info.pdf_path
             page_num = info.page_num
-        with fitz.open(pdf_path) as src_doc:
-            pdf_writer.insert_pdf(
-                src_doc, from_page=page_num, to_page=page_num
-            )
-    pdf_writer.save(save_path)
-    pdf_writer.close() 
\ No newline at end of file
+        rotation, crop = page_edit(info)
+        if run is not None and run[0] == pdf_path and run[2] + 1 == page_num:
+            run[2] = page_num
+        else:
+            if run is not None:
+                yield tuple(run)
+            run = [pdf_path, page_num, page_num, []]
+        if rotation or crop is not None:
+            run[3].append((page_num - run[1], rotation, crop))
+    if run is not None:
+        yield tuple(run)
+
+
+def _has_links(doc, first, last) -> bool:
+    """first〜lastページにリンク注釈があるか（なければリンクの付け直しを省く）"""
+    return any(
+        annot_type == fitz.PDF_ANNOT_LINK
+        for page_num in range(first, last + 1)
+        for _, annot_type, _ in doc.page_annot_xrefs(page_num)
+    )
+
+
+def _verify(save_path, pages, hash_cache):
+    """保存したPDFを検証する。検証自体に失敗したらNone（結合の結果は変えない）"""
+    from components.merge_verify import verify_merge
+    try:
+        return verify_merge(save_path, pages, hash_cache)
+    except Exception as e:
+        print(f"結合結果の検証失敗: {e}")
+        metrics.record_error("merge.verify", e)
+        return None
+
+
+class MergeReport(NamedTuple):
+    pages: int
+    chunks: int  # 書き出した区切りの数（分割しない場合は1）
+    peak_rss_bytes: Optional[int]  # 結合中の常駐メモリの最大（取得できない環境ではNone）
+    seconds: float
+    images: Optional[object] = None  # 画像を縮小した場合のRecompressReport
+    cached: bool = False  # 結合結果のキャッシュから置いた
+    verify: Optional[object] = None  # 検証した場合のVerifyReport
+
+
+def save_pdf_pages(
+    pages: List[Union[PDFPageInfo, dict]], save_path: str,
+    max_open=None, max_open_bytes: int = MAX_OPEN_SOURCE_BYTES,
+    memory_budget: Optional[int] = None, chunk_pages: Optional[int] = None,
+    image_profile=None, image_cache=None, result_cache=None,
+    verify: bool = False, hash_cache=None,
+) -> MergeReport:
+    """
+    指定したページ群を1つのPDFとして保存する。
+    pages: PDFPageInfoまたは{'pdf_path': str, 'page_num': int}のリスト
+    save_path: 保存先パス
+    結合元は上限付きLRUで開いたまま使い回し、同じファイルの連続ページは一度に挿入する
+    回転・切り抜き（PDFPageInfo.rotation/crop、dictでは同名のキー）は挿入したページの属性として設定する
+    memory_budget（バイト）・chunk_pagesを指定するか、ページ数がCHUNKED_MERGE_MIN_PAGES以上なら
+    分割モード: chunk_pagesページごと、または区切り内のメモリ増加が予算の半分を超えたら
+    一時ファイルへ書き出し（2回目以降は増分保存）、結合中のメモリを予算内に抑える
+    （同じファイルの連続ページもMERGE_STEP_PAGESずつ挿入し、区切りの途中で分ける）
+    pagesが空なら何も書き出さない
+    image_profile（image_recompress.ImageProfile）を指定すると、保存後に目標dpiを超える画像を縮小する
+    result_cache（merge_cache.MergeResultCache）を指定すると、同じ計画の結合結果があればそれを置いて返す
+    verify=Trueなら保存したPDFのページ数・各ページの内容を計画と比べる（merge_verify.verify_merge）。
+    画像の縮小で内容が変わるため、縮小する場合は縮小前に比べる（キャッシュから置いた結果は比べない）
+    """
+    t0 = time.perf_counter()
+    if not pages:
+        return MergeReport(0, 0, None, time.perf_counter() - t0)
+    key = None
+    if result_cache is not None:
+        from components.merge_cache import plan_key
+        try:
+            key = plan_key(pages, image_profile)
+            hit = key is not None and result_cache.get(key, save_path)
+        except Exception as e:  # キャッシュが使えなくても結合はする
+            print(f"結合結果キャッシュの読み込み失敗: {e}")
+            metrics.record_error("merge.cache", e)
+            key, hit = None, False
+        if hit:
+            metrics.incr("merge.result_cache_hits")
+            checked = _verify(save_path, pages, hash_cache) if verify and image_profile is None else None
+            return MergeReport(len(pages), 0, None, time.perf_counter() - t0, cached=True, verify=checked)
+    chunked = memory_budget is not None or chunk_pages is not None or len(pages) >= CHUNKED_MERGE_MIN_PAGES
+    step = None
+    part_path = None
+    if chunked:
+        memory_budget = memory_budget or MERGE_MEMORY_BUDGET
+        chunk_pages = chunk_pages or MERGE_CHUNK_PAGES
+        step = max(1, min(chunk_pages, MERGE_STEP_PAGES))
+        # 開いたままの結合元も予算に含める
+        max_open_bytes = min(max_open_bytes, memory_budget // 4)
+        # 書き出し途中の一時ファイルは既存のファイルと重ならない名前で作る
+        fd, part_path = tempfile.mkstemp(
+            prefix=os.path.basename(save_path) + ".", suffix=".part",
+            dir=os.path.dirname(os.path.abspath(save_path)),
+        )
+        os.close(fd)
+    start_rss = process_rss_bytes()
+    peak_rss = start_rss
+    chunks = 0
+    writer = fitz.open()
+
+    def forget_source(doc):
+        # 閉じた結合元の対応表を残すと結合元の数だけ増え続ける
+        if writer is not None:
+            getattr(writer, "Graftmaps", {}).pop(getattr(doc, "_graft_id", None), None)
+
+    def flush():
+        nonlocal writer, chunks
+        if chunks == 0:
+            writer.save(part_path)
+        else:
+            writer.saveIncr()
+        writer.close()
+        writer = None
+        chunks += 1
+
+    with metrics.span("merge"):
+        sources = SourceDocumentCache(max_open, max_open_bytes, on_close=forget_source)
+        try:
+            with sources:
+                chunk_rss = start_rss
+                in_chunk = 0
+                for pdf_path, first, last, edits in _page_runs(pages):
+                    start = first
+                    while start <= last:
+                        # 分割モードでは区切りの残りとstepで切り、長い連続ページも区切りをまたがせない
+                        end = last if step is None else min(last, start + min(step, chunk_pages - in_chunk) - 1)
+                        if writer is None:
+                            writer = fitz.open(part_path)  # 書き出し済みの区切りに追記する
+                        src_doc = sources.get(pdf_path)
+                        # final=Falseで対応表を残し、共有のフォント・画像を挿入のたびに複製しない
+                        # （対応表はLRUが結合元を閉じるときにforget_sourceで捨てる）
+                        writer.insert_pdf(
+                            src_doc, from_page=start, to_page=end,
+                            links=_has_links(src_doc, start, end), final=False,
+                        )
+                        base = writer.page_count - (end - start + 1)
+                        for offset, rotation, crop in edits:
+                            if start <= first + offset <= end:
+                                apply_page_edit(writer[base + first + offset - start], rotation, crop)
+                        in_chunk += end - start + 1
+                        start = end + 1
+                        rss = process_rss_bytes()
+                        if rss is not None:
+                            peak_rss = max(peak_rss or 0, rss)
+                        if chunked and (
+                            in_chunk >= chunk_pages
+                            or (rss is not None and chunk_rss is not None and rss - chunk_rss > memory_budget // 2)
+                        ):
+                            with metrics.span("merge.flush"):
+                                flush()
+                            chunk_rss = process_rss_bytes()
+                            in_chunk = 0
+            if chunked:
+                if writer is not None:
+                    flush()
+                os.replace(part_path, save_path)
+            else:
+                writer.save(save_path)
+                writer.close()
+                writer = None
+                chunks = 1
+        finally:
+            if writer is not None:
+                writer.close()
+            if part_path is not None and os.path.exists(part_path):
+                os.remove(part_path)
+    # 以降は保存済みの結果に対する付加的な処理のため、失敗しても結合は失敗にしない
+    checked = _verify(save_path, pages, hash_cache) if verify else None
+    images = None
+    if image_profile is not None:
+        from components.image_recompress import recompress_images
+        try:
+            images = recompress_images(save_path, image_profile, image_cache)
+        except Exception as e:
+            print(f"画像の縮小失敗: {e}")
+            metrics.record_error("merge.images", e)
+    if key is not None and (image_profile is None or images is not None):
+        try:
+            result_cache.put(key, save_path)
+        except Exception as e:
+            print(f"結合結果キャッシュの登録失敗: {e}")
+            metrics.record_error("merge.cache", e)
+    report = MergeReport(len(pages), chunks, peak_rss, time.perf_counter() - t0, images, verify=checked)
+    metrics.incr("merge.pages", len(pages))
+    metrics.incr("merge.source_opens", sources.opens)
+    metrics.incr("merge.source_reuses", sources.hits)
+    metrics.set_gauge("merge.peak_open_sources", sources.peak_open)
+    metrics.set_gauge("merge.chunks", chunks)
+    if peak_rss is not None:
+        metrics.set_gauge("merge.peak_rss_bytes", peak_rss)
+    return report
@@ -0,0 +1,305 @@
+"""
+作業状態ファイル（ページ順序・選択状態・ページの回転/切り抜き）の読み書き
+
+従来のJSON形式に加えて、大規模セッション向けのコンパクト形式を扱う。
+コンパクト形式はパスを重複排除したパス表と、連続ページのランレングス
+(またはページ番号配列) で保存し、パスごとにフィンガープリントを持つ。
+読み込み時は先頭のマジックで形式を判別するため、既存のJSONもそのまま読める。
+コンパクト形式のページ列・選択範囲は配列のまま返し（PageColumns・RangePairs）、タプルは取り出すときに作る。
+回転・切り抜きは指定のあるページだけを (位置, 回転, 切り抜き) で末尾に持つ（バージョン2以降）。
+"""
+import json
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence as SequenceABC
+from itertools import chain, repeat
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from components.file_fingerprint import file_fingerprint
+
+COMPACT_STATE_EXT = ".pdfstate"
+COMPACT_STATE_MAGIC = b"PDFMST"
+COMPACT_STATE_VERSION = 2
+
+# ページ列の格納方式
+_LAYOUT_RUNS = 0    # (パス番号, 開始ページ, 長さ) のラン
+_LAYOUT_ARRAYS = 1  # (パス番号, ページ番号) の配列
+
+_HEADER = struct.Struct("<6sHBI")   # magic, version, layout, パス数
+_PATH_ENTRY = struct.Struct("<Iqq")  # UTF-8長, サイズ, 更新時刻ns
+_COUNT = struct.Struct("<I")
+_EDIT_ENTRY = struct.Struct("<IHB4d")  # 位置, 回転, 切り抜きの有無, 切り抜き
+
+_U32 = "I" if array("I").itemsize == 4 else "L"
+
+
+class _TupleColumns(SequenceABC):
+    """配列のまま持ち、要素のタプルは取り出すときに作る列（リストと同じように比較できる）"""
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._item(j) for j in range(*i.indices(len(self)))]
+        return self._item(i)
+
+    def __eq__(self, other):
+        if not isinstance(other, SequenceABC):
+            return NotImplemented
+        return len(other) == len(self) and all(a == tuple(b) for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+class PageColumns(_TupleColumns):
+    """
+    (pdf_path, page_num) の列をパス表と列（パス番号・ページ番号、またはラン）のまま持つ
+    読み込み時にページ数分のタプルを作らない
+    """
+
+    def __init__(self, paths, path_indices=None, page_nums=None, runs=None):
+        self.paths = paths
+        self._path_indices = path_indices
+        self._page_nums = page_nums
+        self._runs = runs  # (パス番号, 開始ページ, 長さ) の配列の組。位置で取り出すまで展開しない
+        self._len = len(page_nums) if runs is None else sum(runs[2])
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        if self._runs is not None:
+            idx, start, length = self._runs
+            return zip(
+                chain.from_iterable(map(repeat, map(self.paths.__getitem__, idx), length)),
+                chain.from_iterable(map(range, start, map(int.__add__, start, length))),
+            )
+        return zip(map(self.paths.__getitem__, self._path_indices), self._page_nums)
+
+    def _item(self, i):
+        if self._runs is not None:
+            idx, start, length = self._runs
+            self._path_indices, self._page_nums = array(_U32), array(_U32)
+            for path_index, first, n in zip(idx, start, length):
+                self._path_indices.extend(repeat(path_index, n))
+                self._page_nums.extend(range(first, first + n))
+            self._runs = None
+        return self.paths[self._path_indices[i]], self._page_nums[i]
+
+
+class RangePairs(_TupleColumns):
+    """[start0, end0, start1, end1, ...] の配列を (開始, 終了) の列として見せる"""
+
+    def __init__(self, flat):
+        self._flat = flat
+
+    def __len__(self):
+        return len(self._flat) // 2
+
+    def __iter__(self):
+        it = iter(self._flat)
+        return zip(it, it)
+
+    def _item(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError("range index out of range")
+        return self._flat[2 * i], self._flat[2 * i + 1]
+
+
+class PDFEditState(NamedTuple):
+    pages: Sequence[Tuple[str, int]]  # コンパクト形式ではPageColumns、JSONではリスト
+    selected_ranges: Sequence[Tuple[int, int]]  # (開始, 終了) 終了は含まない。コンパクト形式ではRangePairs
+    fingerprints: Dict[str, Optional[Tuple[int, int]]]
+    edits: Dict[int, Tuple[int, Optional[tuple]]]  # 位置 -> (回転, 切り抜き)。指定のあるページのみ
+
+
+def is_compact_state_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() == COMPACT_STATE_EXT
+
+
+def _u32_bytes(values) -> bytes:
+    arr = values if isinstance(values, array) else array(_U32, values)
+    if sys.byteorder == "big":
+        arr = array(_U32, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _read_u32_array(data: bytes, offset: int, count: int):
+    end = offset + count * 4
+    arr = array(_U32)
+    arr.frombytes(data[offset:end])
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr, end
+
+
+def _index_ranges(indices: Iterable[int]) -> List[int]:
+    """昇順インデックス列を [start0, end0, start1, end1, ...] (endは含まない) に変換"""
+    flat = []
+    for i in sorted(set(indices)):
+        if flat and flat[-1] == i:
+            flat[-1] = i + 1
+        else:
+            flat.extend((i, i + 1))
+    return flat
+
+
+def encode_compact_state(
+    pages: Sequence[Tuple[str, int]], selected: Iterable[int], edits=None
+) -> bytes:
+    """ページ列と選択インデックス・ページの編集 {位置: (回転, 切り抜き)} をコンパクト形式のバイト列にする"""
+    path_index = {}
+    paths = []
+    idx_arr = array(_U32)
+    page_arr = array(_U32)
+    run_idx = array(_U32)
+    run_start = array(_U32)
+    run_len = array(_U32)
+    for pdf_path, page_num in pages:
+        i = path_index.get(pdf_path)
+        if i is None:
+            i = path_index[pdf_path] = len(paths)
+            paths.append(pdf_path)
+        idx_arr.append(i)
+        page_arr.append(page_num)
+        if run_idx and run_idx[-1] == i and run_start[-1] + run_len[-1] == page_num:
+            run_len[-1] += 1
+        else:
+            run_idx.append(i)
+            run_start.append(page_num)
+            run_len.append(1)
+    # ランが短すぎる（並べ替え済みなど）場合は配列の方が小さく速い
+    if len(run_idx) * 3 <= len(idx_arr) * 2:
+        layout, columns = _LAYOUT_RUNS, (run_idx, run_start, run_len)
+    else:
+        layout, columns = _LAYOUT_ARRAYS, (idx_arr, page_arr)
+    parts = [_HEADER.pack(COMPACT_STATE_MAGIC, COMPACT_STATE_VERSION, layout, len(paths))]
+    for pdf_path in paths:
+        raw = pdf_path.encode("utf-8")
+        size, mtime_ns = file_fingerprint(pdf_path) or (-1, -1)
+        parts.append(_PATH_ENTRY.pack(len(raw), size, mtime_ns))
+        parts.append(raw)
+    parts.append(_COUNT.pack(len(columns[0])))
+    parts.extend(_u32_bytes(col) for col in columns)
+    ranges = _index_ranges(selected)
+    parts.append(_COUNT.pack(len(ranges) // 2))
+    parts.append(_u32_bytes(ranges))
+    edits = edits or {}
+    parts.append(_COUNT.pack(len(edits)))
+    for index in sorted(edits):
+        rotation, crop = edits[index]
+        parts.append(_EDIT_ENTRY.pack(index, rotation % 360, crop is not None, *(crop or (0, 0, 1, 1))))
+    return b"".join(parts)
+
+
+def decode_compact_state(data: bytes) -> PDFEditState:
+    """コンパクト形式のバイト列を復元する（ページ列は配列のまま持つPageColumns）"""
+    magic, version, layout, n_paths = _HEADER.unpack_from(data, 0)
+    if magic != COMPACT_STATE_MAGIC:
+        raise ValueError("コンパクト形式の状態ファイルではありません")
+    if version > COMPACT_STATE_VERSION:
+        raise ValueError(f"未対応の状態ファイルバージョンです: {version}")
+    offset = _HEADER.size
+    paths = []
+    fingerprints = {}
+    for _ in range(n_paths):
+        n, size, mtime_ns = _PATH_ENTRY.unpack_from(data, offset)
+        offset += _PATH_ENTRY.size
+        pdf_path = data[offset:offset + n].decode("utf-8")
+        offset += n
+        paths.append(pdf_path)
+        fingerprints[pdf_path] = None if size < 0 else (size, mtime_ns)
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    columns = []
+    for _ in range(3 if layout == _LAYOUT_RUNS else 2):
+        col, offset = _read_u32_array(data, offset, count)
+        columns.append(col)
+    if layout == _LAYOUT_RUNS:
+        pages = PageColumns(paths, runs=tuple(columns))
+    else:
+        pages = PageColumns(paths, *columns)
+    (n_ranges,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    ranges, offset = _read_u32_array(data, offset, n_ranges * 2)
+    selected_ranges = RangePairs(ranges)
+    edits = {}
+    if version >= 2:
+        (n_edits,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        for index, rotation, has_crop, *crop in _EDIT_ENTRY.iter_unpack(
+            data[offset:offset + n_edits * _EDIT_ENTRY.size]
+        ):
+            edits[index] = (rotation, tuple(crop) if has_crop else None)
+    return PDFEditState(pages, selected_ranges, fingerprints, edits)
+
+
+def write_state(
+    path: str,
+    pages: Sequence[Tuple[str, int]],
+    selected: Iterable[int],
+    compact: Optional[bool] = None,
+    edits: Optional[Dict[int, Tuple[int, Optional[tuple]]]] = None,
+) -> None:
+    """
+    作業状態を保存する。
+    compactがNoneの場合は拡張子(.pdfstate)で形式を決める
+    edits: 回転・切り抜きのあるページの {位置: (回転, 切り抜き)}
+    """
+    if compact is None:
+        compact = is_compact_state_path(path)
+    edits = edits or {}
+    if compact:
+        data = encode_compact_state(pages, selected, edits)
+        with open(path, "wb") as f:
+            f.write(data)
+        return
+    state = {
+        "pages": [
+            {"pdf_path": pdf_path, "page_num": page_num}
+            for pdf_path, page_num in pages
+        ],
+        "selected": list(selected),
+    }
+    for index, (rotation, crop) in edits.items():
+        page = state["pages"][index]
+        if rotation % 360:
+            page["rotation"] = rotation % 360
+        if crop is not None:
+            page["crop"] = list(crop)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+
+def read_state(path: str) -> PDFEditState:
+    """作業状態を読み込む。形式はファイル先頭で自動判別する"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(COMPACT_STATE_MAGIC):
+        return decode_compact_state(data)
+    state = json.loads(data.decode("utf-8"))
+    entries = state.get("pages", [])
+    pages = [(p["pdf_path"], p["page_num"]) for p in entries]
+    edits = {
+        i: (p.get("rotation", 0), tuple(p["crop"]) if p.get("crop") else None)
+        for i, p in enumerate(entries)
+        if p.get("rotation") or p.get("crop")
+    }
+    flat = _index_ranges(state.get("selected", []))
+    return PDFEditState(pages, list(zip(flat[0::2], flat[1::2])), {}, edits)
+
+
+def selected_indices(state: PDFEditState) -> List[int]:
+    """選択範囲をインデックスのリストに展開する"""
+    return [i for start, end in state.selected_ranges for i in range(start, end)]
+
+
+def stale_paths(state: PDFEditState) -> List[str]:
+    """保存時からフィンガープリントが変わった（または消えた）パスを返す"""
+    return [
+        pdf_path
+        for pdf_path, fp in state.fingerprints.items()
+        if fp is not None and file_fingerprint(pdf_path) != fp
+    ]
@@ -22,46 +22,181 @@ from PyQt6.QtCore import (
     pyqtSignal,
     QObject,
     QTimer,
-    QPoint,
+    QEvent,
+    QItemSelection,
+    QItemSelectionModel,
+    QModelIndex,
 )
 import os
 import pprint
 import json
-from collections import namedtuple
-from components.pdf_preview_widget import PDFPreviewWidget
+import time
+import itertools
+from array import array
+from collections import namedtuple, Counter
 from components.path_manager import get_appdata_path
 from components.loading_animation_widget import LoadingAnimationWidget
+from components.pdf_state_format import read_state, write_state, stale_paths
+from components.perf_metrics import metrics
+from components.thumbnail_cache import ThumbnailCache, level_for, level_box
+from components.scroll_prefetch import ScrollVelocityTracker
+from components.content_hash import ContentHashCache, find_duplicates, duplicate_files
+from components.blank_detection import is_blank, qimage_ink_fraction
+from components.text_index import TextIndex
+from components.undo_log import UndoLog
+from components.range_selection import RangeSelection
 
-PDFPageInfo = namedtuple('PDFPageInfo', ['pdf_path', 'page_num'])
+# rotation: 元の向きに加える回転（90の倍数、時計回り）、crop: 元の向きで表示したページに対する切り抜きの割合
+PDFPageInfo = namedtuple('PDFPageInfo', ['pdf_path', 'page_num', 'rotation', 'crop'], defaults=(0, None))
+STATE_FILE_FILTER = "JSON Files (*.json);;コンパクト形式 (*.pdfstate)"
+# サムネイル表示の高さ（論理ピクセル）の範囲
+THUMBNAIL_SIZE_RANGE = (64, 512)
+# 空白判定を背景で分けて実行するときの1ワーカーあたりの最小ページ数
+BLANK_BATCH_MIN_PAGES = 32
+# 行に表示中のサムネイルが現在の表示サイズの段のものか（表示世代）を記録するデータロール
+THUMB_SHOWN_ROLE = Qt.ItemDataRole.UserRole + 1
+# 重複ページの行に、内容が同じ最初の行のPDFPageInfoを記録するデータロール
+DUPLICATE_ROLE = Qt.ItemDataRole.UserRole + 2
+# 空白ページと判定した行に、インク割合を記録するデータロール
+BLANK_ROLE = Qt.ItemDataRole.UserRole + 3
+_INFO_ROLE = Qt.ItemDataRole.UserRole
+# 並べ替えでページと一緒に移す行の印
+_MARK_ROLES = (DUPLICATE_ROLE, BLANK_ROLE, Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ToolTipRole)
+
+
+def _path_key(pdf_path):
+    """パスの比較用キー（区切り文字・大文字小文字・"."の違いを同一視する）"""
+    return os.path.normcase(os.path.normpath(pdf_path))
 
 class ThumbnailWorkerSignals(QObject):
     def __init__(self, parent=None):
         super().__init__(parent)
-    finished = pyqtSignal(object, object, object)  # (pdf_path, page_num, image)
+    finished = pyqtSignal(object, object, object, object)  # (pdf_path, page_num, image, level)
 
 class ThumbnailWorker(QRunnable):
-    def __init__(self, pdf_path, page_num, thumb_w, thumb_h, callback, signals):
+    def __init__(self, pdf_path, page_num, thumb_w, thumb_h, callback, signals, preview=False, level=None):
         super().__init__()
         self.pdf_path = pdf_path
         self.page_num = page_num
-        self.thumb_w = thumb_w
+        self.thumb_w = thumb_w  # 描画枠（物理ピクセル）
         self.thumb_h = thumb_h
+        self.level = level  # キャッシュの段（結果にそのまま付けて返す）
+        self.preview = preview  # Trueなら埋め込みサムネイル/極小描画の簡易版
         self.signals = signals
         self.signals.finished.connect(callback)
 
     def run(self):
+        span = "thumbnail.preview" if self.preview else "thumbnail.render"
         try:
-            import fitz
-            from PyQt6.QtGui import QImage
-            doc = fitz.open(self.pdf_path)
-            page = doc.load_page(self.page_num)
-            pix = page.get_pixmap(matrix=fitz.Matrix(0.7, 0.7))
-            img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
-            doc.close()
-            self.signals.finished.emit(self.pdf_path, self.page_num, img)
+            from components.thumbnail_render import render_pdf_page, render_preview_image
+            with metrics.span(span):
+                # 描画枠のサイズで描画済み・Qt所有バッファのQImageを受け渡す
+                if self.preview:
+                    img = render_preview_image(self.pdf_path, self.page_num, self.thumb_w, self.thumb_h)
+                else:
+                    img = render_pdf_page(self.pdf_path, self.page_num, self.thumb_w, self.thumb_h)
+            self.signals.finished.emit(self.pdf_path, self.page_num, img, self.level)
         except Exception as e:
             print(f"{self.pdf_path} ページ{self.page_num+1} サムネイル生成失敗: {e}")
-            self.signals.finished.emit(self.pdf_path, self.page_num, None)
+            metrics.record_error(span, f"{self.pdf_path} p{self.page_num+1}: {e}")
+            self.signals.finished.emit(self.pdf_path, self.page_num, None, self.level)
+
+# --- 重複検出用の内容ハッシュ計算Worker ---
+class ContentHashWorkerSignals(QObject):
+    finished = pyqtSignal(dict)  # {pdf_path: (file_hash, [page_hash])}
+
+class ContentHashWorker(QRunnable):
+    def __init__(self, pdf_paths, cache):
+        super().__init__()
+        self.pdf_paths = pdf_paths
+        self.cache = cache
+        self.signals = ContentHashWorkerSignals()
+
+    def run(self):
+        result = {}
+        with metrics.span("dedupe.hash"):
+            for pdf_path in self.pdf_paths:
+                try:
+                    entry = self.cache.get(pdf_path)
+                except Exception as e:
+                    print(f"{pdf_path} ハッシュ計算失敗: {e}")
+                    metrics.record_error("dedupe.hash", f"{pdf_path}: {e}")
+                    continue
+                if entry is not None:
+                    result[pdf_path] = entry
+        try:
+            self.cache.save()
+        except OSError as e:
+            print(f"ハッシュキャッシュ保存失敗: {e}")
+        self.signals.finished.emit(result)
+
+# --- 空白ページ判定Worker（キャッシュにないページを極小描画で判定） ---
+class BlankAnalysisWorkerSignals(QObject):
+    finished = pyqtSignal(dict)  # {(pdf_path, page_num): インク割合}
+
+class BlankAnalysisWorker(QRunnable):
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages  # [(pdf_path, page_num)]
+        self.signals = BlankAnalysisWorkerSignals()
+
+    def run(self):
+        import fitz
+        from components.blank_detection import page_ink_fraction
+        by_file = {}
+        for pdf_path, page_num in self.pages:
+            by_file.setdefault(pdf_path, []).append(page_num)
+        result = {}
+        with metrics.span("blank.analyze"):
+            for pdf_path, page_nums in by_file.items():
+                try:
+                    with fitz.open(pdf_path) as doc:
+                        for page_num in page_nums:
+                            result[(pdf_path, page_num)] = page_ink_fraction(doc, doc.load_page(page_num))
+                except Exception as e:
+                    print(f"{pdf_path} 空白判定失敗: {e}")
+                    metrics.record_error("blank.analyze", f"{pdf_path}: {e}")
+        metrics.incr("blank.rendered_pages", len(result))
+        self.signals.finished.emit(result)
+
+# --- 全文索引の作成Worker（未登録・変更されたファイルのみ抽出） ---
+class TextIndexWorkerSignals(QObject):
+    finished = pyqtSignal(int)  # 抽出したファイル数
+
+class TextIndexWorker(QRunnable):
+    def __init__(self, pdf_paths, index_path=None, prune=False):
+        super().__init__()
+        self.pdf_paths = pdf_paths
+        self.index_path = index_path
+        self.prune = prune  # 削除・移動されたファイルの索引も消す
+        self.signals = TextIndexWorkerSignals()
+
+    def run(self):
+        extracted = 0
+        try:
+            index = TextIndex(self.index_path)  # SQLiteの接続はこのスレッド専用
+        except Exception as e:
+            print(f"全文索引を開けません: {e}")
+            metrics.record_error("text.index", e)
+            self.signals.finished.emit(0)
+            return
+        with metrics.span("text.index"):
+            for pdf_path in self.pdf_paths:
+                try:
+                    if index.index_file(pdf_path):
+                        extracted += 1
+                except Exception as e:
+                    print(f"{pdf_path} テキスト抽出失敗: {e}")
+                    metrics.record_error("text.index", f"{pdf_path}: {e}")
+            if self.prune:
+                try:
+                    index.prune()
+                except Exception as e:
+                    print(f"全文索引の整理失敗: {e}")
+                    metrics.record_error("text.index", e)
+        index.close()
+        metrics.incr("text.indexed_files", extracted)
+        self.signals.finished.emit(extracted)
 
 # --- ここから非同期PDFリスト読み込み用Worker ---
 class PDFListLoadWorkerSignals(QObject):
@@ -76,20 +211,24 @@ class PDFListLoadWorker(QRunnable):
 
     def run(self):
         result = []
-        for pdf_file in self.pdf_files:
-            pdf_path = (
-                pdf_file
-                if os.path.isabs(pdf_file)
-                else os.path.join(self.pdf_dir, pdf_file)
-            )
-            try:
-                import fitz
-                doc = fitz.open(pdf_path)
-                for i in range(len(doc)):
-                    result.append((pdf_path, i))
-                doc.close()
-            except Exception as e:
-                print(f"{pdf_file} 読み込み失敗: {e}")
+        with metrics.span("discovery"):
+            for pdf_file in self.pdf_files:
+                pdf_path = (
+                    pdf_file
+                    if os.path.isabs(pdf_file)
+                    else os.path.join(self.pdf_dir, pdf_file)
+                )
+                try:
+                    import fitz
+                    doc = fitz.open(pdf_path)
+                    for i in range(len(doc)):
+                        result.append((pdf_path, i))
+                    doc.close()
+                except Exception as e:
+                    print(f"{pdf_file} 読み込み失敗: {e}")
+                    metrics.record_error("discovery", f"{pdf_file}: {e}")
+        metrics.incr("discovery.files", len(self.pdf_files))
+        metrics.incr("discovery.pages", len(result))
         self.signals.finished.emit(result)
 
     # --- 従来の一括ロードも保持 ---
@@ -141,6 +280,9 @@ class PDFListLoadWorker(QRunnable):
 
 class PDFThumbnailListViewer(QListWidget):
     pdf_list_loaded = pyqtSignal(list)  # [(pdf_path, page_num)]
+    duplicates_detected = pyqtSignal(int, int, bool)  # (重複ページ数, 重複ファイル数, 除去したか)
+    blank_pages_detected = pyqtSignal(int, bool)  # (空白ページ数, 除去したか)
+    text_index_updated = pyqtSignal(int)  # 抽出したファイル数
 
     def __init__(self, pdf_dir=None):
         super().__init__()
@@ -148,22 +290,27 @@ class PDFThumbnailListViewer(QListWidget):
         self.pdf_files = []
         self.thumb_w = 180
         self.thumb_h = 240
-        self.thumbnail_cache = {}  # (pdf_path, page_num) -> QPixmap
+        self.thumbnail_cache = ThumbnailCache()  # (pdf_path, page_num, level) -> QPixmap
+        self._dpr = self.devicePixelRatioF()
+        self._display_gen = 0  # 表示サイズ・DPRが変わるたびに進める
         self.thread_pool = QThreadPool()
         try:
             max_workers = max(1, os.cpu_count() // 2)
             self.thread_pool.setMaxThreadCount(max_workers)
         except Exception:
             self.thread_pool.setMaxThreadCount(2)
-        self.setViewMode(QListWidget.ViewMode.ListMode)
+        # 簡易サムネイル（先行表示用）は本描画の待ち行列に並ばないよう専用スレッドで処理
+        self.progressive_thumbnails = True
+        self.preview_pool = QThreadPool()
+        self.preview_pool.setMaxThreadCount(1)
+        self.grid_mode = False
+        self._apply_view_mode()
         self.setIconSize(QSize(self.thumb_w, self.thumb_h))
-        self.setResizeMode(QListWidget.ResizeMode.Adjust)
         self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.setDragDropMode(QListWidget.DragDropMode.InternalMove)
         self.setSpacing(8)
-        self.setMovement(QListWidget.Movement.Static)
-        self.setFlow(QListWidget.Flow.TopToBottom)
-        self.setWrapping(False)
+        # 全行が同じサイズのため、レイアウト計算を1件分で済ませる
+        self.setUniformItemSizes(True)
         self.itemDoubleClicked.connect(self.on_item_doubleclicked)
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         self.pdf_list_loaded.connect(self._on_pdf_list_loaded)
@@ -171,71 +318,396 @@ class PDFThumbnailListViewer(QListWidget):
         self._signals = []  # signalsの参照保持用
         self._pdf_page_iter = None  # incremental loading iterator
         self._thumbnail_requested = set()  # avoid duplicate loads
+        self._file_gen = {}  # pdf_path -> 更新回数（更新前の描画結果を捨てるため）
+        self._full_load_pending = False  # load_all_pages_asyncのページ検出中
+        self._pending_appends = []  # その間に追加されたページ（検出完了後に後ろへつなぐ）
+        # 重複検出（ハッシュは初回使用時に読み込み、ファイル単位でキャッシュ）
+        self._hash_cache = None
+        self.auto_collapse_duplicates = False  # 追加したファイルの重複ページを自動で除外する
+        self._dedupe_after_load = set()  # 読み込み後に重複ページを除外する、追加したファイル
+        self._blank_scores = {}  # (pdf_path, page_num) -> インク割合（ファイル更新時に破棄）
+        # 全文索引: 一覧の読み込み・追加後に背景で更新する（サムネイル描画と競合しないよう1スレッド）
+        self.text_index_path = None  # Noneならアプリフォルダ
+        self._text_index = None  # 検索用（GUIスレッドの接続）
+        self._prune_text_index = True  # 次の索引更新で、なくなったファイルの索引も消す（一覧の読み込みごと）
+        self.index_pool = QThreadPool()
+        self.index_pool.setMaxThreadCount(1)
+        self._text_filter = None  # 絞り込み中の検索語
+        self._text_matches = set()
+        self._shown_rows = None  # 絞り込み中に表示している行番号（行の増減で作り直す）
+        # 並べ替え・行の除去の取り消し（変更した行の分だけ記録する）
+        self.undo_log = UndoLog()
         self._initial_load_rows = 0
         # ローディングアニメーションウィジェット
         self.loading_widget = LoadingAnimationWidget("サムネイルを読み込み中...", parent=self)
         self.loading_widget.setFixedSize(200, 120)
         self.loading_widget.hide()
+        for sig in (self.model().rowsInserted, self.model().rowsRemoved, self.model().rowsMoved):
+            sig.connect(self._invalidate_shown_rows)
+        # ファイルごとの行の区間（ファイル単位の選択用。行の増減・移動で作り直す）
+        self._file_ranges = None
+        for sig in (self.model().rowsInserted, self.model().rowsRemoved, self.model().rowsMoved):
+            sig.connect(self._invalidate_file_ranges)
+        # ドラッグ・移動ボタンによる行の移動（page_itemsの同期と取り消しの記録）
+        self.model().rowsMoved.connect(self._on_rows_moved)
+        # スクロール中は位置を間引いて追跡し、速度に応じて先読み範囲を変える
+        self.adaptive_prefetch = True
+        self._scroll_tracker = ScrollVelocityTracker()
+        self._scroll_timer = QTimer(self)
+        self._scroll_timer.setSingleShot(True)
+        self._scroll_timer.setInterval(50)
+        self._scroll_timer.timeout.connect(self._on_scroll_tick)
+        # 最後のスクロールから一定時間で停止とみなす
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(80)
+        self._settle_timer.timeout.connect(self._on_scroll_settled)
+        self._sharp_pending_since = None  # 停止時刻（表示範囲が鮮明になるまでの計測用）
         # trigger lazy thumbnail loading on scroll
-        self.verticalScrollBar().valueChanged.connect(self._load_visible_thumbnails)
+        self.verticalScrollBar().valueChanged.connect(self._on_scroll_value_changed)
+
+    def _current_level(self) -> int:
+        """現在の表示サイズ・デバイスピクセル比に必要なキャッシュの段"""
+        return level_for(self.thumb_h * self._dpr)
+
+    def _thumb_key(self, pdf_path, page_num):
+        """サムネイルキャッシュのキー（現在の表示に必要な段を含む）"""
+        return (pdf_path, page_num, self._current_level())
+
+    def _render_box(self, level):
+        """
+        段levelを描画する大きさ（物理ピクセル）
+        現在の表示の段は表示サイズちょうどで描き、表示時の縮小を省く（最大段を超える表示サイズも含む）
+        """
+        if level == self._current_level():
+            return round(self.thumb_w * self._dpr), round(self.thumb_h * self._dpr)
+        return level_box(level)
+
+    def _display_pixmap(self, pixmap):
+        """キャッシュの段の画像を表示サイズ（物理ピクセル）に合わせ、DPRを設定する"""
+        from PyQt6.QtGui import QPixmap
+        tw = round(self.thumb_w * self._dpr)
+        th = round(self.thumb_h * self._dpr)
+        w, h = pixmap.width(), pixmap.height()
+        # 表示サイズで描いた画像（描画倍率の端数で1px違うものを含む）は縮小・拡大しない
+        if w > tw + 1 or h > th + 1 or (w < tw - 1 and h < th - 1):
+            pixmap = pixmap.scaled(
+                tw, th,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        if pixmap.devicePixelRatio() != self._dpr:
+            pixmap = QPixmap(pixmap)
+            pixmap.setDevicePixelRatio(self._dpr)
+        return pixmap
+
+    def _cached_display(self, pdf_path, page_num):
+        """
+        キャッシュの最寄りの段から表示用pixmapを作る。
+        (pixmap, 要求サイズの段かどうか) を返し、キャッシュがなければ (None, False)
+        """
+        level = self._current_level()
+        found = self.thumbnail_cache.nearest(pdf_path, page_num, level)
+        if found is None:
+            return None, False
+        found_level, pixmap = found
+        return self._display_pixmap(pixmap), found_level == level
 
     def get_thumbnail(self, pdf_path, page_num, callback=None):
-        key = (pdf_path, page_num)
-        if key in self.thumbnail_cache:
-            return self.thumbnail_cache[key]
+        pixmap, exact = self._cached_display(pdf_path, page_num)
+        if exact:
+            metrics.incr("thumbnail.cache_hit")
+            return pixmap
+        metrics.incr("thumbnail.cache_miss")
+        level = self._current_level()
         if callback:
-            signals = ThumbnailWorkerSignals(self)
-            worker = ThumbnailWorker(pdf_path, page_num, self.thumb_w, self.thumb_h, callback, signals)
-            self._workers.append(worker)
-            self._signals.append(signals)
-            def on_finished(*args, **kwargs):
-                if worker in self._workers:
-                    self._workers.remove(worker)
-                if signals in self._signals:
-                    self._signals.remove(signals)
-                callback(*args, **kwargs)
-            try:
-                signals.finished.disconnect(callback)
-            except Exception:
-                pass
-            signals.finished.connect(on_finished)
-            self.thread_pool.start(worker)
-            return None
-        try:
-            import fitz
-            from PyQt6.QtGui import QImage, QPixmap
-            doc = fitz.open(pdf_path)
-            page = doc.load_page(page_num)
-            pix = page.get_pixmap(matrix=fitz.Matrix(0.7, 0.7))
-            img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(img).scaled(self.thumb_w, self.thumb_h, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            self.thumbnail_cache[key] = pixmap
-            doc.close()
+            # 最寄りの段があればそれを返し、要求サイズの段は背景で描画する
+            self._request_thumbnail(pdf_path, page_num, level, callback, preview=pixmap is None)
             return pixmap
+        try:
+            from PyQt6.QtGui import QPixmap
+            from components.thumbnail_render import render_pdf_page
+            img = render_pdf_page(pdf_path, page_num, *self._render_box(level))
+            cached = QPixmap.fromImage(img)
+            cached.setDevicePixelRatio(self._dpr)
+            self.thumbnail_cache.put(pdf_path, page_num, level, cached)
+            return self._display_pixmap(cached)
         except Exception as e:
             print(f"{pdf_path} ページ{page_num+1} サムネイル生成失敗: {e}")
-            return None
+            metrics.record_error("thumbnail.render", f"{pdf_path} p{page_num+1}: {e}")
+            return pixmap
 
-    def on_thumbnail_ready(self, pdf_path, page_num, image):
-        key = (pdf_path, page_num)
-        self._thumbnail_requested.discard(key)
-        if image is not None:
-            from PyQt6.QtGui import QPixmap
-            pixmap = QPixmap.fromImage(image).scaled(
-                self.thumb_w,
-                self.thumb_h,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
+    def _request_thumbnail(self, pdf_path, page_num, level, callback, preview=True):
+        if preview and self.progressive_thumbnails:
+            # 表示できるものがなければまず簡易版を表示し、本描画はワーカーが空き次第差し替える
+            self._start_thumbnail_worker(
+                pdf_path, page_num, self.on_thumbnail_preview, self.preview_pool, level, preview=True
+            )
+        self._start_thumbnail_worker(pdf_path, page_num, callback, self.thread_pool, level)
+        metrics.set_gauge("thumbnail.queue_depth", len(self._workers))
+
+    def _start_thumbnail_worker(self, pdf_path, page_num, callback, pool, level, preview=False):
+        signals = ThumbnailWorkerSignals(self)
+        worker = ThumbnailWorker(
+            pdf_path, page_num, *self._render_box(level), callback, signals,
+            preview=preview, level=level,
+        )
+        worker.pool = pool  # 先読み範囲外になったとき待ち行列から取り下げるため
+        # 完了通知を処理するまでtryTakeできるよう、プールには破棄させない（_workersから外せば解放）
+        worker.setAutoDelete(False)
+        worker.file_gen = self._file_gen.get(pdf_path, 0)
+        self._workers.append(worker)
+        self._signals.append(signals)
+        def on_finished(pdf_path, page_num, image, level):
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if signals in self._signals:
+                self._signals.remove(signals)
+            if worker.file_gen != self._file_gen.get(pdf_path, 0):
+                image = None  # 描画中にファイルが更新・削除された
+            callback(pdf_path, page_num, image, level)
+        try:
+            signals.finished.disconnect(callback)
+        except Exception:
+            pass
+        signals.finished.connect(on_finished)
+        pool.start(worker)
+
+    def on_thumbnail_preview(self, pdf_path, page_num, image, level=None):
+        """簡易サムネイルを表示サイズに拡大して仮表示する（キャッシュに何かあれば何もしない）"""
+        if image is None or self.thumbnail_cache.levels(pdf_path, page_num):
+            return
+        from PyQt6.QtGui import QPixmap
+        pixmap = QPixmap.fromImage(image).scaled(
+            round(self.thumb_w * self._dpr),
+            round(self.thumb_h * self._dpr),
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.FastTransformation,
+        )
+        pixmap.setDevicePixelRatio(self._dpr)
+        self._set_row_pixmap(pdf_path, page_num, pixmap)
+
+    def on_thumbnail_ready(self, pdf_path, page_num, image, level=None):
+        with metrics.span("thumbnail.ready"):
+            self._on_thumbnail_ready(pdf_path, page_num, image, level)
+        metrics.set_gauge("thumbnail.queue_depth", len(self._workers))
+
+    def _on_thumbnail_ready(self, pdf_path, page_num, image, level):
+        self._thumbnail_requested.discard((pdf_path, page_num, level))
+        if image is None:
+            return
+        from PyQt6.QtGui import QPixmap
+        # ワーカー側で段のサイズ・RGB32に変換済みのため形式変換は不要
+        with metrics.span("thumbnail.convert"):
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(self._dpr)  # 複製前に設定し、表示時の複製を省く
+        self.thumbnail_cache.put(pdf_path, page_num, level, pixmap)
+        # 描画中に表示サイズ・画面が変わっていた場合は表示しない（キャッシュには残す）
+        if level == self._current_level():
+            self._set_row_pixmap(pdf_path, page_num, self._display_pixmap(pixmap), exact=True)
+            if self._sharp_pending_since is not None:
+                self._check_visible_sharp()
+
+    def _set_row_pixmap(self, pdf_path, page_num, pixmap, exact=False):
+        for (info, item) in self.page_items:
+            if info.pdf_path == pdf_path and info.page_num == page_num:
+                self._set_item_pixmap(item, pixmap, exact)
+                break
+
+    def _set_item_pixmap(self, item, pixmap, exact=False):
+        """行のラベルに表示する。exactなら現在の表示サイズの段として記録する"""
+        info = item.data(_INFO_ROLE)
+        if info is not None:
+            # 並べ替え後に未同期の行なら、先に付け替えてから表示する（後の同期で消さないように）
+            self._sync_item_widget(info, item)
+        widget = self.itemWidget(item)
+        label = widget.findChild(QLabel) if widget else None
+        if label:
+            if info is not None and (info.rotation % 360 or info.crop is not None):
+                pixmap = self._edited_pixmap(pixmap, info)
+            label.setPixmap(pixmap)
+        if exact:
+            item.setData(THUMB_SHOWN_ROLE, self._display_gen)
+
+    def _edited_pixmap(self, pixmap, info):
+        """キャッシュのサムネイルを切り抜き・回転して表示サイズに収める（描画し直さない）"""
+        from PyQt6.QtGui import QTransform
+        if info.crop is not None:
+            x0, y0, x1, y1 = info.crop
+            w, h = pixmap.width(), pixmap.height()
+            pixmap = pixmap.copy(
+                round(x0 * w), round(y0 * h), max(1, round((x1 - x0) * w)), max(1, round((y1 - y0) * h))
+            )
+        if info.rotation % 360:
+            pixmap = pixmap.transformed(
+                QTransform().rotate(info.rotation % 360), Qt.TransformationMode.SmoothTransformation
             )
-            self.thumbnail_cache[key] = pixmap
-            for (info, item) in self.page_items:
-                if info.pdf_path == pdf_path and info.page_num == page_num:
-                    widget = self.itemWidget(item)
-                    if widget:
-                        label = widget.findChild(QLabel)
-                        if label:
-                            label.setPixmap(pixmap)
-                    break
+        pixmap = pixmap.scaled(
+            round(self.thumb_w * self._dpr),
+            round(self.thumb_h * self._dpr),
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+        pixmap.setDevicePixelRatio(self._dpr)
+        return pixmap
+
+    def _update_row_thumbnail(self, info, item):
+        """
+        行のサムネイルを現在の表示サイズに合わせる。
+        キャッシュの最寄りの段を即時表示し、要求サイズの段がなければ背景で描画する
+        """
+        self._sync_item_widget(info, item)
+        if item.data(THUMB_SHOWN_ROLE) == self._display_gen:
+            return
+        pixmap, exact = self._cached_display(info.pdf_path, info.page_num)
+        if pixmap is not None:
+            self._set_item_pixmap(item, pixmap, exact)
+        if exact:
+            metrics.incr("thumbnail.cache_hit")
+            return
+        key = self._thumb_key(info.pdf_path, info.page_num)
+        if key in self._thumbnail_requested:
+            return
+        metrics.incr("thumbnail.cache_miss")
+        self._thumbnail_requested.add(key)
+        self._request_thumbnail(
+            info.pdf_path, info.page_num, key[2], self.on_thumbnail_ready, preview=pixmap is None
+        )
+
+    def set_thumbnail_size(self, height: int):
+        """
+        サムネイルの表示サイズ（高さ、論理ピクセル）を変更する。
+        キャッシュは破棄せず、最寄りの段で即時表示してから要求サイズの段を描画し直す
+        """
+        lo, hi = THUMBNAIL_SIZE_RANGE
+        height = max(lo, min(hi, int(height)))
+        if height == self.thumb_h:
+            return
+        self.thumb_h = height
+        self.thumb_w = height * 3 // 4
+        self.setIconSize(QSize(self.thumb_w, self.thumb_h))
+        hint = self._item_size_hint()
+        for info, item in self.page_items:
+            item.setSizeHint(hint)
+            widget = self.itemWidget(item)
+            label = widget.findChild(QLabel) if widget else None
+            if label:
+                label.setFixedSize(self.thumb_w, self.thumb_h)
+        self._refresh_thumbnail_display()
+
+    def _apply_view_mode(self):
+        """一覧（1行1ページ）またはグリッド（折り返しで1画面に多数）の表示設定"""
+        if self.grid_mode:
+            self.setViewMode(QListWidget.ViewMode.IconMode)
+            self.setFlow(QListWidget.Flow.LeftToRight)
+            self.setWrapping(True)
+        else:
+            self.setViewMode(QListWidget.ViewMode.ListMode)
+            self.setFlow(QListWidget.Flow.TopToBottom)
+            self.setWrapping(False)
+        # setViewModeで変わるため毎回設定し直す
+        self.setMovement(QListWidget.Movement.Static)
+        self.setResizeMode(QListWidget.ResizeMode.Adjust)
+
+    def set_grid_mode(self, enabled: bool):
+        """グリッド表示の切り替え。行ウィジェットを表示形式に合わせて作り直す"""
+        enabled = bool(enabled)
+        if enabled == self.grid_mode:
+            return
+        self.grid_mode = enabled
+        self._apply_view_mode()
+        hint = self._item_size_hint()
+        self.setUpdatesEnabled(False)
+        try:
+            for info, item in self.page_items:
+                item.setSizeHint(hint)
+                self.setItemWidget(item, self._create_item_widget(info, item))
+        finally:
+            self.setUpdatesEnabled(True)
+        self._refresh_thumbnail_display()
+
+    def _item_size_hint(self) -> QSize:
+        if self.grid_mode:
+            return QSize(self.thumb_w + 16, self.thumb_h + 64)
+        return QSize(self.thumb_w + 180, self.thumb_h + 16)
+
+    def _insert_page_row(self, row, info):
+        """rowの位置にページ行を挿入し、page_itemsも同期する"""
+        item = QListWidgetItem()
+        item.setData(Qt.ItemDataRole.UserRole, info)
+        item.setSizeHint(self._item_size_hint())
+        if row >= self.count():
+            self.addItem(item)
+        else:
+            self.insertItem(row, item)
+        self.setItemWidget(item, self._create_item_widget(info, item))
+        self.page_items.insert(row, (info, item))
+        return item
+
+    def _create_item_widget(self, info, item):
+        """
+        1ページ分の表示ウィジェット（サムネイル・ファイル名/ページ番号・移動ボタン）
+        一覧表示は横並び、グリッド表示はサムネイルの下にキャプションとボタンを置く
+        サムネイルのラベルは最初に作り、findChild(QLabel)で取得できるようにする
+        """
+        widget = QWidget()
+        label = QLabel(widget)
+        label.setFixedSize(self.thumb_w, self.thumb_h)
+        text = QLabel(widget)
+        if self.grid_mode:
+            layout = QVBoxLayout(widget)
+            layout.setContentsMargins(4, 4, 4, 4)
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            layout.addWidget(label, 0, Qt.AlignmentFlag.AlignHCenter)
+            text.setFixedWidth(self.thumb_w)
+            layout.addWidget(text)
+            buttons = QHBoxLayout()
+            layout.addLayout(buttons)
+            labels = ('←', '→')
+        else:
+            layout = QHBoxLayout(widget)
+            layout.addWidget(label)
+            layout.addWidget(text)
+            buttons = layout
+            labels = ('↑', '↓')
+        widget.caption = text
+        self._bind_item_widget(widget, info)
+        btn_up = QPushButton(labels[0], widget)
+        btn_up.setFixedWidth(28)
+        btn_up.clicked.connect(lambda _, it=item: self.move_item(it, -1))
+        buttons.addWidget(btn_up)
+        btn_down = QPushButton(labels[1], widget)
+        btn_down.setFixedWidth(28)
+        btn_down.clicked.connect(lambda _, it=item: self.move_item(it, 1))
+        buttons.addWidget(btn_down)
+        buttons.addStretch(1)
+        return widget
+
+    def _bind_item_widget(self, widget, info):
+        """行ウィジェットのキャプションをページinfoの内容にする"""
+        name = os.path.basename(info.pdf_path)
+        edit = ""
+        if info.rotation % 360:
+            edit += f" ↻{info.rotation % 360}°"
+        if info.crop is not None:
+            edit += " 切抜"
+        if self.grid_mode:
+            widget.caption.setText(f"{info.page_num+1}{edit}: {name}")
+            widget.caption.setToolTip(f"{name}\nページ{info.page_num+1}{edit}")
+        else:
+            widget.caption.setText(f"{name}\nページ{info.page_num+1}{edit}")
+        widget.page_info = info
+
+    def _sync_item_widget(self, info, item):
+        """並べ替えで行のページが入れ替わっていたら、ウィジェットの表示を付け替える"""
+        widget = self.itemWidget(item)
+        if widget is None or getattr(widget, "page_info", None) is info:
+            return
+        self._bind_item_widget(widget, info)
+        label = widget.findChild(QLabel)
+        if label:
+            label.clear()
+        item.setData(THUMB_SHOWN_ROLE, None)  # 消した表示を表示済みとして扱わない
 
     def show_loading(self, message=None):
         if message:
@@ -257,96 +729,657 @@ class PDFThumbnailListViewer(QListWidget):
         self.show_loading("サムネイルを読み込み中...")
         self.clear()
         self.page_items = []
+        self.undo_log.clear()
         if not self.pdf_files and self.pdf_dir:
             self.pdf_files = [f for f in os.listdir(self.pdf_dir) if f.lower().endswith('.pdf')]
-        worker = PDFListLoadWorker(self.pdf_dir, self.pdf_files)
+        self._full_load_pending = True
+        self._pending_appends = []
+        worker = PDFListLoadWorker(self.pdf_dir, list(self.pdf_files))
         worker.signals.finished.connect(self.pdf_list_loaded.emit)
         self.thread_pool.start(worker)
 
     def _on_pdf_list_loaded(self, pdf_page_list):
         self.clear()
         self.page_items = []
-        self._pdf_page_iter = iter(pdf_page_list)
+        self.undo_log.clear()
+        self._prune_text_index = True
+        self._full_load_pending = False
+        pending, self._pending_appends = self._pending_appends, []
+        self._pdf_page_iter = iter(pdf_page_list + pending)
         self._initial_load_rows = self._visible_row_threshold()
         self._process_page_batch()
 
     def _visible_row_threshold(self) -> int:
-        row_h = self.thumb_h + 16 + self.spacing()
-        if row_h <= 0:
-            return 0
-        rows = max(1, self.viewport().height() // row_h)
-        return rows * 2
+        """レイアウト前に、最初の2画面分に入るページ数を見積もる"""
+        hint = self._item_size_hint()
+        cell_w = hint.width() + 2 * self.spacing()
+        cell_h = hint.height() + 2 * self.spacing()
+        cols = max(1, self.viewport().width() // cell_w) if self.grid_mode else 1
+        rows = max(1, self.viewport().height() // cell_h)
+        return cols * rows * 2
 
     def _process_page_batch(self, batch_size: int = 10):
         """Process a small batch of pages to keep UI responsive."""
         if self._pdf_page_iter is None:
             return
+        with metrics.span("list.batch"):
+            done = self._add_page_batch(batch_size)
+        if done:
+            self._load_visible_thumbnails()
+            return
+        QApplication.processEvents()
+        self._load_visible_thumbnails()
+        QTimer.singleShot(0, self._process_page_batch)
+
+    def _add_page_batch(self, batch_size: int) -> bool:
+        """ページ行をbatch_size件追加する。全件追加し終えたらTrue"""
         for _ in range(batch_size):
             try:
                 pdf_path, page_num = next(self._pdf_page_iter)
             except StopIteration:
                 self._pdf_page_iter = None
                 self.hide_loading()
-                return
+                self.update_text_index()
+                if self._dedupe_after_load:
+                    added, self._dedupe_after_load = self._dedupe_after_load, set()
+                    self.detect_duplicates(collapse=True, only=added)
+                return True
             info = PDFPageInfo(pdf_path=pdf_path, page_num=page_num)
-            item = QListWidgetItem()
-            item.setData(Qt.ItemDataRole.UserRole, info)
-            item.setSizeHint(QSize(self.thumb_w + 180, self.thumb_h + 16))
             row_index = self.count()
+            item = self._insert_page_row(row_index, info)
             if row_index < getattr(self, "_initial_load_rows", 0):
-                key = (pdf_path, page_num)
-                self._thumbnail_requested.add(key)
-                pixmap = self.get_thumbnail(pdf_path, page_num, self.on_thumbnail_ready)
-            else:
-                pixmap = None
-            widget = QWidget()
-            hbox = QHBoxLayout(widget)
-            label = QLabel()
-            if pixmap:
-                label.setPixmap(pixmap)
-            label.setFixedSize(self.thumb_w, self.thumb_h)
-            hbox.addWidget(label)
-            text = QLabel(f"{os.path.basename(pdf_path)}\nページ{page_num+1}")
-            hbox.addWidget(text)
-            btn_up = QPushButton('↑')
-            btn_up.setFixedWidth(28)
-            btn_up.clicked.connect(lambda _, it=item: self.move_item(it, -1))
-            hbox.addWidget(btn_up)
-            btn_down = QPushButton('↓')
-            btn_down.setFixedWidth(28)
-            btn_down.clicked.connect(lambda _, it=item: self.move_item(it, 1))
-            hbox.addWidget(btn_down)
-            hbox.addStretch(1)
-            widget.setLayout(hbox)
-            self.addItem(item)
-            self.setItemWidget(item, widget)
-            self.page_items.append((info, item))
-        QApplication.processEvents()
-        self._load_visible_thumbnails()
-        QTimer.singleShot(0, self._process_page_batch)
+                self._update_row_thumbnail(info, item)
+            metrics.incr("list.rows")
+        return False
 
     def _load_visible_thumbnails(self):
         """Load thumbnails for items that are currently visible."""
         if not self.page_items:
             return
-        vh = self.viewport().height()
-        row_h = self.thumb_h + 16 + self.spacing()
-        rows = max(1, vh // row_h)
-        top_index = self.indexAt(QPoint(0, 0)).row()
-        if top_index == -1:
-            top_index = 0
-        bottom_index = self.indexAt(QPoint(0, vh - 1)).row()
-        if bottom_index == -1:
-            bottom_index = self.count() - 1
-        start = max(0, top_index - rows)
-        end = min(self.count() - 1, bottom_index + rows)
-        for row in range(start, end + 1):
-            info, item = self.page_items[row]
-            key = (info.pdf_path, info.page_num)
-            if key in self.thumbnail_cache or key in self._thumbnail_requested:
+        if self.adaptive_prefetch and self._scroll_tracker.is_flinging():
+            # 高速スクロール中は要求せず、停止後にまとめて読み込む
+            return
+        first, last = self._visible_range()
+        start, end = self._prefetch_range()
+        if self.adaptive_prefetch:
+            self._cancel_stale_workers(start, end)
+        # 待ち行列は先着順なので、表示中→進行方向（近い順）→逆方向の順に要求する
+        behind = range(first - 1, start - 1, -1)
+        ahead = range(last + 1, end + 1)
+        if self._scroll_tracker.velocity < 0:
+            behind, ahead = ahead, behind
+        for positions in (range(first, last + 1), ahead, behind):
+            for pos in positions:
+                info, item = self.page_items[self._row_at(pos)]
+                self._update_row_thumbnail(info, item)
+
+    def _cancel_stale_workers(self, start, end):
+        """先読み範囲 [start, end] から外れたページの未着手の描画を待ち行列から取り下げる"""
+        keep = set()
+        for pos in range(start, end + 1):
+            info = self.page_items[self._row_at(pos)][0]
+            keep.add((info.pdf_path, info.page_num))
+        for worker in list(self._workers):
+            if (worker.pdf_path, worker.page_num) in keep:
+                continue
+            if not worker.pool.tryTake(worker):
+                continue  # 実行中・実行済み
+            self._workers.remove(worker)
+            if worker.signals in self._signals:
+                self._signals.remove(worker.signals)
+            worker.signals.deleteLater()
+            if not worker.preview:
+                self._thumbnail_requested.discard((worker.pdf_path, worker.page_num, worker.level))
+            metrics.incr("thumbnail.cancelled")
+        metrics.set_gauge("thumbnail.queue_depth", len(self._workers))
+
+    def _on_scroll_value_changed(self, value):
+        self._sharp_pending_since = None
+        if not self.adaptive_prefetch:
+            self._load_visible_thumbnails()
+            return
+        bar = self.verticalScrollBar()
+        self._scroll_tracker.update(value, bar.pageStep())
+        # 位置の変化ごとではなく一定間隔でまとめて先読みを更新する
+        if not self._scroll_timer.isActive():
+            self._scroll_timer.start()
+        self._settle_timer.start()
+
+    def _on_scroll_tick(self):
+        self._load_visible_thumbnails()
+
+    def _on_scroll_settled(self):
+        self._scroll_tracker.reset()
+        self._sharp_pending_since = time.perf_counter()
+        self._load_visible_thumbnails()
+        self._check_visible_sharp()
+
+    def _check_visible_sharp(self):
+        """停止後、表示中の項目がすべて表示サイズの段になったら所要時間を記録する"""
+        first, last = self._visible_range()
+        for pos in range(first, last + 1):
+            if self.page_items[self._row_at(pos)][1].data(THUMB_SHOWN_ROLE) != self._display_gen:
+                return
+        metrics.record_span("scroll.time_to_sharp", time.perf_counter() - self._sharp_pending_since)
+        self._sharp_pending_since = None
+
+    # --- 行単位の追加・削除・更新（一覧全体は読み直さない） ---
+    def _resolve_pdf_path(self, pdf_file):
+        return pdf_file if os.path.isabs(pdf_file) else os.path.join(self.pdf_dir, pdf_file)
+
+    def add_pdf_files(self, pdf_paths):
+        """
+        PDFのページ行を末尾に追加する。開くのは追加分のみで、
+        既存の行・並び順・選択・サムネイルはそのまま
+        一覧に既にあるファイルは追加しない。追加したファイルのリストを返す
+        """
+        known = {_path_key(self._resolve_pdf_path(f)) for f in self.pdf_files}
+        known.update(_path_key(info.pdf_path) for info, _ in self.page_items)
+        new_paths = []
+        for pdf_path in pdf_paths:
+            key = _path_key(pdf_path)
+            if key not in known:
+                known.add(key)
+                new_paths.append(pdf_path)
+        if not new_paths:
+            return []
+        self.pdf_files.extend(new_paths)
+        if self.auto_collapse_duplicates:
+            self._dedupe_after_load.update(new_paths)
+        worker = PDFListLoadWorker(None, new_paths)
+        worker.signals.finished.connect(self._append_pages)
+        self.thread_pool.start(worker)
+        return new_paths
+
+    def _append_pages(self, pdf_page_list):
+        if not pdf_page_list:
+            return
+        if self._full_load_pending:
+            # 一覧の読み直し中: 完了時に消されないよう、その後ろにつなぐ
+            self._pending_appends.extend(pdf_page_list)
+            return
+        if self._pdf_page_iter is not None:
+            # 読み込み中なら残りの後ろにつなぐ
+            self._pdf_page_iter = itertools.chain(self._pdf_page_iter, pdf_page_list)
+            return
+        self._pdf_page_iter = iter(pdf_page_list)
+        self._process_page_batch()
+
+    def remove_pdf_files(self, pdf_paths):
+        """PDFのページ行とキャッシュを取り除く（他の行はそのまま）"""
+        keys = {_path_key(pdf_path) for pdf_path in pdf_paths}
+        rows = [row for row, (info, _) in enumerate(self.page_items) if _path_key(info.pdf_path) in keys]
+        # キャッシュは行のパスの表記で持っているため、その表記でも無効にする
+        self._forget_files(set(pdf_paths) | {self.page_items[row][0].pdf_path for row in rows})
+        self.undo_log.clear()  # 行番号が変わるため以前の記録は使えない
+        self._remove_rows(rows)
+        self.pdf_files = [f for f in self.pdf_files if _path_key(self._resolve_pdf_path(f)) not in keys]
+        self._load_visible_thumbnails()
+
+    def _remove_rows(self, rows, label=None, pdf_files=()):
+        """
+        行番号のリストの行を取り除く（page_itemsも同期）
+        labelを渡すと取り除いた行（ページ・印・選択）を連続区間ごとに記録し、取り消せるようにする
+        pdf_files: 行と一緒にself.pdf_filesから外すファイル（取り消すと元の位置に戻す）
+        """
+        rows = sorted(set(rows))
+        if not rows:
+            return
+        if label is not None:
+            spans = []
+            for row in rows:
+                info, item = self.page_items[row]
+                entry = (info, [item.data(role) for role in _MARK_ROLES], item.isSelected())
+                if spans and spans[-1][0] + len(spans[-1][1]) == row:
+                    spans[-1][1].append(entry)
+                else:
+                    spans.append((row, [entry]))
+        for row in reversed(rows):
+            self.takeItem(row)
+            del self.page_items[row]
+        removed_files = [(i, f) for i, f in enumerate(self.pdf_files) if f in pdf_files]
+        if removed_files:
+            self.pdf_files = [f for f in self.pdf_files if f not in pdf_files]
+        if label is not None:
+            self.undo_log.push(
+                label,
+                lambda: self._restore_rows(spans, removed_files),
+                lambda: self._remove_rows(rows, pdf_files=pdf_files),
+                cost=len(rows),
+            )
+
+    def _restore_rows(self, spans, pdf_files=()):
+        """_remove_rowsで取り除いた行（と一緒に外したファイル [(位置, ファイル)]）を元の位置に戻す"""
+        for i, pdf_file in pdf_files:
+            self.pdf_files.insert(i, pdf_file)
+        for start, entries in spans:
+            for offset, (info, marks, selected) in enumerate(entries):
+                item = self._insert_page_row(start + offset, info)
+                for role, value in zip(_MARK_ROLES, marks):
+                    if value is not None:
+                        item.setData(role, value)
+                item.setSelected(selected)
+        self._load_visible_thumbnails()
+
+    # --- 重複ページの検出・除去 ---
+    def detect_duplicates(self, collapse=False, only=None):
+        """
+        一覧のPDFの内容ハッシュを背景で計算し、同じ内容のページの2件目以降に印を付ける。
+        collapse=Trueなら印を付ける代わりに取り除く（最初に現れた行を残す）
+        only: 取り除く行をこれらのファイルの行に限る（追加したファイルだけを対象にするとき）
+        """
+        pdf_paths = list(dict.fromkeys(info.pdf_path for info, _ in self.page_items))
+        if not pdf_paths:
+            return
+        if self._hash_cache is None:
+            self._hash_cache = ContentHashCache()
+        worker = ContentHashWorker(pdf_paths, self._hash_cache)
+        worker.signals.finished.connect(
+            lambda hashes, c=collapse: self._on_content_hashes(hashes, c, only)
+        )
+        self.thread_pool.start(worker)
+
+    def _on_content_hashes(self, hashes, collapse, only=None):
+        # 計算中に並べ替え・追加された場合も、現在の順序で判定する
+        duplicates = find_duplicates(
+            [(info.pdf_path, info.page_num) for info, _ in self.page_items], hashes
+        )
+        if only is not None:
+            keys = {_path_key(pdf_path) for pdf_path in only}
+            duplicates = {
+                row: first for row, first in duplicates.items()
+                if _path_key(self.page_items[row][0].pdf_path) in keys
+            }
+        n_files = len(duplicate_files(hashes))
+        if collapse:
+            # 全ページが重複だったファイルは一覧のファイルからも外す（取り消しで戻す）
+            remaining = {info.pdf_path for row, (info, _) in enumerate(self.page_items) if row not in duplicates}
+            emptied = {
+                f for f in self.pdf_files
+                if self._resolve_pdf_path(f) not in remaining and self._resolve_pdf_path(f) in hashes
+            }
+            self._remove_rows(duplicates, label="重複ページの除去", pdf_files=emptied)
+            self._load_visible_thumbnails()
+        else:
+            self._mark_duplicates(duplicates)
+        self.duplicates_detected.emit(len(duplicates), n_files, collapse)
+
+    def _mark_duplicates(self, duplicates):
+        from PyQt6.QtGui import QBrush, QColor
+        for row, (info, item) in enumerate(self.page_items):
+            original = duplicates.get(row)
+            if original is None:
+                if item.data(DUPLICATE_ROLE) is not None:
+                    item.setData(DUPLICATE_ROLE, None)
+                    item.setBackground(QBrush())
+                    item.setToolTip("")
                 continue
-            self._thumbnail_requested.add(key)
-            self.get_thumbnail(info.pdf_path, info.page_num, self.on_thumbnail_ready)
+            first = self.page_items[original][0]
+            item.setData(DUPLICATE_ROLE, first)
+            item.setBackground(QColor(255, 224, 192))
+            item.setToolTip(
+                f"重複: {os.path.basename(first.pdf_path)} ページ{first.page_num+1} と同じ内容"
+            )
+
+    # --- 全文索引・検索 ---
+    def update_text_index(self):
+        """一覧のPDFのうち未登録・変更されたもののテキストを背景で索引に登録する"""
+        pdf_paths = list(dict.fromkeys(info.pdf_path for info, _ in self.page_items))
+        if not pdf_paths:
+            return
+        worker = TextIndexWorker(pdf_paths, self.text_index_path, prune=self._prune_text_index)
+        self._prune_text_index = False
+        worker.signals.finished.connect(self._on_text_index_updated)
+        self.index_pool.start(worker)
+
+    def _on_text_index_updated(self, extracted):
+        if self._text_filter is not None:
+            self.filter_by_text(self._text_filter)  # 追加・更新された行も絞り込みに反映
+        self.text_index_updated.emit(extracted)
+
+    def search_text(self, query):
+        """検索語をすべて含む一覧中のページ {(pdf_path, page_num)}"""
+        if self._text_index is None:
+            self._text_index = TextIndex(self.text_index_path)
+        pdf_paths = {info.pdf_path for info, _ in self.page_items}
+        with metrics.span("text.search"):
+            return self._text_index.search(query, pdf_paths)
+
+    def filter_by_text(self, query):
+        """検索語を含むページの行だけを表示する。空文字なら絞り込みを解除する。一致件数を返す"""
+        query = (query or "").strip()
+        if not query:
+            self._text_filter = None
+            self._text_matches = set()
+            for row in range(self.count()):
+                if self.isRowHidden(row):
+                    self.setRowHidden(row, False)
+            self._shown_rows = None
+            self._load_visible_thumbnails()
+            return len(self.page_items)
+        matches = self.search_text(query)
+        self._text_filter = query
+        self._text_matches = matches
+        self.setUpdatesEnabled(False)
+        try:
+            for row, (info, _) in enumerate(self.page_items):
+                hidden = (info.pdf_path, info.page_num) not in matches
+                if self.isRowHidden(row) != hidden:
+                    self.setRowHidden(row, hidden)
+        finally:
+            self.setUpdatesEnabled(True)
+        self._shown_rows = None
+        self._load_visible_thumbnails()
+        return sum(1 for info, _ in self.page_items if (info.pdf_path, info.page_num) in matches)
+
+    def jump_to_next_match(self, query):
+        """現在行より後で検索語を含む最初の行へ移動する（末尾まで行ったら先頭から）"""
+        matches = self._text_matches if query.strip() == self._text_filter else self.search_text(query)
+        if not matches:
+            return False
+        start = self.currentRow() + 1
+        n = len(self.page_items)
+        for i in range(n):
+            row = (start + i) % n
+            info, item = self.page_items[row]
+            if (info.pdf_path, info.page_num) in matches:
+                self.setCurrentRow(row)
+                self.scrollToItem(item, QAbstractItemView.ScrollHint.PositionAtCenter)
+                return True
+        return False
+
+    # --- 空白ページの検出・除去 ---
+    def detect_blank_pages(self, remove=False):
+        """
+        全ページの空白度を判定し、空白ページに印を付ける（remove=Trueなら取り除く）
+        判定済み・サムネイルがキャッシュ済みのページはその場で、残りは背景で極小描画して判定する
+        """
+        pending = []
+        with metrics.span("blank.cached"):
+            for info, _ in self.page_items:
+                key = (info.pdf_path, info.page_num)
+                if key in self._blank_scores:
+                    continue
+                found = self.thumbnail_cache.nearest(info.pdf_path, info.page_num, 0)
+                if found is None:
+                    pending.append(key)
+                    continue
+                self._blank_scores[key] = qimage_ink_fraction(found[1].toImage())
+        if not pending:
+            self._apply_blank_scores(remove)
+            return
+        # 判定中にファイルが更新・削除されたら、その結果は使わない
+        gens = {pdf_path: self._file_gen.get(pdf_path, 0) for pdf_path, _ in pending}
+        n = max(1, min(self.thread_pool.maxThreadCount(), len(pending) // BLANK_BATCH_MIN_PAGES))
+        size = -(-len(pending) // n)
+        batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+        waiting = [len(batches)]
+        for batch in batches:
+            worker = BlankAnalysisWorker(batch)
+            worker.signals.finished.connect(
+                lambda scores, r=remove: self._on_blank_scores(scores, r, gens, waiting)
+            )
+            self.thread_pool.start(worker)
+
+    def _on_blank_scores(self, scores, remove, gens, waiting):
+        """背景の判定結果を取り込み、すべてのワーカーが終わったら印を付ける（取り除く）"""
+        self._blank_scores.update(
+            (key, score) for key, score in scores.items()
+            if self._file_gen.get(key[0], 0) == gens.get(key[0])
+        )
+        waiting[0] -= 1
+        if waiting[0] == 0:
+            self._apply_blank_scores(remove)
+
+    def _apply_blank_scores(self, remove):
+        from PyQt6.QtGui import QBrush, QColor
+        blank_rows = []
+        for row, (info, item) in enumerate(self.page_items):
+            score = self._blank_scores.get((info.pdf_path, info.page_num))
+            if score is not None and is_blank(score):
+                blank_rows.append(row)
+                item.setData(BLANK_ROLE, score)
+                item.setBackground(QColor(210, 225, 245))
+                item.setToolTip(f"空白ページ（インク {score * 100:.2f}%）")
+            elif item.data(BLANK_ROLE) is not None:
+                item.setData(BLANK_ROLE, None)
+                item.setBackground(QBrush())
+                item.setToolTip("")
+        if remove:
+            self._remove_rows(blank_rows, label="空白ページの除去")
+            self._load_visible_thumbnails()
+        self.blank_pages_detected.emit(len(blank_rows), remove)
+
+    def select_blank_pages(self):
+        """印の付いた空白ページを選択する"""
+        self.set_selected_ranges(RangeSelection.from_rows(
+            row for row, (_, item) in enumerate(self.page_items) if item.data(BLANK_ROLE) is not None
+        ))
+
+    def select_duplicates(self):
+        """印の付いた重複ページを選択する"""
+        self.set_selected_ranges(RangeSelection.from_rows(
+            row for row, (_, item) in enumerate(self.page_items) if item.data(DUPLICATE_ROLE) is not None
+        ))
+
+    # --- 選択（行の区間で扱う） ---
+    def selected_ranges(self) -> RangeSelection:
+        """選択中の行の区間。選択モデルの区間から作るため選択行数によらない"""
+        return RangeSelection(
+            (r.top(), r.bottom() + 1) for r in self.selectionModel().selection()
+        )
+
+    def set_selected_ranges(self, ranges, mode=QItemSelectionModel.SelectionFlag.ClearAndSelect):
+        self.selectionModel().select(self._qt_selection(ranges), mode)
+
+    def _qt_selection(self, ranges):
+        selection = QItemSelection()
+        model = self.model()
+        for start, end in ranges.ranges:
+            selection.select(model.index(start, 0), model.index(end - 1, 0))
+        return selection
+
+    def get_selected_pages(self):
+        """選択中のページのPDFPageInfoを表示順で返す"""
+        return [
+            info
+            for start, end in self.selected_ranges().ranges
+            for info, _ in self.page_items[start:end]
+        ]
+
+    def select_range(self, start, end, extend=False):
+        """[start, end) の行を選択する。extendなら現在の選択に加える"""
+        ranges = self.selected_ranges() if extend else RangeSelection()
+        ranges.add(max(0, start), min(end, self.count()))
+        self.set_selected_ranges(ranges)
+
+    def invert_selection(self):
+        """選択を反転する（絞り込みで隠れている行も対象）"""
+        self.set_selected_ranges(self.selected_ranges().inverted(self.count()))
+
+    def select_file(self, pdf_path, extend=False):
+        """pdf_pathのページの行をすべて選択する。extendなら現在の選択に加える"""
+        ranges = self._file_row_ranges().get(pdf_path, RangeSelection())
+        if extend:
+            ranges = ranges.union(self.selected_ranges())
+        self.set_selected_ranges(ranges)
+
+    def _file_row_ranges(self):
+        """{pdf_path: そのファイルの行のRangeSelection}（行が変わるまで使い回す）"""
+        if self._file_ranges is None:
+            spans = {}
+            for row, (info, _) in enumerate(self.page_items):
+                runs = spans.setdefault(info.pdf_path, [])
+                if runs and runs[-1][1] == row:
+                    runs[-1][1] = row + 1
+                else:
+                    runs.append([row, row + 1])
+            self._file_ranges = {
+                pdf_path: RangeSelection(map(tuple, runs)) for pdf_path, runs in spans.items()
+            }
+        return self._file_ranges
+
+    def _invalidate_file_ranges(self, *args):
+        self._file_ranges = None
+
+    def reload_pdf_files(self, pdf_paths):
+        """
+        更新されたPDFのページ数を読み直し、そのファイルの行だけを合わせる。
+        残るページの行は位置・選択を保ったままサムネイルを描画し直す
+        """
+        pdf_paths = list(pdf_paths)
+        if not pdf_paths:
+            return
+        keys = {_path_key(pdf_path) for pdf_path in pdf_paths}
+        self._forget_files(
+            set(pdf_paths) | {info.pdf_path for info, _ in self.page_items if _path_key(info.pdf_path) in keys}
+        )
+        worker = PDFListLoadWorker(None, pdf_paths)
+        worker.signals.finished.connect(
+            lambda pages, paths=pdf_paths: self._on_pdf_files_reloaded(paths, pages)
+        )
+        self.thread_pool.start(worker)
+
+    def _on_pdf_files_reloaded(self, pdf_paths, pdf_page_list):
+        # 監視側と一覧側でパスの表記が違うことがあるため、比較用キーで突き合わせる
+        counts = Counter(_path_key(pdf_path) for pdf_path, _ in pdf_page_list)
+        self.undo_log.clear()  # ページ数の変化で行番号が変わるため以前の記録は使えない
+        for pdf_path in pdf_paths:
+            key = _path_key(pdf_path)
+            n = counts.get(key, 0)
+            for row in range(len(self.page_items) - 1, -1, -1):
+                info = self.page_items[row][0]
+                if _path_key(info.pdf_path) == key and info.page_num >= n:
+                    self.takeItem(row)
+                    del self.page_items[row]
+            present = set()
+            row = len(self.page_items)
+            for i, (info, item) in enumerate(self.page_items):
+                if _path_key(info.pdf_path) == key:
+                    pdf_path = info.pdf_path  # 増えたページも既存の行と同じ表記にする
+                    present.add(info.page_num)
+                    item.setData(THUMB_SHOWN_ROLE, None)
+                    row = i + 1
+            # 増えたページはそのファイルの最後の行の後ろ（なければ末尾）に挿入する
+            for page_num in range(n):
+                if page_num not in present:
+                    self._insert_page_row(row, PDFPageInfo(pdf_path=pdf_path, page_num=page_num))
+                    row += 1
+        self._load_visible_thumbnails()
+        self.update_text_index()
+
+    def _forget_files(self, pdf_paths):
+        """ファイルのキャッシュ・要求中の描画を無効にする"""
+        pdf_paths = set(pdf_paths)
+        for pdf_path in pdf_paths:
+            self._file_gen[pdf_path] = self._file_gen.get(pdf_path, 0) + 1
+            self.thumbnail_cache.discard_file(pdf_path)
+        if self._blank_scores:
+            self._blank_scores = {
+                key: score for key, score in self._blank_scores.items() if key[0] not in pdf_paths
+            }
+        self._thumbnail_requested = {
+            key for key in self._thumbnail_requested if key[0] not in pdf_paths
+        }
+
+    # --- 表示位置（絞り込み中は非表示の行を除いた並び）と行番号の対応 ---
+    def _invalidate_shown_rows(self, *args):
+        self._shown_rows = None
+
+    def _display_rows(self):
+        """絞り込み中は表示している行番号のリスト、それ以外はNone"""
+        if self._text_filter is None:
+            return None
+        if self._shown_rows is None:
+            self._shown_rows = [row for row in range(self.count()) if not self.isRowHidden(row)]
+        return self._shown_rows
+
+    def _display_count(self) -> int:
+        rows = self._display_rows()
+        return self.count() if rows is None else len(rows)
+
+    def _row_at(self, pos: int) -> int:
+        rows = self._display_rows()
+        return pos if rows is None else rows[pos]
+
+    def _visible_range(self):
+        """
+        表示中の項目の表示位置の範囲 (first, last) を返す（lastを含む、絞り込みなしなら行番号と同じ）
+        一覧・グリッドとも項目は表示順に並び、各項目の下端は単調なので二分探索する
+        """
+        count = self._display_count()
+        if count == 0:
+            return 0, -1
+        vh = self.viewport().height()
+
+        def rect(pos):
+            return self.visualRect(self.model().index(self._row_at(pos), 0))
+
+        # 下端が画面上端より下にある最初の項目
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rect(mid).bottom() < 0:
+                lo = mid + 1
+            else:
+                hi = mid
+        first = min(lo, count - 1)
+        # 上端が画面下端より上にある最後の項目
+        lo, hi = first, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rect(mid).top() < vh:
+                lo = mid + 1
+            else:
+                hi = mid
+        return first, max(first, lo - 1)
+
+    def _prefetch_range(self):
+        """
+        表示中の項目と先読み範囲 (start, end) を返す（endを含む）
+        停止中は前後1画面、スクロール中は速度に応じて進行方向を広く取る
+        """
+        first, last = self._visible_range()
+        per_screen = last - first + 1
+        before, after = 1.0, 1.0
+        if self.adaptive_prefetch:
+            before, after = self._scroll_tracker.prefetch_screens()
+        start = max(0, first - int(per_screen * before))
+        end = min(self._display_count() - 1, last + int(per_screen * after))
+        return start, end
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # グリッド表示では幅で1画面の項目数が変わるため、レイアウト後に表示範囲を読み直す
+        QTimer.singleShot(0, self._load_visible_thumbnails)
+
+    def event(self, event):
+        # 別のDPRの画面へ移動したとき (Qt 6.6以降)
+        dpr_change = getattr(QEvent.Type, "DevicePixelRatioChange", None)
+        if dpr_change is not None and event.type() == dpr_change:
+            self._on_device_pixel_ratio_changed()
+        return super().event(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._on_device_pixel_ratio_changed()
+
+    def _on_device_pixel_ratio_changed(self):
+        """
+        デバイスピクセル比が変わったら、表示範囲をキャッシュの最寄りの段で差し替え、
+        必要な段が未キャッシュの行だけ描画し直す（他の段のキャッシュは残す）
+        """
+        dpr = self.devicePixelRatioF()
+        if dpr == self._dpr:
+            return
+        self._dpr = dpr
+        self._refresh_thumbnail_display()
+
+    def _refresh_thumbnail_display(self):
+        """表示サイズ・DPRの変更後に表示範囲のサムネイルを合わせ直す（範囲外はスクロール時）"""
+        self._display_gen += 1
+        self._thumbnail_requested.clear()
+        self._load_visible_thumbnails()
 
     def on_item_doubleclicked(self, item):
         """
@@ -355,6 +1388,8 @@ class PDFThumbnailListViewer(QListWidget):
         info = item.data(Qt.ItemDataRole.UserRole)
         if info is None:
             return
+        # プレビュー（fitz・印刷サポート）は起動時に読み込まず初回使用時に読み込む
+        from components.pdf_preview_widget import PDFPreviewWidget
         dlg = QDialog(self)
         dlg.setWindowTitle(
             f"プレビュー: {os.path.basename(info.pdf_path)} ページ{info.page_num+1}"
@@ -370,69 +1405,262 @@ class PDFThumbnailListViewer(QListWidget):
         dlg.resize(800, 1000)
         dlg.exec()
 
-    def save_state(self, path=None):
+    def save_state(self, path=None, compact=None):
         """
-        現在のページ順序・選択状態をJSONで保存
+        現在のページ順序・選択状態を保存
+        拡張子が.pdfstateの場合（またはcompact=True）はコンパクト形式、それ以外はJSON
         """
-        import json
         from PyQt6.QtWidgets import QFileDialog
         if path is None:
-            path, _ = QFileDialog.getSaveFileName(self, "状態保存ファイル", "", "JSON Files (*.json)")
+            path, _ = QFileDialog.getSaveFileName(self, "状態保存ファイル", "", STATE_FILE_FILTER)
             if not path:
                 return
-        state = {
-            "pages": [
-                {"pdf_path": info.pdf_path, "page_num": info.page_num}
-                for info, _ in getattr(self, "page_items", [])
-            ],
-            "selected": [i for i, (_, item) in enumerate(getattr(self, "page_items", [])) if item.isSelected()]
-        }
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
+        page_items = getattr(self, "page_items", [])
+        write_state(
+            path,
+            [(info.pdf_path, info.page_num) for info, _ in page_items],
+            iter(self.selected_ranges()),
+            compact=compact,
+            edits={
+                row: (info.rotation, info.crop)
+                for row, (info, _) in enumerate(page_items)
+                if info.rotation % 360 or info.crop is not None
+            },
+        )
 
     def load_state(self, path=None):
         """
         保存されたページ順序・選択状態を復元
         """
-        import json
         from PyQt6.QtWidgets import QFileDialog
         if path is None:
-            path, _ = QFileDialog.getOpenFileName(self, "状態ファイルを選択", "", "JSON Files (*.json)")
+            path, _ = QFileDialog.getOpenFileName(self, "状態ファイルを選択", "", STATE_FILE_FILTER)
             if not path:
                 return
-        with open(path, "r", encoding="utf-8") as f:
-            state = json.load(f)
+        state = read_state(path)
+        for pdf_path in stale_paths(state):
+            print(f"{pdf_path} は状態保存後に変更されています")
+        self.undo_log.clear()
         self.clear()
         self.page_items = []
-        for page in state.get("pages", []):
-            info = PDFPageInfo(pdf_path=page["pdf_path"], page_num=page["page_num"])
-            item = QListWidgetItem()
-            item.setData(Qt.ItemDataRole.UserRole, info)
-            item.setSizeHint(QSize(self.thumb_w + 180, self.thumb_h + 16))
-            widget = QWidget()
-            hbox = QHBoxLayout(widget)
-            label = QLabel()
-            label.setFixedSize(self.thumb_w, self.thumb_h)
-            hbox.addWidget(label)
-            text = QLabel(f"{os.path.basename(info.pdf_path)}\nページ{info.page_num+1}")
-            hbox.addWidget(text)
-            btn_up = QPushButton('↑')
-            btn_up.setFixedWidth(28)
-            btn_up.clicked.connect(lambda _, it=item: self.move_item(it, -1))
-            hbox.addWidget(btn_up)
-            btn_down = QPushButton('↓')
-            btn_down.setFixedWidth(28)
-            btn_down.clicked.connect(lambda _, it=item: self.move_item(it, 1))
-            hbox.addWidget(btn_down)
-            hbox.addStretch(1)
-            widget.setLayout(hbox)
-            self.addItem(item)
-            self.setItemWidget(item, widget)
-            self.page_items.append((info, item))
+        for row, (pdf_path, page_num) in enumerate(state.pages):
+            rotation, crop = state.edits.get(row, (0, None))
+            self._insert_page_row(self.count(), PDFPageInfo(pdf_path, page_num, rotation, crop))
         # 選択状態復元
-        for i in state.get("selected", []):
-            if 0 <= i < len(self.page_items):
-                self.page_items[i][1].setSelected(True)
+        self.set_selected_ranges(
+            RangeSelection((start, min(end, len(self.page_items))) for start, end in state.selected_ranges)
+        )
+
+    # --- ページの回転・切り抜き（結合時にページの属性として設定する） ---
+    def _edit_target_rows(self):
+        """編集の対象行: 選択行、選択がなければ現在行"""
+        selected = self.selected_ranges()
+        if selected:
+            return list(selected)
+        row = self.currentRow()
+        return [row] if 0 <= row < len(self.page_items) else []
+
+    def rotate_pages(self, degrees=90, rows=None):
+        """対象行のページを時計回りにdegrees（90の倍数）回転する"""
+        if degrees % 90:
+            raise ValueError("回転は90度単位で指定してください")
+        self._edit_pages(
+            rows, lambda info: info._replace(rotation=(info.rotation + degrees) % 360), f"{degrees % 360}°回転"
+        )
+
+    def crop_pages(self, crop, rows=None):
+        """
+        対象行のページを切り抜く。cropは元の向きで表示したページに対する割合 (x0, y0, x1, y1)
+        Noneなら切り抜きを解除する
+        """
+        if crop is not None:
+            x0, y0, x1, y1 = crop
+            if not (0 <= x0 < x1 <= 1 and 0 <= y0 < y1 <= 1):
+                raise ValueError("切り抜きは0〜1の範囲で x0 < x1, y0 < y1 を指定してください")
+            crop = (float(x0), float(y0), float(x1), float(y1))
+        self._edit_pages(rows, lambda info: info._replace(crop=crop), "切り抜き" if crop else "切り抜き解除")
+
+    def clear_page_edits(self, rows=None):
+        self._edit_pages(rows, lambda info: info._replace(rotation=0, crop=None), "回転・切り抜きの解除")
+
+    def _edit_pages(self, rows, change, label):
+        rows = self._edit_target_rows() if rows is None else list(rows)
+        before = [self.page_items[row][0] for row in rows]
+        after = [change(info) for info in before]
+        changed = [(row, old, new) for row, old, new in zip(rows, before, after) if old != new]
+        if not changed:
+            return
+        rows, before, after = (list(col) for col in zip(*changed))
+        self._set_page_infos(rows, after)
+        self.undo_log.push(
+            label,
+            lambda: self._set_page_infos(rows, before),
+            lambda: self._set_page_infos(rows, after),
+            cost=len(rows),
+        )
+
+    def _set_page_infos(self, rows, infos):
+        """行のページ情報を差し替える。サムネイルは表示範囲に入ったときにキャッシュから変形して付け直す"""
+        with metrics.span("list.page_edit"):
+            model = self.model()
+            model.blockSignals(True)
+            try:
+                for row, info in zip(rows, infos):
+                    item = self.page_items[row][1]
+                    item.setData(_INFO_ROLE, info)
+                    item.setData(THUMB_SHOWN_ROLE, None)
+                    self.page_items[row] = (info, item)
+            finally:
+                model.blockSignals(False)
+            model.dataChanged.emit(model.index(min(rows), 0), model.index(max(rows), 0), [])
+            self._load_visible_thumbnails()
+        metrics.incr("list.edited_pages", len(rows))
+
+    # --- 一括並べ替え ---
+    def apply_order(self, order, label="並べ替え"):
+        """
+        行を並べ替える。orderは新しい並びの各位置に置く現在の行番号（全行の順列）
+        行（QListWidgetItemとウィジェット）は動かさず、各行のページ情報と印を付け替える。
+        ウィジェットの表示は表示範囲に入ったときに付け替えるため、行数によらず一度の更新で済む
+        """
+        n = len(self.page_items)
+        if len(order) != n or sorted(order) != list(range(n)):
+            raise ValueError("orderは全行の順列である必要があります")
+        positions = array("l", (row for row, src in enumerate(order) if row != src))
+        if not positions:
+            return
+        sources = array("l", (order[row] for row in positions))
+        self._move_pages(positions, sources)
+        # 取り消しは移動した行の組だけを逆向きに適用する
+        self.undo_log.push(
+            label,
+            lambda: self._move_pages(sources, positions),
+            lambda: self._move_pages(positions, sources),
+            cost=len(positions),
+        )
+
+    def _move_pages(self, positions, sources):
+        """
+        positions[i]の行にsources[i]の行のページを置く（sourcesはpositionsの並べ替え）
+        触るのは指定した行だけで、選択・現在行・印はページについて移す
+        """
+        with metrics.span("list.reorder"):
+            page_items = self.page_items
+            selection = self.selectionModel()
+            moved = [page_items[src][0] for src in sources]
+            # 選択がなければ選択の付け替えは不要
+            selected = [selection.isRowSelected(src) for src in sources] if selection.hasSelection() else None
+            marks = {}
+            for row in sources:
+                item = page_items[row][1]
+                if item.data(DUPLICATE_ROLE) is not None or item.data(BLANK_ROLE) is not None:
+                    marks[row] = [item.data(role) for role in _MARK_ROLES]
+            current = self.currentRow()
+            model = self.model()
+            model.blockSignals(True)
+            try:
+                for row, src, info in zip(positions, sources, moved):
+                    item = page_items[row][1]
+                    item.setData(_INFO_ROLE, info)
+                    item.setData(THUMB_SHOWN_ROLE, None)
+                    if marks:
+                        values = marks.get(src)
+                        if values is not None or row in marks:
+                            for role, value in zip(_MARK_ROLES, values or (None,) * len(_MARK_ROLES)):
+                                item.setData(role, value)
+                    page_items[row] = (info, item)
+            finally:
+                model.blockSignals(False)
+            self._file_ranges = None
+            model.dataChanged.emit(model.index(min(positions), 0), model.index(max(positions), 0), [])
+            if selected is not None:
+                rows = sorted(zip(positions, selected))
+                selection.select(
+                    self._row_selection(row for row, on in rows if on),
+                    QItemSelectionModel.SelectionFlag.Select,
+                )
+                selection.select(
+                    self._row_selection(row for row, on in rows if not on),
+                    QItemSelectionModel.SelectionFlag.Deselect,
+                )
+            if current in sources:
+                new_row = positions[list(sources).index(current)]
+                self.setCurrentRow(new_row, QItemSelectionModel.SelectionFlag.NoUpdate)
+        metrics.incr("list.reordered_rows", len(positions))
+        if self._text_filter is not None:
+            self.filter_by_text(self._text_filter)  # 非表示は行の位置に付くため掛け直す
+        else:
+            self._load_visible_thumbnails()
+
+    def _row_selection(self, rows):
+        """行番号を連続区間ごとにまとめたQItemSelection"""
+        return self._qt_selection(RangeSelection.from_rows(rows))
+
+    def _reorder_target_rows(self):
+        """並べ替えの対象行: 2行以上選択していれば選択行、それ以外は全行"""
+        selected = self.selected_ranges()
+        return list(selected) if len(selected) > 1 else list(range(len(self.page_items)))
+
+    def _permute_rows(self, arrange, label):
+        """対象行の並びをarrange(行番号のリスト)で並べ替え、対象行の位置に入れ直す"""
+        rows = self._reorder_target_rows()
+        order = list(range(len(self.page_items)))
+        for pos, src in zip(rows, arrange(rows)):
+            order[pos] = src
+        self.apply_order(order, label)
+
+    def sort_pages(self, key="name", reverse=False):
+        """
+        対象行をkeyで並べ替える（同順位は現在の順を保つ）
+        key: "name"（ファイル名→ページ）, "mtime"（ファイル更新日時→ページ）, "page"（ページ番号→ファイル名）
+        """
+        mtimes = {}
+
+        def mtime(pdf_path):
+            if pdf_path not in mtimes:
+                try:
+                    mtimes[pdf_path] = os.path.getmtime(pdf_path)
+                except OSError:
+                    mtimes[pdf_path] = 0.0
+            return mtimes[pdf_path]
+
+        keys = {
+            "name": (lambda info: (os.path.basename(info.pdf_path).lower(), info.pdf_path, info.page_num),
+                     "ファイル名順"),
+            "mtime": (lambda info: (mtime(info.pdf_path), info.pdf_path, info.page_num), "更新日時順"),
+            "page": (lambda info: (info.page_num, os.path.basename(info.pdf_path).lower(), info.pdf_path),
+                     "ページ番号順"),
+        }
+        if key not in keys:
+            raise ValueError(f"未対応の並べ替えキー: {key}")
+        page_key, name = keys[key]
+        infos = [info for info, _ in self.page_items]
+        self._permute_rows(
+            lambda rows: sorted(rows, key=lambda row: page_key(infos[row]), reverse=reverse),
+            f"{name}に並べ替え",
+        )
+
+    def reverse_pages(self):
+        """対象行の順序を逆にする"""
+        self._permute_rows(lambda rows: rows[::-1], "逆順に並べ替え")
+
+    def interleave_pages(self, reverse_second=False):
+        """
+        対象行の前半と後半を1ページずつ交互に並べる（表面・裏面を別々にスキャンした束の結合）
+        reverse_second=Trueなら後半を逆順にしてから組み合わせる（裏面を逆順に読み取った場合）
+        前半が1ページ多い場合は最後に置く
+        """
+        def arrange(rows):
+            half = (len(rows) + 1) // 2
+            first, second = rows[:half], rows[half:]
+            if reverse_second:
+                second = second[::-1]
+            result = []
+            for a, b in zip(first, second):
+                result.extend((a, b))
+            result.extend(first[len(second):])
+            return result
+        self._permute_rows(arrange, "表裏を交互に並べ替え")
 
     def move_item(self, item, direction):
         """
@@ -441,18 +1669,28 @@ class PDFThumbnailListViewer(QListWidget):
         row = self.row(item)
         new_row = row + direction
         if 0 <= new_row < self.count():
-            # takeItem()でwidgetが破棄されるのを防ぐため一旦取り出す
-            widget = self.itemWidget(item)
-            if widget is not None:
-                self.removeItemWidget(item)
-            self.takeItem(row)
-            self.insertItem(new_row, item)
-            if widget is not None:
-                self.setItemWidget(item, widget)
+            # ウィジェットごと移動する（page_itemsの同期・記録は_on_rows_moved）
+            self._move_rows(row, 1, new_row)
             self.setCurrentRow(new_row)
-            # page_itemsの順序も同期
-            info_item = self.page_items.pop(row)
-            self.page_items.insert(new_row, info_item)
+
+    def _move_rows(self, start, count, to):
+        """startからcount行を、移動後の先頭がtoになるように移動する"""
+        dest = to + count if to > start else to
+        self.model().moveRows(QModelIndex(), start, count, QModelIndex(), dest)
+
+    def _on_rows_moved(self, parent, start, end, dest_parent, dest):
+        """モデル上で移動した行にpage_itemsを合わせ、範囲の移動として記録する"""
+        count = end - start + 1
+        to = dest - count if dest > end else dest
+        block = self.page_items[start:end + 1]
+        del self.page_items[start:end + 1]
+        self.page_items[to:to] = block
+        self.undo_log.push(
+            "行の移動",
+            lambda: self._move_rows(to, count, start),
+            lambda: self._move_rows(start, count, to),
+            cost=count,
+        )
 
     def paintEvent(self, event):
         super().paintEvent(event)
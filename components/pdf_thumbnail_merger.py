@@ -2,13 +2,44 @@ import sys
 import os
 from PyQt6.QtWidgets import (
     QMainWindow, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog, QMessageBox,
-    QApplication, QWidget
+    QApplication, QWidget, QSlider, QLabel, QLineEdit, QToolBar, QInputDialog
 )
+from PyQt6.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QKeySequence
 from components.pdf_menu_bar import PDFMenuBar
-from components.pdf_thumbnail_list_viewer import PDFThumbnailListViewer
+from components.pdf_thumbnail_list_viewer import PDFThumbnailListViewer, THUMBNAIL_SIZE_RANGE
 from components.last_dir_manager import load_last_dir, save_last_dir
-from components.pdf_save_utils import save_pdf_pages
 from components.path_manager import get_appdata_path
+from components.perf_metrics import metrics
+from components.perf_hud_widget import PerfHudWidget
+from components.folder_watcher import PDFFolderWatcher
+
+
+class ExportWorkerSignals(QObject):
+    progress = pyqtSignal(int, int, str)  # 完了数, 全体数, 書き出したファイル
+    finished = pyqtSignal(list)  # [ExportResult, ...]
+
+
+class ExportWorker(QRunnable):
+    """分割書き出しを画面を止めずに行う（書き出し自体はワーカープロセスで並列）"""
+
+    def __init__(self, jobs):
+        super().__init__()
+        self.jobs = jobs
+        self.signals = ExportWorkerSignals()
+
+    def run(self):
+        from components.pdf_export import export_pdf_parts
+        try:
+            results = export_pdf_parts(
+                self.jobs,
+                progress=lambda done, total, result: self.signals.progress.emit(done, total, result.output_path),
+            )
+        except Exception as e:
+            print(f"分割書き出し失敗: {e}")
+            metrics.record_error("export", e)
+            results = []
+        self.signals.finished.emit(results)
 
 
 class PDFThumbnailMerger(QMainWindow):
@@ -41,10 +72,113 @@ class PDFThumbnailMerger(QMainWindow):
         self.menu_bar.filesAdded.connect(self.on_files_added)
         self.menu_bar.folderAdded.connect(self.on_folder_added)
         self.menu_bar.mergeSelectedPDFs.connect(self.merge_selected_pages)
+        self.menu_bar.watchFoldersToggled.connect(self.set_folder_watch)
         self.setMenuBar(self.menu_bar)
         # --- 作業状態保存メニューのみ追加 ---
         self.menu_bar.addAction("作業状態を保存", self.save_edit_state)
         self.menu_bar.addAction("作業状態をクリアして保存", self.clear_and_save_edit_state)
+        # --- 計測メニュー・ステータスバーのパフォーマンス表示 ---
+        self.perf_hud = PerfHudWidget(self)
+        self.perf_hud.hide()
+        self.statusBar().addPermanentWidget(self.perf_hud)
+        perf_menu = self.menu_bar.addMenu("計測")
+        self.perf_hud_action = perf_menu.addAction("パフォーマンス表示")
+        self.perf_hud_action.setCheckable(True)
+        self.perf_hud_action.toggled.connect(self.perf_hud.setVisible)
+        perf_menu.addAction("計測結果を書き出し...", self.export_metrics)
+        perf_menu.addAction("計測値をリセット", metrics.reset)
+        edit_menu = self.menu_bar.addMenu("編集")
+        self.undo_action = edit_menu.addAction("元に戻す", lambda: self.undo_redo(undo=True))
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.redo_action = edit_menu.addAction("やり直し", lambda: self.undo_redo(undo=False))
+        self.redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        edit_menu.addSeparator()
+        edit_menu.addAction("すべて選択", self.viewer.selectAll)
+        edit_menu.addAction("選択を反転", self.viewer.invert_selection)
+        edit_menu.addAction("同じファイルのページを選択", self.select_current_file)
+        # 回転・切り抜き（選択ページ、選択がなければ現在行。結合時にページの属性として設定）
+        edit_menu.addSeparator()
+        edit_menu.addAction("右に90°回転", lambda: self.viewer.rotate_pages(90)).setShortcut("Ctrl+R")
+        edit_menu.addAction("左に90°回転", lambda: self.viewer.rotate_pages(-90)).setShortcut("Ctrl+Shift+R")
+        edit_menu.addAction("180°回転", lambda: self.viewer.rotate_pages(180))
+        edit_menu.addAction("余白を切り取る...", self.crop_margins)
+        edit_menu.addAction("回転・切り抜きを解除", self.viewer.clear_page_edits)
+        self.viewer.undo_log.on_change = self._update_undo_actions
+        self._update_undo_actions()
+        view_menu = self.menu_bar.addMenu("表示")
+        self.grid_mode_action = view_menu.addAction("グリッド表示")
+        self.grid_mode_action.setCheckable(True)
+        self.grid_mode_action.toggled.connect(self.viewer.set_grid_mode)
+        dup_menu = self.menu_bar.addMenu("重複")
+        dup_menu.addAction("重複ページを検出", self.viewer.detect_duplicates)
+        dup_menu.addAction("重複ページを選択", self.viewer.select_duplicates)
+        dup_menu.addAction("重複ページを除去", lambda: self.viewer.detect_duplicates(collapse=True))
+        self.auto_dedupe_action = dup_menu.addAction("追加時に重複を除外")
+        self.auto_dedupe_action.setCheckable(True)
+        self.auto_dedupe_action.toggled.connect(
+            lambda checked: setattr(self.viewer, "auto_collapse_duplicates", checked)
+        )
+        self.viewer.duplicates_detected.connect(self.on_duplicates_detected)
+        blank_menu = self.menu_bar.addMenu("空白ページ")
+        blank_menu.addAction("空白ページを検出", self.viewer.detect_blank_pages)
+        blank_menu.addAction("空白ページを選択", self.viewer.select_blank_pages)
+        blank_menu.addAction("空白ページを除去", lambda: self.viewer.detect_blank_pages(remove=True))
+        self.viewer.blank_pages_detected.connect(self.on_blank_pages_detected)
+        # 並べ替え（2行以上選択していれば選択行のみ）
+        order_menu = self.menu_bar.addMenu("並べ替え")
+        order_menu.addAction("ファイル名順", lambda: self.viewer.sort_pages("name"))
+        order_menu.addAction("更新日時順", lambda: self.viewer.sort_pages("mtime"))
+        order_menu.addAction("ページ番号順", lambda: self.viewer.sort_pages("page"))
+        order_menu.addAction("逆順", self.viewer.reverse_pages)
+        order_menu.addSeparator()
+        order_menu.addAction("表裏を交互に並べる", self.viewer.interleave_pages)
+        order_menu.addAction(
+            "表裏を交互に並べる（裏面は逆順）", lambda: self.viewer.interleave_pages(reverse_second=True)
+        )
+        # 分割書き出し（選択があれば選択ページ、なければ全ページが対象）
+        export_menu = self.menu_bar.addMenu("分割書き出し")
+        export_menu.addAction("ファイルごとに書き出し...", lambda: self.export_pages("file"))
+        export_menu.addAction("Nページごとに書き出し...", lambda: self.export_pages("every"))
+        export_menu.addAction("選択範囲ごとに書き出し...", lambda: self.export_pages("ranges"))
+        self._merge_cache = None  # 結合結果のキャッシュ（再利用を有効にして初めて結合するときに作る）
+        self.export_pool = QThreadPool(self)
+        self.export_pool.setMaxThreadCount(1)
+        self.export_dir = ""  # 前回の書き出し先フォルダ
+        # --- 全文検索（入力が止まったら絞り込み、Enterで次の一致行へ） ---
+        search_bar = QToolBar("検索", self)
+        search_bar.setMovable(False)
+        self.search_box = QLineEdit(search_bar)
+        self.search_box.setPlaceholderText("ページ内のテキストを検索（Enterで次へ）")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setMaximumWidth(360)
+        search_bar.addWidget(self.search_box)
+        self.addToolBar(search_bar)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
+        self._search_timer.timeout.connect(self.apply_search)
+        self.search_box.textChanged.connect(self._search_timer.start)
+        self.search_box.returnPressed.connect(
+            lambda: self.viewer.jump_to_next_match(self.search_box.text())
+        )
+        # --- サムネイルサイズ（ズーム）スライダー ---
+        self.thumb_size_slider = QSlider(Qt.Orientation.Horizontal, self)
+        self.thumb_size_slider.setRange(*THUMBNAIL_SIZE_RANGE)
+        self.thumb_size_slider.setSingleStep(16)
+        self.thumb_size_slider.setPageStep(64)
+        self.thumb_size_slider.setValue(self.viewer.thumb_h)
+        self.thumb_size_slider.setFixedWidth(160)
+        # ドラッグ中は反映せず、離したときに1回だけサイズを変更する
+        self.thumb_size_slider.setTracking(False)
+        self.thumb_size_slider.valueChanged.connect(self.viewer.set_thumbnail_size)
+        self.statusBar().addPermanentWidget(QLabel("サムネイル"))
+        self.statusBar().addPermanentWidget(self.thumb_size_slider)
+        # --- フォルダ監視（開いた・追加したフォルダの変更を行単位で反映） ---
+        self.watched_folders = [pdf_dir] if pdf_dir else []
+        self.folder_watcher = PDFFolderWatcher(self)
+        self.folder_watcher.filesAdded.connect(self.viewer.add_pdf_files)
+        self.folder_watcher.filesRemoved.connect(self.viewer.remove_pdf_files)
+        self.folder_watcher.filesModified.connect(self.viewer.reload_pdf_files)
         # サムネイルグリッドビューア追加
         vlayout.addWidget(self.viewer)
         # 操作ボタン
@@ -84,6 +218,8 @@ class PDFThumbnailMerger(QMainWindow):
             ]
             if folder:
                 save_last_dir(folder)
+            self.watched_folders = [folder]
+            self._restart_folder_watch()
             self.viewer.load_all_pages_async()
         except Exception as e:
             print(f"状態ファイル読込失敗: {e}")
@@ -91,33 +227,30 @@ class PDFThumbnailMerger(QMainWindow):
             self.viewer.load_all_pages_async()
 
     def on_files_added(self, files):
-        state_path = get_appdata_path("last_pdf_edit_state.json")
+        # 追加分だけを開いて末尾に追加する（既存の行・並び順・選択はそのまま）
         try:
-            self.viewer.pdf_files.extend([os.path.abspath(f) for f in files])
             if files:
                 save_last_dir(os.path.dirname(files[0]))
-            self.viewer.load_all_pages_async()
+                if not self.viewer.pdf_dir:
+                    self.viewer.pdf_dir = os.path.dirname(os.path.abspath(files[0]))
+            self.viewer.add_pdf_files([os.path.abspath(f) for f in files])
         except Exception as e:
-            print(f"状態ファイル読込失敗: {e}")
             print(f"PDFファイル追加失敗: {e}")
-            self.viewer.load_all_pages_async()
 
     def on_folder_added(self, folder):
-        state_path = get_appdata_path("last_pdf_edit_state.json")
         try:
             new_files = [
-                os.path.join(folder, f)
-                for f in os.listdir(folder)
+                os.path.join(os.path.abspath(folder), f)
+                for f in sorted(os.listdir(folder))
                 if f.lower().endswith(".pdf")
             ]
-            self.viewer.pdf_files.extend(new_files)
             if folder:
                 save_last_dir(folder)
-            self.viewer.load_all_pages_async()
+            self.watched_folders.append(folder)
+            self._restart_folder_watch()
+            self.viewer.add_pdf_files(new_files)
         except Exception as e:
-            print(f"状態ファイル読込失敗: {e}")
             print(f"フォルダ追加失敗: {e}")
-            self.viewer.load_all_pages_async()
 
     def merge_selected_pages(self):
         selected = self.viewer.get_selected_pages()
@@ -129,8 +262,7 @@ class PDFThumbnailMerger(QMainWindow):
         )
         if not save_path:
             return
-        save_pdf_pages(selected, save_path)
-        QMessageBox.information(self, "完了", f"{save_path} に保存しました")
+        self._save_merged(selected, save_path)
 
     def merge_all_pages(self):
         # 現在リストに表示されている全ページを結合
@@ -143,8 +275,190 @@ class PDFThumbnailMerger(QMainWindow):
         )
         if not save_path:
             return
-        save_pdf_pages(all_infos, save_path)
-        QMessageBox.information(self, "完了", f"{save_path} に保存しました")
+        self._save_merged(all_infos, save_path)
+
+    def _save_merged(self, pages, save_path):
+        # 結合処理（fitz）は起動を遅くしないよう初回使用時に読み込む
+        from components.pdf_save_utils import save_pdf_pages
+        profile = None
+        if self.menu_bar.downsample_images_action.isChecked():
+            from components.image_recompress import ImageProfile
+            profile = ImageProfile()
+        cache = None
+        if self.menu_bar.reuse_merge_action.isChecked():
+            try:
+                if self._merge_cache is None:
+                    from components.merge_cache import MergeResultCache
+                    self._merge_cache = MergeResultCache()
+                cache = self._merge_cache
+            except Exception as e:
+                print(f"結合結果キャッシュ初期化失敗: {e}")
+                metrics.record_error("merge.cache", e)
+        verify = self.menu_bar.verify_merge_action.isChecked()
+        try:
+            report = save_pdf_pages(pages, save_path, image_profile=profile, result_cache=cache, verify=verify)
+        except Exception as e:
+            print(f"PDF結合失敗: {e}")
+            metrics.record_error("merge", e)
+            QMessageBox.warning(self, "エラー", f"PDFの結合に失敗しました\n{e}")
+            return
+        message = f"{save_path} に保存しました"
+        if report.cached:
+            message += "（同じ内容の前回の結合結果を使用）"
+        if report.images is not None:
+            images = report.images
+            message += (
+                f"\n画像 {images.images} 件を縮小: {images.bytes_before / 1e6:.1f}MB → "
+                f"{images.bytes_after / 1e6:.1f}MB（{images.reduction:.0%} 削減、"
+                f"1ページあたり {images.seconds_per_page * 1000:.0f}ms）"
+            )
+        if profile is not None and report.images is None and not report.cached:
+            message += "\n画像の縮小に失敗しました（縮小せずに保存）"
+        checked = report.verify
+        if verify and checked is None and not (report.cached and profile is not None):
+            message += "\n検証に失敗しました"
+        if checked is not None and not checked.ok:
+            lines = [f"ページ数: 計画 {checked.expected_pages} / 結果 {checked.actual_pages}"]
+            reasons = {"content": "内容が異なる", "missing": "ページがない", "extra": "計画にないページ"}
+            for m in checked.mismatches[:10]:
+                source = f"{os.path.basename(m.pdf_path)} p{m.page_num + 1}" if m.pdf_path else "-"
+                lines.append(f"{m.index + 1}ページ目（{source}）: {reasons[m.reason]}")
+            if len(checked.mismatches) > 10:
+                lines.append(f"ほか {len(checked.mismatches) - 10} 件")
+            QMessageBox.warning(self, "検証で不一致", message + "\n\n" + "\n".join(lines))
+            return
+        if checked is not None:
+            message += f"\n検証: {checked.checked} ページ一致（{checked.seconds:.1f}秒）"
+            if checked.unchecked:
+                message += f"、{checked.unchecked} ページは結合元を読めず未確認"
+        QMessageBox.information(self, "完了", message)
+
+    def export_pages(self, mode):
+        """選択中（なければ全部）のページを複数のPDFに分けて書き出す"""
+        from components.pdf_export import plan_export
+        viewer = self.viewer
+        ranges = viewer.selected_ranges()
+        if mode == "ranges":
+            if not ranges:
+                QMessageBox.warning(self, "警告", "ページが選択されていません")
+                return
+            pages = [info for info, _ in viewer.page_items]
+        else:
+            pages = viewer.get_selected_pages() if ranges else [info for info, _ in viewer.page_items]
+        if not pages:
+            QMessageBox.warning(self, "警告", "書き出すページがありません")
+            return
+        every = 10
+        if mode == "every":
+            every, ok = QInputDialog.getInt(self, "Nページごとに書き出し", "1ファイルのページ数:", 10, 1, 100000)
+            if not ok:
+                return
+        # 結合元のフォルダは既定にしない（前回の書き出し先から選ぶ）
+        out_dir = QFileDialog.getExistingDirectory(self, "書き出し先フォルダ", self.export_dir)
+        if not out_dir:
+            return
+        self.export_dir = out_dir
+        jobs = plan_export(pages, out_dir, mode, every=every, ranges=ranges)
+        existing = [job.output_path for job in jobs if os.path.exists(job.output_path)]
+        if existing and QMessageBox.question(
+            self, "確認", f"{len(existing)} 件のファイルを上書きします。続けますか？"
+        ) != QMessageBox.StandardButton.Yes:
+            return
+        worker = ExportWorker(jobs)
+        worker.signals.progress.connect(
+            lambda done, total, path: self.statusBar().showMessage(
+                f"書き出し中 {done}/{total}: {os.path.basename(path)}"
+            )
+        )
+        worker.signals.finished.connect(lambda results: self.on_export_finished(out_dir, results))
+        self.statusBar().showMessage(f"書き出し中 0/{len(jobs)}")
+        self.export_pool.start(worker)
+
+    def on_export_finished(self, out_dir, results):
+        failed = [r for r in results if r.error]
+        for r in failed:
+            print(f"書き出し失敗: {r.output_path}: {r.error}")
+        message = f"{out_dir} に {len(results) - len(failed)} 件書き出しました"
+        if failed:
+            message += f"（失敗 {len(failed)} 件）"
+        self.statusBar().showMessage(message, 10000)
+
+    def undo_redo(self, undo=True):
+        log = self.viewer.undo_log
+        try:
+            label = log.undo() if undo else log.redo()
+        except Exception as e:
+            print(f"{'元に戻す' if undo else 'やり直し'}に失敗: {e}")
+            metrics.record_error("list.undo", e)
+            return
+        if label:
+            self.statusBar().showMessage(f"{'元に戻しました' if undo else 'やり直しました'}: {label}", 5000)
+
+    def crop_margins(self):
+        """上下左右の余白を同じ割合で切り取る（0%で切り抜き解除）"""
+        percent, ok = QInputDialog.getDouble(self, "余白を切り取る", "各辺から切り取る割合（%）:", 5.0, 0.0, 45.0, 1)
+        if not ok:
+            return
+        m = percent / 100
+        self.viewer.crop_pages((m, m, 1 - m, 1 - m) if m > 0 else None)
+
+    def select_current_file(self):
+        """現在行のファイルのページを選択に加える"""
+        row = self.viewer.currentRow()
+        if 0 <= row < len(self.viewer.page_items):
+            self.viewer.select_file(self.viewer.page_items[row][0].pdf_path, extend=True)
+
+    def _update_undo_actions(self):
+        log = self.viewer.undo_log
+        self.undo_action.setEnabled(log.can_undo())
+        self.undo_action.setText(f"元に戻す: {log.undo_label()}" if log.can_undo() else "元に戻す")
+        self.redo_action.setEnabled(log.can_redo())
+        self.redo_action.setText(f"やり直し: {log.redo_label()}" if log.can_redo() else "やり直し")
+
+    def on_duplicates_detected(self, n_pages, n_files, collapsed):
+        action = "を除去しました" if collapsed else "が見つかりました"
+        self.statusBar().showMessage(
+            f"重複ページ {n_pages} 件（同一ファイル {n_files} 件）{action}", 10000
+        )
+
+    def apply_search(self):
+        query = self.search_box.text()
+        try:
+            n = self.viewer.filter_by_text(query)
+        except Exception as e:
+            print(f"検索失敗: {e}")
+            return
+        if query.strip():
+            self.statusBar().showMessage(f"「{query.strip()}」を含むページ {n} 件", 10000)
+        else:
+            self.statusBar().clearMessage()
+
+    def on_blank_pages_detected(self, n_pages, removed):
+        action = "を除去しました" if removed else "が見つかりました"
+        self.statusBar().showMessage(f"空白ページ {n_pages} 件{action}", 10000)
+
+    def set_folder_watch(self, enabled):
+        """開いた・追加したフォルダの監視を切り替える"""
+        self.folder_watcher.unwatch_all()
+        if enabled:
+            for folder in self.watched_folders:
+                self.folder_watcher.watch(folder)
+
+    def _restart_folder_watch(self):
+        if self.menu_bar.watch_folders_action.isChecked():
+            self.set_folder_watch(True)
+
+    def export_metrics(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "計測結果の保存先", "perf_metrics.json", "JSON Files (*.json)"
+        )
+        if not path:
+            return
+        try:
+            metrics.export(path)
+        except Exception as e:
+            print(f"計測結果書き出し失敗: {e}")
+            QMessageBox.warning(self, "エラー", "計測結果の書き出しに失敗しました")
 
     def save_edit_state(self):
         try:
@@ -163,6 +477,8 @@ class PDFThumbnailMerger(QMainWindow):
             self.viewer.pdf_files = []
             self.viewer.clear()
             self.viewer.thumbnail_cache.clear()
+            # 消した一覧に対する操作を戻せないよう記録も捨てる（メニューはon_changeで更新される）
+            self.viewer.undo_log.clear()
             # 空状態をデフォルトキャッシュに保存
             state_path = get_appdata_path("last_pdf_edit_state.json")
             self.viewer.save_state(state_path)
@@ -0,0 +1,49 @@
+import time
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtCore import QTimer
+from components.perf_metrics import metrics
+
+
+class PerfHudWidget(QLabel):
+    """
+    ステータスバー用のパフォーマンス表示
+    - 描画・行追加のスループット、待ち件数、キャッシュ命中率を一定間隔で更新
+    - 非表示の間は更新しない
+    """
+    def __init__(self, parent=None, interval_ms=500):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.refresh)
+        self._last_rows = (time.perf_counter(), metrics.counter("list.rows"))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def refresh(self):
+        now, rows = time.perf_counter(), metrics.counter("list.rows")
+        last_t, last_rows = self._last_rows
+        rows_per_sec = (rows - last_rows) / (now - last_t) if now > last_t else 0.0
+        self._last_rows = (now, rows)
+        hits = metrics.counter("thumbnail.cache_hit")
+        misses = metrics.counter("thumbnail.cache_miss")
+        hit_rate = hits / (hits + misses) * 100 if hits + misses else 0.0
+        errors = sum(
+            v for k, v in metrics.snapshot()["counters"].items() if k.startswith("errors.")
+        )
+        self.setText(
+            f"描画 {metrics.throughput('thumbnail.render'):.1f}頁/s"
+            f" (平均{metrics.mean('thumbnail.render') * 1000:.0f}ms)"
+            f" | 変換 {metrics.mean('thumbnail.convert') * 1000:.1f}ms"
+            f" | 行追加 {rows_per_sec:.0f}行/s"
+            f" | 待ち {metrics.gauge('thumbnail.queue_depth')}"
+            f" | キャッシュ命中 {hit_rate:.0f}%"
+            f" | 停止後の鮮明化 {metrics.mean('scroll.time_to_sharp') * 1000:.0f}ms"
+            f" | エラー {errors}"
+        )
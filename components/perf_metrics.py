@@ -0,0 +1,161 @@
+"""
+ホットパスの軽量な計測（区間時間・カウンタ・ゲージ）
+
+ワーカースレッドからも呼ばれるため内部はロックで保護する。
+区間ごとに回数・合計・最大を集計し、直近のイベントはスループット計算と
+書き出し用にリングバッファへ残す。
+"""
+import json
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PerfMetrics:
+    def __init__(self, recent_events: int = 4096):
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._recent_maxlen = recent_events
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._started = time.perf_counter()
+            self._spans = {}     # name -> [回数, 合計秒, 最大秒]
+            self._counters = {}  # name -> int
+            self._gauges = {}    # name -> 数値
+            self._errors = deque(maxlen=100)
+            self._recent = deque(maxlen=self._recent_maxlen)  # (終了時刻, name, 秒)
+
+    @contextmanager
+    def span(self, name: str):
+        """with文で囲んだ区間の時間を記録する"""
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(name, time.perf_counter() - t0)
+
+    def record_span(self, name: str, seconds: float):
+        now = time.perf_counter()
+        with self._lock:
+            stat = self._spans.get(name)
+            if stat is None:
+                self._spans[name] = [1, seconds, seconds]
+            else:
+                stat[0] += 1
+                stat[1] += seconds
+                if seconds > stat[2]:
+                    stat[2] = seconds
+            self._recent.append((now, name, seconds))
+
+    def incr(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def set_gauge(self, name: str, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def record_error(self, name: str, error):
+        """例外を件数と直近のメッセージとして残す"""
+        with self._lock:
+            self._counters[f"errors.{name}"] = self._counters.get(f"errors.{name}", 0) + 1
+            self._errors.append((time.perf_counter() - self._started, name, str(error)))
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def gauge(self, name: str, default=0):
+        with self._lock:
+            return self._gauges.get(name, default)
+
+    def throughput(self, name: str, window: float = 2.0) -> float:
+        """直近window秒間に完了した区間nameの毎秒件数"""
+        cutoff = time.perf_counter() - window
+        n = 0
+        with self._lock:
+            for t, span_name, _ in reversed(self._recent):
+                if t < cutoff:
+                    break
+                if span_name == name:
+                    n += 1
+        return n / window
+
+    def mean(self, name: str) -> float:
+        with self._lock:
+            stat = self._spans.get(name)
+        return stat[1] / stat[0] if stat else 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "uptime_s": time.perf_counter() - self._started,
+                "spans": {
+                    name: {"count": c, "total_s": total, "mean_s": total / c, "max_s": mx}
+                    for name, (c, total, mx) in self._spans.items()
+                },
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "errors": [
+                    {"t_s": t, "name": name, "message": msg} for t, name, msg in self._errors
+                ],
+            }
+
+    def export(self, path: str):
+        """集計値と直近イベントをJSONで書き出す"""
+        data = self.snapshot()
+        with self._lock:
+            data["recent_events"] = [
+                {"t_s": t - self._started, "name": name, "duration_s": sec}
+                for t, name, sec in self._recent
+            ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def process_rss_bytes():
+    """プロセスの現在の常駐メモリ（バイト）。取得できない環境ではNone"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            import os
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+        counters = _Counters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+# アプリ全体で共有する計測インスタンス
+metrics = PerfMetrics()
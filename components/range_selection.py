@@ -0,0 +1,104 @@
+"""
+行の選択を区間の列で表す集合
+
+選択を昇順で重ならない半開区間 [start, end) のリストで持つ。
+範囲選択・反転・和・差は区間数に比例する時間で済み、選択行数によらない。
+"""
+from bisect import bisect_left, bisect_right
+
+
+class RangeSelection:
+    def __init__(self, ranges=()):
+        self._ranges = []
+        for start, end in sorted(ranges):
+            if start >= end:
+                continue
+            if self._ranges and start <= self._ranges[-1][1]:
+                if end > self._ranges[-1][1]:
+                    self._ranges[-1] = (self._ranges[-1][0], end)
+            else:
+                self._ranges.append((start, end))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """行番号の列から作る（連続する行は1区間にまとめる）"""
+        ranges = []
+        for row in sorted(set(rows)):
+            if ranges and ranges[-1][1] == row:
+                ranges[-1][1] = row + 1
+            else:
+                ranges.append([row, row + 1])
+        return cls(map(tuple, ranges))
+
+    @property
+    def ranges(self):
+        return list(self._ranges)
+
+    def __len__(self):
+        return sum(end - start for start, end in self._ranges)
+
+    def __bool__(self):
+        return bool(self._ranges)
+
+    def __iter__(self):
+        for start, end in self._ranges:
+            yield from range(start, end)
+
+    def __contains__(self, row):
+        i = bisect_right(self._ranges, (row, float("inf"))) - 1
+        return i >= 0 and self._ranges[i][0] <= row < self._ranges[i][1]
+
+    def __eq__(self, other):
+        return isinstance(other, RangeSelection) and self._ranges == other._ranges
+
+    def __repr__(self):
+        return f"RangeSelection({self._ranges!r})"
+
+    def add(self, start, end):
+        """[start, end) を加える"""
+        if start >= end:
+            return
+        lo = bisect_left(self._ranges, (start,))
+        if lo > 0 and self._ranges[lo - 1][1] >= start:
+            lo -= 1
+        hi = lo
+        while hi < len(self._ranges) and self._ranges[hi][0] <= end:
+            start = min(start, self._ranges[hi][0])
+            end = max(end, self._ranges[hi][1])
+            hi += 1
+        self._ranges[lo:hi] = [(start, end)]
+
+    def remove(self, start, end):
+        """[start, end) を除く"""
+        if start >= end:
+            return
+        lo = bisect_left(self._ranges, (start,))
+        if lo > 0 and self._ranges[lo - 1][1] > start:
+            lo -= 1
+        hi = lo
+        pieces = []
+        while hi < len(self._ranges) and self._ranges[hi][0] < end:
+            s, e = self._ranges[hi]
+            if s < start:
+                pieces.append((s, start))
+            if e > end:
+                pieces.append((end, e))
+            hi += 1
+        self._ranges[lo:hi] = pieces
+
+    def union(self, other):
+        return RangeSelection(self._ranges + other._ranges)
+
+    def inverted(self, count):
+        """[0, count) のうち含まれない区間"""
+        result = []
+        pos = 0
+        for start, end in self._ranges:
+            if start >= count:
+                break
+            if start > pos:
+                result.append((pos, start))
+            pos = max(pos, end)
+        if pos < count:
+            result.append((pos, count))
+        return RangeSelection(result)
@@ -0,0 +1,68 @@
+"""
+スクロール速度に応じたサムネイル先読み範囲の決定
+
+速度は1秒あたりの画面数（スクロールバーの値の変化 / pageStep）で扱うため、
+一覧・グリッドやスクロール単位（項目/ピクセル）によらず同じ閾値が使える。
+- 停止中      : 前後1画面ずつ
+- 中程度の速度: 進行方向に速度に比例して広げ、逆方向は半画面
+- 高速なフリング: 要求を止める（すぐに通り過ぎる範囲の描画は無駄になるため）
+"""
+import time
+
+FLING_SCREENS_PER_SEC = 6.0  # これ以上の速度では先読みを止める
+LOOKAHEAD_SECONDS = 0.6  # 進行方向にこの秒数で進む分だけ余分に先読みする
+MAX_AHEAD_SCREENS = 4.0
+IDLE_WINDOW = (1.0, 1.0)
+BEHIND_SCREENS = 0.5
+SAMPLE_INTERVAL = 0.05  # 位置はこの間隔に1回まで記録する（valueChangedごとには計算しない）
+# この間隔以上あいた後の最初の変化は、平滑化せずその時点の速度で扱う
+_RESTART_GAP = 0.25
+_SMOOTHING = 0.5
+
+
+class ScrollVelocityTracker:
+    """スクロール位置の履歴から平滑化した速度（画面/秒、下方向が正）を求める"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.velocity = 0.0
+        self._last = None  # (時刻, 値)
+
+    def update(self, value: int, page_step: int, now: float = None) -> bool:
+        """位置を記録する。前回の記録からSAMPLE_INTERVAL未満なら記録せずFalse"""
+        if now is None:
+            now = time.perf_counter()
+        if self._last is not None:
+            last_t, last_value = self._last
+            dt = now - last_t
+            if dt < SAMPLE_INTERVAL:
+                return False
+            inst = (value - last_value) / max(1, page_step) / dt
+            if dt > _RESTART_GAP:
+                self.velocity = inst
+            else:
+                self.velocity += _SMOOTHING * (inst - self.velocity)
+        self._last = (now, value)
+        return True
+
+    def is_flinging(self, now: float = None) -> bool:
+        """高速スクロール中か。最後の変化から_RESTART_GAP以上あいていれば停止とみなす"""
+        if self._last is None:
+            return False
+        if now is None:
+            now = time.perf_counter()
+        if now - self._last[0] > _RESTART_GAP:
+            return False
+        return abs(self.velocity) >= FLING_SCREENS_PER_SEC
+
+    def prefetch_screens(self):
+        """表示範囲の前・後ろに先読みする画面数 (before, after)"""
+        speed = abs(self.velocity)
+        if speed < 0.1:
+            return IDLE_WINDOW
+        ahead = 1.0 + min(speed * LOOKAHEAD_SECONDS, MAX_AHEAD_SCREENS - 1.0)
+        if self.velocity > 0:
+            return BEHIND_SCREENS, ahead
+        return ahead, BEHIND_SCREENS
@@ -0,0 +1,145 @@
+"""
+読み込んだPDFの全文索引（SQLite FTS5）
+
+ページのテキストをfitzで抽出し、アプリフォルダのSQLiteに保存する。
+ファイルごとにフィンガープリント（サイズ, 更新時刻）を記録し、変更のないファイルは抽出し直さない。
+1ファイルのページは連続したrowidで登録してその先頭を記録し、消すときはrowidの範囲で消す
+（pathは索引しない列のため、pathでの削除は全ページを調べることになる）。
+日本語は単語区切りがないため、FTS5のtrigramトークナイザで部分一致検索する
+（3文字未満の語・trigram非対応のSQLiteではLIKEで検索する）。
+接続はスレッドごとに作ること（索引作成はワーカー、検索はGUIスレッド）。
+"""
+import os
+import sqlite3
+from components.file_fingerprint import file_fingerprint
+from components.path_manager import get_appdata_path
+
+TEXT_INDEX_FILE = "text_index.sqlite3"
+_TRIGRAM_MIN = 3
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class TextIndex:
+    def __init__(self, path=None):
+        self.path = path or get_appdata_path(TEXT_INDEX_FILE)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, pages INTEGER, first_rowid INTEGER)"
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(files)")]
+        if "first_rowid" not in columns:  # 範囲を記録する前に作った索引
+            self.conn.execute("ALTER TABLE files ADD COLUMN first_rowid INTEGER")
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS pages "
+                "USING fts5(path UNINDEXED, page UNINDEXED, body, tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            # trigram非対応（SQLite 3.34未満）: 既定のトークナイザで作り、検索はLIKEで行う
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(path UNINDEXED, page UNINDEXED, body)"
+            )
+        sql = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'pages'"
+        ).fetchone()[0]
+        self.trigram = "trigram" in sql
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def is_current(self, pdf_path: str) -> bool:
+        """索引がファイルの現在の内容のものか"""
+        fingerprint = file_fingerprint(pdf_path)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns FROM files WHERE path = ?", (pdf_path,)
+        ).fetchone()
+        return fingerprint is not None and row is not None and tuple(row) == fingerprint
+
+    def index_file(self, pdf_path: str) -> bool:
+        """未登録・変更されたファイルのテキストを抽出して登録する。抽出したらTrue"""
+        if self.is_current(pdf_path):
+            return False
+        import fitz
+        fingerprint = file_fingerprint(pdf_path)
+        if fingerprint is None:
+            self.remove_file(pdf_path)
+            return False
+        with fitz.open(pdf_path) as doc:
+            texts = [doc.load_page(i).get_text("text") for i in range(len(doc))]
+        with self.conn:
+            self._delete_pages(pdf_path)
+            last = self.conn.execute("SELECT rowid FROM pages ORDER BY rowid DESC LIMIT 1").fetchone()
+            first = (last[0] if last else 0) + 1
+            self.conn.executemany(
+                "INSERT INTO pages (rowid, path, page, body) VALUES (?, ?, ?, ?)",
+                [(first + i, pdf_path, i, text) for i, text in enumerate(texts)],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, pages, first_rowid) VALUES (?, ?, ?, ?, ?)",
+                (pdf_path, fingerprint[0], fingerprint[1], len(texts), first),
+            )
+        return True
+
+    def _delete_pages(self, pdf_path: str):
+        """登録済みのページをrowidの範囲で消す"""
+        row = self.conn.execute(
+            "SELECT first_rowid, pages FROM files WHERE path = ?", (pdf_path,)
+        ).fetchone()
+        if row is None:
+            return
+        first, pages = row
+        if first is None:
+            # 範囲を記録する前に登録したファイル: pathで消す（全ページを調べる）
+            self.conn.execute("DELETE FROM pages WHERE path = ?", (pdf_path,))
+        elif pages:
+            self.conn.execute("DELETE FROM pages WHERE rowid BETWEEN ? AND ?", (first, first + pages - 1))
+
+    def remove_file(self, pdf_path: str):
+        with self.conn:
+            self._delete_pages(pdf_path)
+            self.conn.execute("DELETE FROM files WHERE path = ?", (pdf_path,))
+
+    def search(self, query: str, pdf_paths=None) -> set:
+        """
+        空白区切りの全語を含むページの {(pdf_path, page_num)} を返す
+        pdf_pathsを渡した場合はそのファイルに限る
+        """
+        terms = query.split()
+        if not terms:
+            return set()
+        conditions, params = [], []
+        for term in terms:
+            if self.trigram and len(term) >= _TRIGRAM_MIN:
+                conditions.append("pages MATCH ?")
+                params.append('body:"' + term.replace('"', '""') + '"')
+            else:
+                conditions.append("body LIKE ? ESCAPE '\\'")
+                params.append(_like_pattern(term))
+        # 同じMATCHを複数書けないため、語ごとの結果の積集合をとる
+        result = None
+        for condition, param in zip(conditions, params):
+            rows = self.conn.execute(
+                f"SELECT path, page FROM pages WHERE {condition}", (param,)
+            ).fetchall()
+            found = {(path, int(page)) for path, page in rows}
+            result = found if result is None else result & found
+            if not result:
+                break
+        if pdf_paths is not None:
+            allowed = set(pdf_paths)
+            result = {key for key in result if key[0] in allowed}
+        return result
+
+    def prune(self):
+        """存在しなくなったファイルの索引を消す"""
+        paths = [row[0] for row in self.conn.execute("SELECT path FROM files")]
+        for pdf_path in paths:
+            if not os.path.exists(pdf_path):
+                self.remove_file(pdf_path)
@@ -0,0 +1,112 @@
+"""
+段階（ミップレベル）付きサムネイルキャッシュ
+
+サムネイルは表示サイズごとではなく、高さ64/128/256/512/1024pxの固定の段に振り分けて保持する。
+各段の画像は描画したときの表示サイズ（物理ピクセル）ちょうどで描くため、そのまま表示できる。
+表示サイズ（・デバイスピクセル比）が変わっても、手元にある最寄りの段を縮小・拡大して
+すぐに表示でき、要求サイズの段だけを背景で描画し直せばよい。
+保持量はピクセルのバイト数で制限し、古く使われていないものから破棄する。
+"""
+from collections import OrderedDict
+
+# 最大段は最大表示サイズ512px × デバイスピクセル比2を賄う
+MIP_LEVELS = (64, 128, 256, 512, 1024)
+# サムネイル枠の縦横比（幅:高さ = 3:4）
+THUMBNAIL_ASPECT = (3, 4)
+
+
+def level_for(height_px: float) -> int:
+    """表示に必要な高さ（物理ピクセル）を満たす最小の段。最大段を超える場合は最大段"""
+    for level in MIP_LEVELS:
+        if level >= height_px:
+            return level
+    return MIP_LEVELS[-1]
+
+
+def level_box(level: int):
+    """段levelの描画枠 (幅, 高さ)"""
+    aw, ah = THUMBNAIL_ASPECT
+    return level * aw // ah, level
+
+
+def _pixmap_bytes(pixmap) -> int:
+    return pixmap.width() * pixmap.height() * 4
+
+
+class ThumbnailCache:
+    """(pdf_path, page_num, level) -> QPixmap"""
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # 使用順（末尾が最新）
+        self._levels = {}  # (pdf_path, page_num) -> {level}
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, pdf_path, page_num, level):
+        key = (pdf_path, page_num, level)
+        pixmap = self._items.get(key)
+        if pixmap is not None:
+            self._items.move_to_end(key)
+        return pixmap
+
+    def put(self, pdf_path, page_num, level, pixmap):
+        key = (pdf_path, page_num, level)
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= _pixmap_bytes(old)
+        self._items[key] = pixmap
+        self._bytes += _pixmap_bytes(pixmap)
+        self._levels.setdefault((pdf_path, page_num), set()).add(level)
+        self._evict()
+
+    def levels(self, pdf_path, page_num):
+        return sorted(self._levels.get((pdf_path, page_num), ()))
+
+    def nearest(self, pdf_path, page_num, level):
+        """
+        段levelに最も近いキャッシュを (段, pixmap) で返す。なければNone
+        縮小の方が鮮明なため、level以上で最小の段を優先し、なければlevel未満で最大の段
+        """
+        cached = self._levels.get((pdf_path, page_num))
+        if not cached:
+            return None
+        above = [lv for lv in cached if lv >= level]
+        best = min(above) if above else max(cached)
+        return best, self.get(pdf_path, page_num, best)
+
+    def discard(self, pdf_path, page_num):
+        """ページの全段を破棄する"""
+        for level in self._levels.pop((pdf_path, page_num), ()):
+            pixmap = self._items.pop((pdf_path, page_num, level), None)
+            if pixmap is not None:
+                self._bytes -= _pixmap_bytes(pixmap)
+
+    def discard_file(self, pdf_path):
+        """PDFファイルの全ページ・全段を破棄する（ファイルの更新・削除時）"""
+        for path, page_num in [k for k in self._levels if k[0] == pdf_path]:
+            self.discard(path, page_num)
+
+    def clear(self):
+        self._items.clear()
+        self._levels.clear()
+        self._bytes = 0
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._items) > 1:
+            (pdf_path, page_num, level), pixmap = self._items.popitem(last=False)
+            self._bytes -= _pixmap_bytes(pixmap)
+            levels = self._levels.get((pdf_path, page_num))
+            if levels is not None:
+                levels.discard(level)
+                if not levels:
+                    del self._levels[(pdf_path, page_num)]
@@ -0,0 +1,76 @@
+"""
+fitzのページ描画からQtの画像への受け渡し
+
+ページは表示サイズに合わせた倍率で直接描画するため、Qt側での縮小は不要。
+fitzのサンプルはmemoryviewで借用し、Qtが所有するRGB32バッファへの
+コピー（兼フォーマット変換）を1回だけ行う。RGB32はQPixmapの標準形式なので、
+メインスレッドのQPixmap.fromImageで再度の形式変換は発生しない。
+"""
+import fitz
+from PyQt6.QtGui import QImage
+
+THUMBNAIL_IMAGE_FORMAT = QImage.Format.Format_RGB32
+
+
+def fit_matrix(page, max_w: int, max_h: int) -> fitz.Matrix:
+    """ページがmax_w x max_hに収まる描画倍率"""
+    rect = page.rect
+    if rect.width <= 0 or rect.height <= 0:
+        return fitz.Matrix(1, 1)
+    zoom = min(max_w / rect.width, max_h / rect.height)
+    return fitz.Matrix(zoom, zoom)
+
+
+def pixmap_to_qimage(pix) -> QImage:
+    """
+    fitzのPixmap(RGB, alphaなし)をQt所有のQImageに変換する。
+    返り値はpixのメモリを参照しないため、pix・docを閉じても安全
+    """
+    borrowed = QImage(
+        pix.samples_mv, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888
+    )
+    return borrowed.convertToFormat(THUMBNAIL_IMAGE_FORMAT)
+
+
+def render_page_image(page, max_w: int, max_h: int) -> QImage:
+    pix = page.get_pixmap(matrix=fit_matrix(page, max_w, max_h), alpha=False)
+    return pixmap_to_qimage(pix)
+
+
+def render_pdf_page(pdf_path: str, page_num: int, max_w: int, max_h: int) -> QImage:
+    """PDFの1ページをmax_w x max_hに収まるQImageとして描画する"""
+    with fitz.open(pdf_path) as doc:
+        return render_page_image(doc.load_page(page_num), max_w, max_h)
+
+
+def embedded_thumbnail_image(doc, page):
+    """ページに埋め込まれた/Thumb画像があればQImageで返す。なければNone"""
+    kind, value = doc.xref_get_key(page.xref, "Thumb")
+    if kind != "xref":
+        return None
+    try:
+        pix = fitz.Pixmap(doc, int(value.split()[0]))
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+        if pix.colorspace is None or pix.colorspace.n != 3:
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+    except Exception:
+        return None
+    return pixmap_to_qimage(pix)
+
+
+def render_preview_image(
+    pdf_path: str, page_num: int, max_w: int, max_h: int, scale: float = 0.125
+) -> QImage:
+    """
+    先行表示用の簡易サムネイル。
+    埋め込みサムネイル(/Thumb)があればそれを使い、なければ表示サイズのscale倍で描画する
+    """
+    with fitz.open(pdf_path) as doc:
+        page = doc.load_page(page_num)
+        img = embedded_thumbnail_image(doc, page)
+        if img is not None:
+            return img
+        return render_page_image(
+            page, max(1, int(max_w * scale)), max(1, int(max_h * scale))
+        )
@@ -0,0 +1,98 @@
+"""
+元に戻す/やり直しの記録
+
+各手順は変更分（移動した行の範囲・除いた行・書き換えた要素の前後）だけを閉じ込めた
+関数の組 (undo, redo) で持ち、一覧や注記の複製は保存しない。
+手順数と変更量（cost: 記録した行数など）の合計に上限を設け、超えたら古い手順から捨てる。
+"""
+from collections import deque, namedtuple
+
+UndoStep = namedtuple("UndoStep", ["label", "undo", "redo", "cost"])
+
+
+class UndoLog:
+    def __init__(self, max_steps: int = 200, max_cost: int = 1_000_000, on_change=None):
+        self.max_steps = max_steps
+        self.max_cost = max_cost
+        self.on_change = on_change  # 記録が変わるたびに呼ぶ（メニュー表示の更新用）
+        self._undo = deque()
+        self._redo = []
+        self._cost = 0
+        self.replaying = False  # 取り消し・やり直しの実行中（その間の変更は記録しない）
+
+    def __len__(self):
+        return len(self._undo)
+
+    @property
+    def cost(self) -> int:
+        return self._cost
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo_label(self):
+        return self._undo[-1].label if self._undo else None
+
+    def redo_label(self):
+        return self._redo[-1].label if self._redo else None
+
+    def push(self, label, undo, redo, cost: int = 1):
+        """実行済みの変更を記録する。やり直しの記録は破棄する"""
+        if self.replaying:
+            return
+        for step in self._redo:
+            self._cost -= step.cost
+        self._redo.clear()
+        self._undo.append(UndoStep(label, undo, redo, max(1, cost)))
+        self._cost += max(1, cost)
+        while self._undo and (len(self._undo) > self.max_steps or self._cost > self.max_cost):
+            self._cost -= self._undo.popleft().cost
+        self._changed()
+
+    def undo(self):
+        """直前の変更を取り消し、その説明を返す。記録がなければNone"""
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._replay(step.undo)
+        self._redo.append(step)
+        self._changed()
+        return step.label
+
+    def redo(self):
+        """取り消した変更をやり直し、その説明を返す。記録がなければNone"""
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        self._replay(step.redo)
+        self._undo.append(step)
+        self._changed()
+        return step.label
+
+    def clear(self):
+        """記録を捨てる（記録していない構成変更で行番号が合わなくなったとき）"""
+        if not self._undo and not self._redo:
+            return
+        self._undo.clear()
+        self._redo.clear()
+        self._cost = 0
+        self._changed()
+
+    def _replay(self, action):
+        self.replaying = True
+        try:
+            action()
+        except Exception:
+            # 途中で失敗した状態からは他の手順も正しく戻せない
+            self.replaying = False
+            self.clear()
+            raise
+        finally:
+            self.replaying = False
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.blank_detection import content_shortcut, ink_fraction, is_blank
+
+
+def test_ink_fraction_is_relative_to_paper_tone():
+    paper = bytes([235]) * 1000
+    assert ink_fraction(paper) == 0.0
+    # 地色に近いムラはインクとしない
+    assert ink_fraction(bytes([220]) * 100 + bytes([235]) * 900) == 0.0
+    assert ink_fraction(bytes([40]) * 20 + bytes([235]) * 980) == 0.02
+
+
+def test_blank_threshold():
+    assert is_blank(ink_fraction(bytes([0]) * 1 + bytes([250]) * 999))
+    assert not is_blank(ink_fraction(bytes([0]) * 10 + bytes([250]) * 990))
+
+
+class _Page:
+    first_annot = None
+
+    def get_images(self):
+        return []
+
+    def get_contents(self):
+        return [1]
+
+
+class _Doc:
+    def __init__(self, content):
+        self.content = content
+
+    def xref_stream(self, xref):
+        return self.content
+
+
+def test_content_shortcut_sees_quote_text_operators():
+    assert content_shortcut(_Doc(b"q 1 0 0 1 0 0 cm Q"), _Page()) == 0.0
+    assert content_shortcut(_Doc(b"BT /F1 12 Tf 14 TL (Hello) ' ET"), _Page()) is None
+    assert content_shortcut(_Doc(b"BT /F1 12 Tf 0 0 (Hi)\"\nET"), _Page()) is None
+    assert content_shortcut(_Doc(b"BT /F1 12 Tf [(a)-20(b)]TJ ET"), _Page()) is None
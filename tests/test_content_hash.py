@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.content_hash import ContentHashCache, find_duplicates, duplicate_files
+
+
+def test_find_duplicates_keeps_first_occurrence():
+    hashes = {
+        "a.pdf": ("fa", ["p1", "p2"]),
+        "b.pdf": ("fb", ["p3", "p1"]),
+        "c.pdf": ("fa", ["p1", "p2"]),
+    }
+    pages = [("b.pdf", 1), ("a.pdf", 0), ("a.pdf", 1), ("c.pdf", 1), ("x.pdf", 0)]
+    assert find_duplicates(pages, hashes) == {1: 0, 3: 2}
+    assert duplicate_files(hashes) == {"c.pdf": "a.pdf"}
+
+
+def test_hashes_are_cached_by_fingerprint(tmp_path, monkeypatch):
+    import components.content_hash as content_hash
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    calls = []
+    monkeypatch.setattr(
+        content_hash, "compute_content_hashes", lambda p: calls.append(p) or ("f", ["p"])
+    )
+    cache_path = str(tmp_path / "hashes.json")
+    cache = ContentHashCache(cache_path)
+    assert cache.get(str(pdf)) == ("f", ["p"])
+    cache.save()
+    # 別インスタンスでも保存済みの値を使う
+    assert ContentHashCache(cache_path).get(str(pdf)) == ("f", ["p"])
+    assert len(calls) == 1
+    pdf.write_bytes(b"%PDF-1.4 changed")
+    ContentHashCache(cache_path).get(str(pdf))
+    assert len(calls) == 2
@@ -0,0 +1,34 @@
+import os
+import sys
+from PyQt6.QtCore import QCoreApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.folder_watcher import PDFFolderWatcher
+
+
+def test_reports_changes_once_file_is_stable(tmp_path):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-a")
+    (tmp_path / "b.pdf").write_bytes(b"%PDF-b")
+    watcher = PDFFolderWatcher()
+    events = []
+    watcher.filesAdded.connect(lambda p: events.append(("added", p)))
+    watcher.filesRemoved.connect(lambda p: events.append(("removed", p)))
+    watcher.filesModified.connect(lambda p: events.append(("modified", p)))
+    watcher.watch(str(tmp_path))
+    watcher.rescan()
+    assert events == []
+
+    (tmp_path / "c.pdf").write_bytes(b"%PDF-c")
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-a-modified")
+    os.remove(tmp_path / "b.pdf")
+    watcher.rescan()
+    # 削除はすぐ、追加・更新は次の走査でも変わっていなければ通知する
+    assert events == [("removed", [str(tmp_path / "b.pdf")])]
+    watcher.rescan()
+    assert events[1:] == [
+        ("added", [str(tmp_path / "c.pdf")]),
+        ("modified", [str(tmp_path / "a.pdf")]),
+    ]
+    watcher.unwatch_all()
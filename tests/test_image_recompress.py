@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.image_recompress import ImageRecompressCache, RecompressReport, _jpeg_components
+
+
+def test_cache_trims_oldest_entries(tmp_path):
+    cache = ImageRecompressCache(str(tmp_path), max_bytes=1000)
+    for i in range(4):
+        cache.put(f"k{i}", bytes(300))
+        os.utime(tmp_path / f"k{i}.jpg", (i, i))
+    assert cache.get("k0") is None and cache.get("k1") is None
+    assert cache.get("k3") == bytes(300)
+    assert sum(os.path.getsize(tmp_path / f) for f in os.listdir(tmp_path)) <= 800
+
+
+def test_jpeg_components_from_sof():
+    app0 = b"\xff\xe0" + (16).to_bytes(2, "big") + bytes(14)
+    sof = b"\xff\xc0" + (11).to_bytes(2, "big") + b"\x08" + (10).to_bytes(2, "big") * 2 + b"\x01" + bytes(3)
+    assert _jpeg_components(b"\xff\xd8" + app0 + sof) == 1
+    report = RecompressReport(pages=4, images=2, cache_hits=0, bytes_before=1000, bytes_after=250, seconds=2.0)
+    assert report.reduction == 0.75 and report.seconds_per_page == 0.5
@@ -0,0 +1,49 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.merge_cache import MergeResultCache, plan_key
+
+
+def _page(path, n, rotation=0, crop=None):
+    return {'pdf_path': str(path), 'page_num': n, 'rotation': rotation, 'crop': crop}
+
+
+def test_plan_key_tracks_order_edits_profile_and_sources(tmp_path):
+    src = tmp_path / "a.pdf"
+    src.write_bytes(b"%PDF-1.4 a")
+    plan = [_page(src, 0), _page(src, 1)]
+    key = plan_key(plan)
+    assert key == plan_key([dict(p) for p in plan])
+    assert key != plan_key(plan[::-1])
+    assert key != plan_key([_page(src, 0, rotation=90), _page(src, 1)])
+    assert key != plan_key(plan, profile=("dpi", 150))
+    src.write_bytes(b"%PDF-1.4 changed")
+    assert key != plan_key(plan)
+    assert plan_key([_page(tmp_path / "missing.pdf", 0)]) is None
+
+
+def test_cache_returns_copies_and_evicts(tmp_path):
+    cache = MergeResultCache(str(tmp_path / "cache"), max_bytes=250)
+    out = tmp_path / "out.pdf"
+    for i in range(3):
+        out.write_bytes(bytes([i]) * 100)
+        cache.put(f"k{i}", str(out))
+    assert not cache.get("k0", str(tmp_path / "x.pdf"))
+    assert cache.get("k2", str(tmp_path / "y.pdf"))
+    assert (tmp_path / "y.pdf").read_bytes() == bytes([2]) * 100
+    assert cache.nbytes <= 250
+    # 登録後に書き換えられたファイルは使わない
+    with open(os.path.join(cache.directory, "k2.pdf"), "ab") as f:
+        f.write(b"edited")
+    assert not cache.get("k2", str(tmp_path / "z.pdf"))
+    assert not os.path.exists(tmp_path / "z.pdf")
+
+
+def test_cache_skips_results_over_the_limit(tmp_path):
+    cache = MergeResultCache(str(tmp_path / "cache"), max_bytes=50)
+    out = tmp_path / "out.pdf"
+    out.write_bytes(bytes(100))
+    cache.put("big", str(out))
+    assert cache.nbytes == 0 and os.listdir(cache.directory) == []
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import components.merge_verify as merge_verify
+
+
+class _Hashes:
+    def __init__(self, hashes):
+        self.hashes = hashes
+
+    def cached(self, pdf_path):
+        return self.hashes.get(pdf_path)
+
+
+def test_reports_mismatches_per_page(monkeypatch):
+    output = ["a0", "b1", "a1"]
+    monkeypatch.setattr(merge_verify, "_page_count", lambda path: len(output))
+    monkeypatch.setattr(
+        merge_verify, "_hash_pages", lambda path, start, end, geometries: output[start:end]
+    )
+    hashes = _Hashes({"a.pdf": ("fa", ["a0", "a1"]), "b.pdf": ("fb", ["b0", "b1"])})
+    plan = [
+        {'pdf_path': "a.pdf", 'page_num': 0},
+        {'pdf_path': "a.pdf", 'page_num': 1},  # 順番違い
+        {'pdf_path': "gone.pdf", 'page_num': 0},  # 結合元が読めない
+        {'pdf_path': "b.pdf", 'page_num': 0},  # 結果にない
+    ]
+    report = merge_verify.verify_merge("out.pdf", plan, hashes)
+    assert not report.ok
+    assert (report.expected_pages, report.actual_pages, report.checked, report.unchecked) == (4, 3, 2, 1)
+    assert [(m.index, m.reason) for m in report.mismatches] == [(1, "content"), (3, "missing")]
+    report = merge_verify.verify_merge("out.pdf", plan[:1] + [{'pdf_path': "b.pdf", 'page_num': 1}], hashes)
+    assert [(m.index, m.reason) for m in report.mismatches] == [(2, "extra")]
+
+
+def test_cold_cache_hashes_only_planned_pages(tmp_path, monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    import components.content_hash as content_hash
+    from components.pdf_save_utils import PDFPageInfo, save_pdf_pages
+    src = str(tmp_path / "a.pdf")
+    with fitz.open() as doc:
+        for i in range(10):
+            doc.new_page().insert_text((20, 40), f"page {i}")
+        doc.save(src)
+    plan = [PDFPageInfo(src, 7), PDFPageInfo(src, 2, 90)]
+    out = str(tmp_path / "out.pdf")
+    save_pdf_pages(plan, out)
+    hashed = []
+    original = content_hash.page_hash
+
+    def counting(doc, page, geometry=None):
+        hashed.append(page.number)
+        return original(doc, page, geometry)
+
+    monkeypatch.setattr(content_hash, "page_hash", counting)
+    cache = content_hash.ContentHashCache(str(tmp_path / "hashes.json"))
+    report = merge_verify.verify_merge(out, plan, cache)
+    assert report.ok and report.checked == 2
+    assert sorted(hashed) == [0, 1, 2, 7]  # 結合元の2ページと結合先の2ページだけ
+    assert not os.path.exists(tmp_path / "hashes.json")
@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from PyQt6.QtWidgets import QApplication, QMessageBox
+
+import components.pdf_thumbnail_merger as merger_module
+from components.pdf_thumbnail_list_viewer import PDFPageInfo
+
+
+def test_clear_and_save_drops_undo_history(tmp_path, monkeypatch):
+    app = QApplication.instance() or QApplication([])
+    monkeypatch.setattr(merger_module, "get_appdata_path", lambda name: str(tmp_path / name))
+    monkeypatch.setattr(QMessageBox, "information", lambda *args: None)
+    win = merger_module.PDFThumbnailMerger(str(tmp_path))
+    try:
+        viewer = win.viewer
+        viewer.page_items = []
+        viewer.update_text_index = lambda: None
+        viewer._request_thumbnail = lambda *args, **kwargs: None
+        for row in range(3):
+            viewer._insert_page_row(row, PDFPageInfo("a.pdf", row))
+        viewer.reverse_pages()
+        assert win.undo_action.isEnabled()
+        win.clear_and_save_edit_state()
+        assert not viewer.undo_log.can_undo() and not win.undo_action.isEnabled()
+        assert win.undo_action.text() == "元に戻す"
+        assert os.path.exists(tmp_path / "last_pdf_edit_state.json")
+    finally:
+        win.deleteLater()
+        app.processEvents()
@@ -0,0 +1,49 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.pdf_export import ExportJob, export_pdf_parts, plan_export
+from components.range_selection import RangeSelection
+
+
+def _pages(*specs):
+    return [{'pdf_path': path, 'page_num': n} for path, n in specs]
+
+
+def test_per_file_keeps_first_appearance_and_names_collisions():
+    pages = _pages(("/a/scan.pdf", 0), ("/b/scan.pdf", 0), ("/a/scan.pdf", 1), ("/a/memo.pdf", 3))
+    jobs = plan_export(pages, "out", "file")
+    assert [os.path.basename(j.output_path) for j in jobs] == ["scan.pdf", "scan_2.pdf", "memo.pdf"]
+    assert jobs[0].pages == [("/a/scan.pdf", 0), ("/a/scan.pdf", 1)]
+
+
+def test_every_n_and_ranges_are_numbered():
+    pages = _pages(*[("/a/x.pdf", i) for i in range(25)])
+    jobs = plan_export(pages, "out", "every", every=10)
+    assert [os.path.basename(j.output_path) for j in jobs] == ["part_001.pdf", "part_002.pdf", "part_003.pdf"]
+    assert [len(j.pages) for j in jobs] == [10, 10, 5]
+    jobs = plan_export(pages, "out", "ranges", ranges=RangeSelection([(0, 3), (10, 12), (24, 40)]))
+    assert [os.path.basename(j.output_path) for j in jobs] == [
+        "part_001_p1-3.pdf", "part_002_p11-12.pdf", "part_003_p25-25.pdf"
+    ]
+    assert jobs[2].pages == [("/a/x.pdf", 24)]
+
+
+def test_outputs_never_overwrite_sources(tmp_path):
+    a, b = str(tmp_path / "a.pdf"), str(tmp_path / "a_export.pdf")
+    pages = _pages((a, 0), (b, 0), (str(tmp_path / "part_001.pdf"), 0))
+    jobs = plan_export(pages, str(tmp_path), "file")
+    # 結合元と同じフォルダでも、結合元の名前は使わない
+    assert [os.path.basename(j.output_path) for j in jobs] == [
+        "a_export_2.pdf", "a_export_export.pdf", "part_001_export.pdf"
+    ]
+    jobs = plan_export(pages, os.path.join(str(tmp_path), "."), "every", every=1)
+    assert os.path.basename(jobs[0].output_path) == "part_001_export.pdf"
+
+
+def test_export_refuses_to_write_a_source(tmp_path):
+    src = tmp_path / "a.pdf"
+    src.write_bytes(b"source")
+    results = export_pdf_parts([ExportJob(str(src), [(str(src), 0)])], max_workers=1)
+    assert results[0].error and src.read_bytes() == b"source"
@@ -0,0 +1,119 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+fitz = pytest.importorskip("fitz")
+
+from components.pdf_save_utils import PDFPageInfo, SourceDocumentCache, save_pdf_pages
+
+
+def _make_source(path, pages):
+    """全ページで1つの画像を共有し、各ページに "名前 番号" を書いたPDF"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    pix.clear_with(128)
+    xref = 0
+    with fitz.open() as doc:
+        for i in range(pages):
+            page = doc.new_page(width=200, height=300)
+            xref = page.insert_image(fitz.Rect(0, 0, 50, 50), pixmap=pix, xref=xref)
+            page.insert_text((20, 100), f"{name} {i}")
+        doc.save(path)
+    return path
+
+
+def _texts(path):
+    with fitz.open(path) as doc:
+        return [page.get_text().strip() for page in doc]
+
+
+def test_interleaved_sources_share_images(tmp_path):
+    a = _make_source(str(tmp_path / "a.pdf"), 10)
+    b = _make_source(str(tmp_path / "b.pdf"), 10)
+    plan = [PDFPageInfo(path, i) for i in range(10) for path in (a, b)]
+    out = str(tmp_path / "out.pdf")
+    save_pdf_pages(plan, out)
+    assert _texts(out) == [f"{name} {i}" for i in range(10) for name in ("a", "b")]
+    with fitz.open(out) as doc:
+        images = {item[0] for page in doc for item in page.get_images()}
+    assert len(images) == 2  # 結合元ごとに1つ（挿入のたびに複製しない）
+
+
+def test_lru_closes_least_recently_used(tmp_path):
+    paths = [_make_source(str(tmp_path / f"s{i}.pdf"), 1) for i in range(3)]
+    closed = []
+    with SourceDocumentCache(max_open=2, on_close=lambda doc: closed.append(doc.name)) as cache:
+        cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[0])
+        cache.get(paths[2])
+        assert len(cache) == 2 and cache.evictions == 1 and cache.hits == 1
+        assert closed == [paths[1]]
+    assert len(closed) == 3
+
+
+def test_merge_with_evictions_keeps_order(tmp_path):
+    paths = [_make_source(str(tmp_path / f"s{i}.pdf"), 2) for i in range(3)]
+    plan = [PDFPageInfo(path, i) for i in range(2) for path in paths]
+    out = str(tmp_path / "out.pdf")
+    report = save_pdf_pages(plan, out, max_open=1)
+    assert report.pages == 6 and report.chunks == 1
+    assert _texts(out) == [f"s{j} {i}" for i in range(2) for j in range(3)]
+
+
+def test_chunked_merge_splits_contiguous_run(tmp_path):
+    src = _make_source(str(tmp_path / "a.pdf"), 250)
+    plan = [PDFPageInfo(src, i, 90 if i in (29, 30, 31) else 0) for i in range(250)]
+    out = str(tmp_path / "out.pdf")
+    report = save_pdf_pages(plan, out, chunk_pages=30)
+    assert report.chunks == 9  # 1つの連続ページでも区切りごとに書き出す
+    with fitz.open(out) as doc:
+        assert len(doc) == 250
+        assert [i for i, page in enumerate(doc) if page.rotation] == [29, 30, 31]
+    assert _texts(out)[::50] == [f"a {i}" for i in range(0, 250, 50)]
+    assert set(os.listdir(tmp_path)) == {"a.pdf", "out.pdf"}  # 一時ファイルは残さない
+
+
+def test_empty_plan_writes_nothing_and_keeps_part_file(tmp_path):
+    out = str(tmp_path / "out.pdf")
+    (tmp_path / "out.pdf.part").write_bytes(b"user file")
+    report = save_pdf_pages([], out)
+    assert report.pages == 0 and not os.path.exists(out)
+    src = _make_source(str(tmp_path / "a.pdf"), 2)
+    save_pdf_pages([PDFPageInfo(src, 0)], out)
+    assert (tmp_path / "out.pdf.part").read_bytes() == b"user file"
+
+
+def test_rotation_and_crop_set_as_page_attributes(tmp_path):
+    src = _make_source(str(tmp_path / "a.pdf"), 3)
+    plan = [
+        PDFPageInfo(src, 0),
+        PDFPageInfo(src, 1, 0, (0.0, 0.0, 0.5, 0.5)),
+        {'pdf_path': src, 'page_num': 2, 'rotation': 270, 'crop': (0.5, 0.0, 1.0, 1.0)},
+    ]
+    out = str(tmp_path / "out.pdf")
+    save_pdf_pages(plan, out)
+    with fitz.open(out) as doc:
+        assert [page.rotation for page in doc] == [0, 0, 270]
+        assert doc[0].cropbox == fitz.Rect(0, 0, 200, 300)
+        assert doc[1].cropbox == fitz.Rect(0, 0, 100, 150)  # 左上の4分の1
+        assert doc[2].rect == fitz.Rect(0, 0, 300, 100)  # 右半分を横向きに
+        assert "a 1" in doc[1].get_text() and "a 0" in doc[0].get_text()
+
+
+class _BrokenCache:
+    def get(self, key, dest):
+        raise OSError("disk full")
+
+    def put(self, key, src):
+        raise OSError("disk full")
+
+
+def test_cache_failure_does_not_fail_merge(tmp_path):
+    src = _make_source(str(tmp_path / "a.pdf"), 2)
+    out = str(tmp_path / "out.pdf")
+    report = save_pdf_pages([PDFPageInfo(src, 1), PDFPageInfo(src, 0)], out, result_cache=_BrokenCache())
+    assert not report.cached and _texts(out) == ["a 1", "a 0"]
@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.pdf_state_format import (
+    read_state,
+    write_state,
+    encode_compact_state,
+    decode_compact_state,
+    stale_paths,
+    selected_indices,
+)
+
+
+def test_compact_roundtrip_runs(tmp_path):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    pages = [(str(pdf), i) for i in range(100)] + [("/missing/b.pdf", i) for i in range(5)]
+    path = tmp_path / "state.pdfstate"
+    write_state(str(path), pages, [0, 1, 2, 50, 104])
+    state = read_state(str(path))
+    assert state.pages == pages
+    assert state.selected_ranges == [(0, 3), (50, 51), (104, 105)]
+    assert selected_indices(state) == [0, 1, 2, 50, 104]
+    assert state.fingerprints["/missing/b.pdf"] is None
+    assert state.fingerprints[str(pdf)] is not None
+    assert stale_paths(state) == []
+    pdf.write_bytes(b"%PDF-1.4 changed")
+    assert stale_paths(state) == [str(pdf)]
+
+
+def test_compact_roundtrip_shuffled_pages():
+    pages = [("x.pdf", (i * 7919) % 1000) for i in range(1000)]
+    state = decode_compact_state(encode_compact_state(pages, []))
+    assert state.pages == pages
+    assert state.selected_ranges == []
+
+
+def test_legacy_json_still_readable(tmp_path):
+    path = tmp_path / "last_pdf_edit_state.json"
+    path.write_text(json.dumps({
+        "pages": [{"pdf_path": "a.pdf", "page_num": 3}],
+        "selected": [0],
+    }), encoding="utf-8")
+    state = read_state(str(path))
+    assert state.pages == [("a.pdf", 3)]
+    assert selected_indices(state) == [0]
+    # 拡張子.jsonなら従来どおりJSONで保存される
+    write_state(str(path), state.pages, selected_indices(state))
+    assert json.loads(path.read_text(encoding="utf-8"))["pages"][0]["page_num"] == 3
+
+
+def test_page_edits_roundtrip(tmp_path):
+    pages = [("a.pdf", i) for i in range(10)]
+    edits = {2: (90, None), 7: (0, (0.1, 0.2, 0.9, 0.8))}
+    for name in ("state.pdfstate", "state.json"):
+        path = tmp_path / name
+        write_state(str(path), pages, [1], edits=edits)
+        state = read_state(str(path))
+        assert state.pages == pages
+        assert state.edits == edits
+    # 回転・切り抜きのない状態は空のまま
+    assert decode_compact_state(encode_compact_state(pages, [])).edits == {}
+
+
+def test_decoded_columns_behave_like_lists():
+    pages = [("a.pdf", i) for i in range(5)] + [("b.pdf", 9), ("a.pdf", 0)]
+    state = decode_compact_state(encode_compact_state(pages, [1, 2, 5]))
+    # 読み込み時はタプルを作らず、位置・範囲での取り出しはリストと同じ
+    assert len(state.pages) == 7 and list(state.pages) == pages
+    assert state.pages[5] == ("b.pdf", 9) and state.pages[-1] == ("a.pdf", 0)
+    assert state.pages[1:3] == pages[1:3]
+    assert list(state.selected_ranges) == [(1, 3), (5, 6)]
+    assert state.selected_ranges[-1] == (5, 6)
+    assert state.pages != pages[:-1]
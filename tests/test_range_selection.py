@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.range_selection import RangeSelection
+
+
+def test_ranges_are_merged_and_split():
+    sel = RangeSelection([(5, 8), (0, 2), (2, 3), (7, 10)])
+    assert sel.ranges == [(0, 3), (5, 10)]
+    sel.add(3, 5)
+    assert sel.ranges == [(0, 10)]
+    sel.remove(4, 6)
+    assert sel.ranges == [(0, 4), (6, 10)]
+    assert len(sel) == 8 and 3 in sel and 4 not in sel and 10 not in sel
+    assert RangeSelection.from_rows([3, 1, 2, 7]).ranges == [(1, 4), (7, 8)]
+
+
+def test_inverted():
+    sel = RangeSelection([(0, 2), (5, 6)])
+    assert sel.inverted(8).ranges == [(2, 5), (6, 8)]
+    assert RangeSelection().inverted(3).ranges == [(0, 3)]
+    assert sel.inverted(8).inverted(8) == sel
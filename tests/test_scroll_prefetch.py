@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.scroll_prefetch import ScrollVelocityTracker, IDLE_WINDOW
+
+
+def test_idle_prefetch_is_symmetric():
+    tracker = ScrollVelocityTracker()
+    assert tracker.prefetch_screens() == IDLE_WINDOW
+    assert not tracker.is_flinging()
+
+
+def test_moderate_scroll_looks_ahead_in_direction():
+    tracker = ScrollVelocityTracker()
+    # 1画面=10、0.1秒ごとに5ずつ下へ（5画面/秒）
+    for i in range(5):
+        tracker.update(i * 5, 10, now=i * 0.1)
+    before, after = tracker.prefetch_screens()
+    assert after > 1.0 > before
+    assert not tracker.is_flinging(now=0.45)
+    for i in range(5):
+        tracker.update(100 - i * 5, 10, now=1.0 + i * 0.1)
+    before, after = tracker.prefetch_screens()
+    assert before > 1.0 > after
+
+
+def test_fast_fling_pauses_until_scrolling_stops():
+    tracker = ScrollVelocityTracker()
+    for i in range(5):
+        tracker.update(i * 100, 10, now=i * 0.016)
+    assert tracker.is_flinging(now=0.07)
+    assert not tracker.is_flinging(now=1.0)
+
+
+def test_positions_are_sampled_at_most_every_interval():
+    tracker = ScrollVelocityTracker()
+    # 4msごとの変化（250回/秒）でも、記録は50msに1回
+    sampled = [tracker.update(i * 2, 10, now=i * 0.004) for i in range(100)]
+    assert sum(sampled) == 8
+    assert 45.0 < tracker.velocity <= 50.0  # 50画面/秒に近づく
@@ -0,0 +1,21 @@
+import os
+import sys
+import subprocess
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_main_window_import_defers_heavy_modules():
+    # 新しいプロセスでimportし、重いモジュールが読み込まれていないことを確認
+    script = (
+        "import sys\n"
+        f"sys.path.insert(0, {REPO_ROOT!r})\n"
+        "import components.pdf_thumbnail_merger\n"
+        "heavy = ['fitz', 'pymupdf', 'PyQt6.QtPrintSupport',\n"
+        "         'components.pdf_preview_widget', 'components.pdf_save_utils']\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert out == ""
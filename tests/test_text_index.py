@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.text_index import TextIndex
+
+
+def test_search_requires_all_terms(tmp_path):
+    index = TextIndex(str(tmp_path / "index.sqlite3"))
+    with index.conn:
+        index.conn.executemany(
+            "INSERT INTO pages (path, page, body) VALUES (?, ?, ?)",
+            [
+                ("a.pdf", 0, "御見積書 合計 100%"),
+                ("a.pdf", 1, "請求書 合計"),
+                ("b.pdf", 0, "見積書 控え"),
+            ],
+        )
+    assert index.search("見積書") == {("a.pdf", 0), ("b.pdf", 0)}
+    # 3文字未満の語・記号も部分一致で探す
+    assert index.search("合計 見積") == {("a.pdf", 0)}
+    assert index.search("100%") == {("a.pdf", 0)}
+    assert index.search("見積書", pdf_paths=["b.pdf"]) == {("b.pdf", 0)}
+    assert index.search("  ") == set()
+    index.close()
+
+
+def test_prune_drops_missing_files(tmp_path):
+    index = TextIndex(str(tmp_path / "index.sqlite3"))
+    kept = tmp_path / "kept.pdf"
+    kept.write_bytes(b"%PDF")
+    with index.conn:
+        for path in (str(kept), str(tmp_path / "moved.pdf")):
+            index.conn.execute("INSERT INTO pages (path, page, body) VALUES (?, 0, '見積書')", (path,))
+            index.conn.execute("INSERT INTO files (path, size, mtime_ns, pages) VALUES (?, 0, 0, 1)", (path,))
+    index.prune()
+    assert index.search("見積書") == {(str(kept), 0)}
+    assert [row[0] for row in index.conn.execute("SELECT path FROM files")] == [str(kept)]
+    index.close()
+
+
+def test_reindex_replaces_only_that_files_pages(tmp_path):
+    fitz = pytest.importorskip("fitz")
+
+    def write(path, texts):
+        with fitz.open() as doc:
+            for text in texts:
+                doc.new_page().insert_text((20, 100), text)
+            doc.save(path)
+
+    a, b = str(tmp_path / "a.pdf"), str(tmp_path / "b.pdf")
+    write(a, ["estimate one", "invoice one"])
+    write(b, ["estimate two"])
+    index = TextIndex(str(tmp_path / "index.sqlite3"))
+    assert index.index_file(a) and index.index_file(b)
+    write(a, ["receipt three"])
+    os.utime(a, ns=(1, 1))  # 同じ秒内の書き換えでも変更と分かるように
+    assert index.index_file(a)
+    assert index.search("estimate") == {(b, 0)}
+    assert index.search("receipt") == {(a, 0)}
+    index.remove_file(b)
+    assert index.search("estimate") == set()
+    assert index.conn.execute("SELECT count(*) FROM pages").fetchone()[0] == 1
+    index.close()
+
+
+def test_index_without_rowid_ranges_is_migrated(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "index.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, pages INTEGER)")
+    conn.execute("CREATE VIRTUAL TABLE pages USING fts5(path UNINDEXED, page UNINDEXED, body)")
+    conn.execute("INSERT INTO pages (path, page, body) VALUES ('old.pdf', 0, 'estimate')")
+    conn.execute("INSERT INTO files VALUES ('old.pdf', 0, 0, 1)")
+    conn.commit()
+    conn.close()
+    index = TextIndex(path)
+    index.remove_file("old.pdf")  # 範囲のない登録はpathで消す
+    assert index.conn.execute("SELECT count(*) FROM pages").fetchone()[0] == 0
+    index.close()
@@ -0,0 +1,49 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.thumbnail_cache import ThumbnailCache, level_for, level_box
+
+
+class _Image:
+    """width()/height()だけを持つ画像の代わり"""
+    def __init__(self, w, h):
+        self._w, self._h = w, h
+
+    def width(self):
+        return self._w
+
+    def height(self):
+        return self._h
+
+
+def test_level_for_picks_smallest_sufficient_level():
+    assert level_for(40) == 64
+    assert level_for(240) == 256
+    assert level_for(480) == 512
+    assert level_for(1024) == 1024  # 最大表示サイズ512px・DPR2
+    assert level_for(2000) == 1024
+    assert level_box(256) == (192, 256)
+
+
+def test_nearest_prefers_larger_level_then_smaller():
+    cache = ThumbnailCache()
+    cache.put("a.pdf", 0, 64, _Image(48, 64))
+    cache.put("a.pdf", 0, 512, _Image(384, 512))
+    assert cache.nearest("a.pdf", 0, 256)[0] == 512
+    assert cache.nearest("a.pdf", 0, 64)[0] == 64
+    cache.discard("a.pdf", 0)
+    assert cache.nearest("a.pdf", 0, 256) is None
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_evicts_least_recently_used_within_budget():
+    cache = ThumbnailCache(max_bytes=3 * 100 * 100 * 4)
+    for page in range(3):
+        cache.put("a.pdf", page, 128, _Image(100, 100))
+    cache.get("a.pdf", 0, 128)
+    cache.put("a.pdf", 3, 128, _Image(100, 100))
+    assert ("a.pdf", 1, 128) not in cache
+    assert ("a.pdf", 0, 128) in cache
+    assert cache.levels("a.pdf", 1) == []
@@ -0,0 +1,259 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+from PyQt6.QtWidgets import QApplication, QLabel
+
+from components.pdf_thumbnail_list_viewer import (
+    PDFThumbnailListViewer, PDFPageInfo, THUMB_SHOWN_ROLE,
+)
+
+
+@pytest.fixture
+def viewer():
+    app = QApplication.instance() or QApplication([])
+    v = PDFThumbnailListViewer()
+    v.page_items = []
+    v.requested = []
+    # 描画はせず、要求されたページだけ記録する
+    v._request_thumbnail = lambda pdf_path, page_num, level, callback, preview=True: v.requested.append(
+        (pdf_path, page_num, level)
+    )
+    v.text_index_path = None
+    v.update_text_index = lambda: None
+    yield v
+    v.deleteLater()
+    app.processEvents()
+
+
+def _fill(viewer, pages):
+    for row, (pdf_path, page_num) in enumerate(pages):
+        viewer._insert_page_row(row, PDFPageInfo(pdf_path, page_num))
+
+
+def _image(viewer):
+    image = QImage(viewer.thumb_w, viewer.thumb_h, QImage.Format.Format_RGB32)
+    image.fill(0xFF808080)
+    return image
+
+
+def _label(viewer, row):
+    return viewer.itemWidget(viewer.page_items[row][1]).findChild(QLabel)
+
+
+def test_thumbnail_arriving_on_stale_row_is_kept(viewer):
+    viewer.adaptive_prefetch = False
+    viewer.resize(400, 300)
+    viewer.show()
+    _fill(viewer, [("a.pdf", i) for i in range(200)])
+    viewer.reverse_pages()
+    # 画面外の行はウィジェットを付け替える前にサムネイルが届く
+    info, item = viewer.page_items[199]
+    assert info.page_num == 0 and viewer.itemWidget(item).page_info is not info
+    viewer.on_thumbnail_ready("a.pdf", 0, _image(viewer), viewer._current_level())
+    viewer.scrollToBottom()
+    viewer._load_visible_thumbnails()
+    assert viewer.itemWidget(item).page_info is info
+    assert not _label(viewer, 199).pixmap().isNull()
+    assert item.data(THUMB_SHOWN_ROLE) == viewer._display_gen
+
+
+def test_sync_clears_shown_role(viewer):
+    _fill(viewer, [("a.pdf", i) for i in range(3)])
+    viewer.on_thumbnail_ready("a.pdf", 2, _image(viewer), viewer._current_level())
+    item = viewer.page_items[2][1]
+    assert item.data(THUMB_SHOWN_ROLE) == viewer._display_gen
+    viewer._sync_item_widget(PDFPageInfo("a.pdf", 0), item)
+    assert _label(viewer, 2).pixmap().isNull() and item.data(THUMB_SHOWN_ROLE) is None
+
+
+def test_bulk_reorder_moves_selection(viewer):
+    _fill(viewer, [("b.pdf", 0), ("a.pdf", 1), ("a.pdf", 0), ("c.pdf", 0)])
+    viewer.select_range(0, 1)
+    viewer.sort_pages("name")
+    assert [(os.path.basename(i.pdf_path), i.page_num) for i, _ in viewer.page_items] == [
+        ("a.pdf", 0), ("a.pdf", 1), ("b.pdf", 0), ("c.pdf", 0)
+    ]
+    assert viewer.get_selected_pages() == [PDFPageInfo("b.pdf", 0)]
+    assert [item.data(Qt.ItemDataRole.UserRole) for _, item in viewer.page_items] == [i for i, _ in viewer.page_items]
+
+
+def test_bulk_reorder_is_one_undo_step(viewer):
+    _fill(viewer, [("b.pdf", 0), ("a.pdf", 1), ("a.pdf", 0), ("c.pdf", 0)])
+    viewer.select_range(0, 1)
+    viewer.sort_pages("name")
+    viewer.undo_log.undo()
+    assert [i.pdf_path for i, _ in viewer.page_items] == ["b.pdf", "a.pdf", "a.pdf", "c.pdf"]
+    assert viewer.get_selected_pages() == [PDFPageInfo("b.pdf", 0)]
+    viewer.undo_log.redo()
+    assert [i.pdf_path for i, _ in viewer.page_items] == ["a.pdf", "a.pdf", "b.pdf", "c.pdf"]
+
+
+def test_thumbnail_size_change_refreshes_from_nearest_level(viewer):
+    _fill(viewer, [("a.pdf", 0)])
+    viewer.on_thumbnail_ready("a.pdf", 0, _image(viewer), viewer._current_level())
+    old_level = viewer._current_level()
+    viewer.requested.clear()
+    viewer.set_thumbnail_size(480)
+    item = viewer.page_items[0][1]
+    # 最寄りの段で即時表示し、要求サイズの段は描画し直す
+    assert viewer._current_level() != old_level
+    assert viewer.requested == [("a.pdf", 0, viewer._current_level())]
+    assert not _label(viewer, 0).pixmap().isNull()
+    assert item.data(THUMB_SHOWN_ROLE) != viewer._display_gen
+    viewer.on_thumbnail_ready("a.pdf", 0, _image(viewer), viewer._current_level())
+    assert item.data(THUMB_SHOWN_ROLE) == viewer._display_gen
+
+
+def test_exact_level_is_shown_without_rescaling(viewer):
+    _fill(viewer, [("a.pdf", 0)])
+    viewer.on_thumbnail_ready("a.pdf", 0, _image(viewer), viewer._current_level())
+    cached = viewer.thumbnail_cache.get("a.pdf", 0, viewer._current_level())
+    assert _label(viewer, 0).pixmap().cacheKey() == cached.cacheKey()  # 同じ画素を共有する
+    # DPR2の最大サイズも拡大せずに描画する
+    viewer._dpr = 2.0
+    viewer.set_thumbnail_size(512)
+    assert viewer._current_level() == 1024
+    assert viewer._render_box(viewer._current_level()) == (768, 1024)
+
+def test_watcher_paths_match_rows_in_other_notation(viewer, tmp_path):
+    loaded = os.path.join(str(tmp_path), ".", "s0.pdf")  # 一覧に読み込んだときの表記
+    watched = os.path.abspath(loaded)  # 監視側の表記
+    other = str(tmp_path / "s1.pdf")
+    _fill(viewer, [(loaded, i) for i in range(3)] + [(other, 0)])
+    viewer._on_pdf_files_reloaded([watched], [(watched, i) for i in range(4)])
+    assert [(i.pdf_path, i.page_num) for i, _ in viewer.page_items] == [
+        (loaded, 0), (loaded, 1), (loaded, 2), (loaded, 3), (other, 0)
+    ]
+    viewer.remove_pdf_files([watched])
+    assert [i.pdf_path for i, _ in viewer.page_items] == [other]
+
+
+def _wait_for_workers(viewer):
+    app = QApplication.instance()
+    viewer.thread_pool.waitForDone()
+    for _ in range(20):  # ワーカーからの通知はキュー経由で届く
+        app.processEvents()
+
+
+def test_add_files_appends_without_reloading(viewer, tmp_path):
+    fitz = pytest.importorskip("fitz")
+    paths = []
+    for name, pages in (("a", 2), ("b", 3)):
+        path = str(tmp_path / f"{name}.pdf")
+        with fitz.open() as doc:
+            for _ in range(pages):
+                doc.new_page()
+            doc.save(path)
+        paths.append(path)
+    viewer.add_pdf_files(paths[:1])
+    _wait_for_workers(viewer)
+    viewer.reverse_pages()
+    viewer.select_range(1, 2)
+    first_items = [item for _, item in viewer.page_items]
+    # 既にあるファイル（別表記を含む）は開き直さない
+    assert viewer.add_pdf_files([paths[1], os.path.join(str(tmp_path), ".", "a.pdf")]) == [paths[1]]
+    _wait_for_workers(viewer)
+    assert [(os.path.basename(i.pdf_path), i.page_num) for i, _ in viewer.page_items] == [
+        ("a.pdf", 1), ("a.pdf", 0), ("b.pdf", 0), ("b.pdf", 1), ("b.pdf", 2)
+    ]
+    assert [item for _, item in viewer.page_items[:2]] == first_items  # 既存の行はそのまま
+    assert viewer.get_selected_pages() == [PDFPageInfo(paths[0], 0)]
+
+
+def test_range_selection_by_file_and_inversion(viewer):
+    _fill(viewer, [("a.pdf", 0), ("a.pdf", 1), ("b.pdf", 0), ("a.pdf", 2), ("c.pdf", 0)])
+    viewer.select_range(3, 10)
+    assert viewer.selected_ranges().ranges == [(3, 5)]
+    viewer.select_range(0, 1, extend=True)
+    assert viewer.get_selected_pages() == [
+        PDFPageInfo("a.pdf", 0), PDFPageInfo("a.pdf", 2), PDFPageInfo("c.pdf", 0)
+    ]
+    viewer.invert_selection()
+    assert viewer.selected_ranges().ranges == [(1, 3)]
+    viewer.select_file("a.pdf")
+    assert viewer.selected_ranges().ranges == [(0, 2), (3, 4)]
+    viewer.apply_order([2, 0, 1, 3, 4])  # 行の移動でファイルの区間を作り直す
+    viewer.select_file("b.pdf", extend=True)
+    assert [i.pdf_path for i in viewer.get_selected_pages()] == ["b.pdf", "a.pdf", "a.pdf", "a.pdf"]
+
+
+def test_collapse_after_add_keeps_existing_duplicates(viewer, tmp_path):
+    fitz = pytest.importorskip("fitz")
+    from components.content_hash import ContentHashCache
+    viewer._hash_cache = ContentHashCache(str(tmp_path / "hashes.json"))
+    paths = []
+    for name in ("a", "a_copy", "c"):
+        path = str(tmp_path / f"{name}.pdf")
+        with fitz.open() as doc:
+            for i in range(2):
+                doc.new_page().insert_text((20, 100), f"{name} {i}" if name == "c" and i else f"page {i}")
+            doc.save(path)
+        paths.append(path)
+    viewer.add_pdf_files(paths[:2])
+    _wait_for_workers(viewer)
+    viewer.auto_collapse_duplicates = True
+    viewer.add_pdf_files(paths[2:])
+    _wait_for_workers(viewer)
+    _wait_for_workers(viewer)
+    # 追加したファイルの重複だけを除き、残していた重複はそのまま
+    assert [(os.path.basename(i.pdf_path), i.page_num) for i, _ in viewer.page_items] == [
+        ("a.pdf", 0), ("a.pdf", 1), ("a_copy.pdf", 0), ("a_copy.pdf", 1), ("c.pdf", 1)
+    ]
+
+
+def test_undo_collapse_restores_removed_files(viewer, tmp_path):
+    fitz = pytest.importorskip("fitz")
+    from components.content_hash import ContentHashCache
+    viewer._hash_cache = ContentHashCache(str(tmp_path / "hashes.json"))
+    paths = []
+    for name in ("a", "b", "c"):
+        path = str(tmp_path / f"{name}.pdf")
+        with fitz.open() as doc:
+            doc.new_page().insert_text((20, 100), "c" if name == "c" else "same")
+            doc.save(path)
+        paths.append(path)
+    viewer.add_pdf_files(paths)
+    _wait_for_workers(viewer)
+    viewer.detect_duplicates(collapse=True)
+    _wait_for_workers(viewer)
+    assert viewer.pdf_files == [paths[0], paths[2]]
+    viewer.undo_log.undo()
+    # 行と一緒に一覧のファイルも戻す（読み直しでページが消えないように）
+    assert [i.pdf_path for i, _ in viewer.page_items] == paths
+    assert viewer.pdf_files == paths
+    viewer.undo_log.redo()
+    assert viewer.pdf_files == [paths[0], paths[2]]
+
+
+def test_blank_analysis_is_split_and_drops_stale_results(viewer, tmp_path, monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    import components.pdf_thumbnail_list_viewer as module
+    path = str(tmp_path / "scan.pdf")
+    with fitz.open() as doc:
+        for i in range(72):
+            page = doc.new_page()
+            if i % 36 == 0:
+                page.draw_rect(fitz.Rect(50, 50, 400, 400), fill=(0, 0, 0))
+        doc.save(path)
+    _fill(viewer, [(path, i) for i in range(72)])
+    batches = []
+    worker_class = module.BlankAnalysisWorker
+    monkeypatch.setattr(module, "BlankAnalysisWorker", lambda pages: batches.append(pages) or worker_class(pages))
+    viewer.thread_pool.setMaxThreadCount(4)
+    viewer.detect_blank_pages()
+    _wait_for_workers(viewer)
+    assert [len(b) for b in batches] == [36, 36]
+    viewer.select_blank_pages()
+    assert len(viewer.get_selected_pages()) == 70
+    # 判定中にファイルが更新されたら、古い内容の結果で行を取り除かない
+    viewer._forget_files([path])
+    viewer.detect_blank_pages(remove=True)
+    viewer._forget_files([path])
+    _wait_for_workers(viewer)
+    assert len(viewer.page_items) == 72 and not viewer._blank_scores
@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.undo_log import UndoLog
+
+
+def test_undo_redo_replays_deltas():
+    items = []
+    log = UndoLog()
+
+    def add(x):
+        items.append(x)
+        log.push(f"add {x}", items.pop, lambda: items.append(x))
+
+    add(1)
+    add(2)
+    assert log.undo() == "add 2" and items == [1]
+    assert log.redo() == "add 2" and items == [1, 2]
+    log.undo()
+    add(3)  # 新しい変更でやり直しの記録は消える
+    assert items == [1, 3] and not log.can_redo()
+    assert log.undo() == "add 3" and log.undo() == "add 1" and log.undo() is None
+    assert items == []
+
+
+def test_log_is_bounded_by_steps_and_cost():
+    log = UndoLog(max_steps=3, max_cost=10)
+    for i in range(5):
+        log.push(i, lambda: None, lambda: None)
+    assert len(log) == 3 and log.undo_label() == 4
+    log.push("big", lambda: None, lambda: None, cost=9)
+    assert len(log) == 2 and log.cost == 10